@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scripts.generate_policy_from_input import PolicyGenerator
+from src.batch import ENGINES, OUTPUT_FORMATS, BatchGenerator, configs_for_all
+
+def benchmark(generator, configs, output_format, engine, workers, repeat):
+    """Return the best wall-clock time of rendering configs with an engine"""
+    best = None
+    for _ in range(repeat):
+        batch = BatchGenerator(generator, workers=workers, engine=engine)
+        started = time.perf_counter()
+        results = list(batch.render(configs, output_format))
+        elapsed = time.perf_counter() - started
+        if any(result.error for result in results):
+            raise RuntimeError(f"{engine} engine failed: {[r.error for r in results if r.error][:3]}")
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark batch policy rendering across engines and worker counts')
+    parser.add_argument('--frameworks', nargs='+', default=['iso_27001', 'soc_2', 'nist_cybersecurity', 'pci_dss_v4'])
+    parser.add_argument('--templates', nargs='+', default=['standard', 'detailed'])
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='md')
+    parser.add_argument('--workers', nargs='+', type=int,
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Disable the render cache so every run renders from scratch
+    generator = PolicyGenerator(render_cache=None)
+    configs = [
+        config
+        for template_id in args.templates
+        for config in configs_for_all(generator.corpus.index.policy_standards(), args.frameworks, template_id)
+    ]
+
+    print(f"{len(configs)} documents ({args.format}) on {os.cpu_count()} CPUs")
+    print(f"{'engine':<8} {'workers':>7} {'seconds':>9} {'docs/s':>8} {'speedup':>8}")
+    for engine in args.engines:
+        baseline = None
+        for workers in args.workers:
+            elapsed = benchmark(generator, configs, args.format, engine, workers, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{engine:<8} {workers:>7} {elapsed:>9.3f} {len(configs) / elapsed:>8.1f} {baseline / elapsed:>7.2f}x")
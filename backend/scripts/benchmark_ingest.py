@@ -0,0 +1,106 @@
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data_processor import FRAMEWORK_COLUMNS, FRAMEWORK_REF_COLUMNS, DataProcessor
+
+CSV_FILES = ['controls_v2.csv', 'control_guidance.csv', 'erl.csv']
+TEXT_COLUMNS = ['control_description', 'implementation_guidance', 'testing_procedure', 'control_name']
+
+def load_frames(raw_data_path, scale):
+    """Read the raw CSVs, repeating every row ``scale`` times with unique IDs"""
+    frames = [pd.read_csv(raw_data_path / name, encoding='utf-8', na_values=['', 'NA', 'N/A'])
+              for name in CSV_FILES]
+    if scale == 1:
+        return frames
+
+    scaled = []
+    for frame, id_column in zip(frames, ['ccf_id', 'ccf_id', 'reference_id']):
+        copies = []
+        for copy in range(scale):
+            frame_copy = frame.copy()
+            frame_copy[id_column] = frame_copy[id_column].astype(str) + f"-{copy}"
+            copies.append(frame_copy)
+        scaled.append(pd.concat(copies, ignore_index=True))
+    return scaled
+
+def rowwise(processor, controls_df, guidance_df, erl_df):
+    """The original per-cell apply / iterrows ingest, kept as the reference"""
+    for col in TEXT_COLUMNS:
+        if col in guidance_df.columns:
+            guidance_df[col] = guidance_df[col].apply(processor.clean_text_field)
+    guidance_df['audit_artifacts'] = guidance_df['audit_artifacts'].apply(processor.clean_audit_artifacts)
+    for column in controls_df.columns:
+        if column.endswith('_ref'):
+            controls_df[column] = controls_df[column].apply(processor.clean_framework_references)
+        elif column in FRAMEWORK_COLUMNS:
+            controls_df[column] = controls_df[column].apply(
+                lambda x: 'X' if pd.notnull(x) and str(x).strip().upper() == 'X' else None
+            )
+
+    mapping = {}
+    for _, row in controls_df.iterrows():
+        mapping[row['ccf_id']] = {
+            framework: processor.clean_framework_references(row.get(framework))
+            for framework in FRAMEWORK_REF_COLUMNS
+        }
+    erl = {}
+    for _, row in erl_df.iterrows():
+        erl[row['reference_id']] = {
+            'evidence_domain': row['evidence_domain'],
+            'evidence_title': row['evidence_title']
+        }
+    return controls_df.to_dict(orient='records'), guidance_df.to_dict(orient='records'), mapping, erl
+
+def vectorized(processor, controls_df, guidance_df, erl_df):
+    """The column-wise ingest used by DataProcessor.convert_csv_to_json"""
+    for col in TEXT_COLUMNS:
+        if col in guidance_df.columns:
+            guidance_df[col] = processor.clean_text_column(guidance_df[col])
+    guidance_df['audit_artifacts'] = processor.clean_audit_artifacts_column(guidance_df['audit_artifacts'])
+    for column in controls_df.columns:
+        if column.endswith('_ref'):
+            controls_df[column] = processor.clean_framework_reference_column(controls_df[column])
+        elif column in FRAMEWORK_COLUMNS:
+            controls_df[column] = processor.clean_framework_flag_column(controls_df[column])
+    return (controls_df.to_dict(orient='records'), guidance_df.to_dict(orient='records'),
+            processor.create_controls_mapping(controls_df, clean=False), processor.create_erl_mapping(erl_df))
+
+def benchmark(processor, frames, ingest, repeat):
+    """Return the best time of an ingest function and its JSON output"""
+    best, output = None, None
+    for _ in range(repeat):
+        copies = [frame.copy() for frame in frames]
+        started = time.perf_counter()
+        result = ingest(processor, *copies)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        output = [json.dumps(data, indent=2, ensure_ascii=False) for data in result]
+    return best, output
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark row-wise against vectorized CSV ingest')
+    parser.add_argument('--raw', type=Path, default=Path(__file__).parent.parent / 'data' / 'raw')
+    parser.add_argument('--scales', nargs='+', type=int, default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor = DataProcessor(args.raw, None)
+
+    print(f"{'scale':>6} {'controls':>9} {'rowwise s':>10} {'vector s':>10} {'speedup':>8} {'identical':>10}")
+    for scale in args.scales:
+        frames = load_frames(args.raw, scale)
+        rowwise_seconds, expected = benchmark(processor, frames, rowwise, args.repeat)
+        vector_seconds, actual = benchmark(processor, frames, vectorized, args.repeat)
+        print(f"{scale:>6} {len(frames[0]):>9} {rowwise_seconds:>10.3f} {vector_seconds:>10.3f} "
+              f"{rowwise_seconds / vector_seconds:>7.1f}x {str(actual == expected):>10}")
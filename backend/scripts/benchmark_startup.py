@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.corpus import CORPUS_FILES, CORPUS_FORMATS, PROCESSED_DATA_DIR, write_corpus_pack
+from src.corpus_pack import PACK_FILENAME
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Runs in a fresh interpreter, like a web container or batch worker starting up
+COLD_START = """
+import json, time
+started = time.perf_counter()
+from scripts.generate_policy_from_input import PolicyGenerator
+from src.corpus import ControlCorpus
+imported = time.perf_counter()
+corpus = ControlCorpus.load()
+loaded = time.perf_counter()
+PolicyGenerator(corpus=corpus)
+ready = time.perf_counter()
+print(json.dumps({"import": imported - started, "corpus": loaded - imported, "generator": ready - loaded}))
+"""
+
+def cold_start(corpus_format):
+    """Time one interpreter start, in seconds per phase plus the whole process"""
+    env = dict(os.environ, CORPUS_FORMAT=corpus_format, PYTHONPATH=str(BACKEND_DIR))
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', COLD_START], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark cold start with and without the corpus pack')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the corpus pack before measuring')
+    args = parser.parse_args()
+
+    pack_path = PROCESSED_DATA_DIR / PACK_FILENAME
+    if args.rebuild or not pack_path.exists():
+        write_corpus_pack()
+    print(f"corpus pack: {pack_path.stat().st_size} bytes, "
+          f"JSON: {sum((PROCESSED_DATA_DIR / name).stat().st_size for name in CORPUS_FILES.values())} bytes")
+
+    phases = ["import", "corpus", "generator", "process"]
+    print(f"{'format':<8}" + ''.join(f"{phase + ' ms':>14}" for phase in phases))
+    for corpus_format in CORPUS_FORMATS:
+        runs = [cold_start(corpus_format) for _ in range(args.repeat)]
+        medians = [statistics.median(run[phase] for run in runs) * 1000 for phase in phases]
+        print(f"{corpus_format:<8}" + ''.join(f"{median:>14.1f}" for median in medians))
@@ -1,39 +1,39 @@
 import json
 import argparse
-from typing import Dict, List
+import logging
+from typing import Dict, List, Optional
 from datetime import datetime
 from pathlib import Path
 import re
 import sys
-from string import Template
 
 # Add the parent directory to Python path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.templates import PolicyTemplate
+from src.corpus import ControlCorpus, get_corpus
+from src.render_cache import RENDER_CACHE, RenderCache
+from src.batch import ENGINES, OUTPUT_FORMATS, BatchGenerator, configs_for_all, load_config_dir, validate_configs
 from src.document_converter import DocumentConverter
+from src.artifacts import config_digest, write_artifact
+from src.utils.logger import setup_logging
+
+logger = logging.getLogger(__name__)
 
 class PolicyGenerator:
-    def __init__(self, template_path: str = None):
-        """Initialize with both control guidance and mapping data"""
-        # Get the base directory
-        base_dir = Path(__file__).parent.parent
-        
-        # Load control guidance
-        with open(base_dir / 'data/processed/control_guidance.json', 'r') as f:
-            self.control_guidance = json.load(f)
-        
-        # Load control data
-        with open(base_dir / 'data/processed/controls_v2.json', 'r') as f:
-            self.controls_data = json.load(f)
-        
-        # Load control mappings
-        with open(base_dir / 'data/processed/controls_mapping.json', 'r') as f:
-            self.controls_mapping = json.load(f)
-        
-        # Load evidence requirement library
-        with open(base_dir / 'data/processed/erl.json', 'r') as f:
-            self.erl_data = json.load(f)
+    def __init__(self, template_path: str = None, corpus: ControlCorpus = None,
+                 render_cache: Optional[RenderCache] = RENDER_CACHE):
+        """Initialize with the shared control corpus (guidance, controls, mappings and ERL)
+
+        Rendered documents are cached in ``render_cache``; pass None to disable caching.
+        """
+        # Reuse the process-wide corpus instead of re-parsing the JSON files
+        self.corpus = corpus or get_corpus()
+        self.control_guidance = self.corpus.control_guidance
+        self.controls_data = self.corpus.controls_data
+        self.controls_mapping = self.corpus.controls_mapping
+        self.erl_data = self.corpus.erl_data
+        self.render_cache = render_cache
         
         # Initialize template
         self.template = PolicyTemplate
@@ -49,53 +49,36 @@ class PolicyGenerator:
         control_id = control.get("ccf_id")
         if not control_id:
             return False
-            
-        mappings = self.controls_mapping.get(control_id, {})
-        
-        for framework in selected_frameworks:
-            ref_key = f"{framework}_ref"
-            
-            # Check for mappings in either source
-            has_mapping = bool(mappings.get(ref_key)) or bool(control.get(ref_key))
-            
-            if has_mapping:
-                print(f"Control {control_id} matched framework {framework}")
-                return True
-            
-        return False
+        index = self.corpus.index
+        return index.matches_frameworks(control_id, index.framework_mask(selected_frameworks))
 
     def _get_controls_for_domain(self, policy_standard: str, selected_frameworks: List[str]) -> List[Dict]:
         """Get controls for domain that have mappings to selected frameworks"""
         matching_controls = []
-        print(f"\nProcessing controls for {policy_standard}")
         
-        # Get all controls for the domain from control_guidance
-        controls_list = self.control_guidance.get("controls", [])
-        for control in controls_list:
-            if control.get("policy_standard") == policy_standard:
-                # Check framework mappings first
-                if self._control_matches_frameworks(control, selected_frameworks):
-                    # Get evidence details
-                    audit_artifacts = control.get('audit_artifacts', [])
-                    evidence_details = self._get_evidence_details(audit_artifacts)
-                    
-                    # Only enrich control data if it matches frameworks
-                    enriched_control = {
-                        'ccf_id': control.get('ccf_id'),
-                        'control_name': control.get('control_name'),
-                        'control_description': control.get('control_description'),
-                        'implementation_guidance': control.get('implementation_guidance'),
-                        'control_theme': control.get('control_theme'),
-                        'control_type': control.get('control_type'),
-                        'testing_procedure': control.get('testing_procedure'),
-                        'evidence_details': evidence_details
-                    }
-                    matching_controls.append(enriched_control)
-                    print(f"Added control {control.get('ccf_id')} to policy")
-                else:
-                    print(f"Skipped control {control.get('ccf_id')}: no framework mappings")
+        # Compile the selection once, then filter the policy_standard's controls with one AND
+        index = self.corpus.index
+        framework_mask = index.framework_mask(selected_frameworks)
+        for control_id in index.ids_for_policy_matching(policy_standard, framework_mask):
+            control = index.guidance(control_id)
+            # Get evidence details
+            audit_artifacts = control.get('audit_artifacts', [])
+            evidence_details = self._get_evidence_details(audit_artifacts)
+            
+            enriched_control = {
+                'ccf_id': control.get('ccf_id'),
+                'control_name': control.get('control_name'),
+                'control_description': control.get('control_description'),
+                'implementation_guidance': control.get('implementation_guidance'),
+                'control_theme': control.get('control_theme'),
+                'control_type': control.get('control_type'),
+                'testing_procedure': control.get('testing_procedure'),
+                'evidence_details': evidence_details
+            }
+            matching_controls.append(enriched_control)
         
-        print(f"Found {len(matching_controls)} matching controls")
+        logger.debug("Found %d controls for %s matching frameworks %s",
+                     len(matching_controls), policy_standard, selected_frameworks)
         return matching_controls
 
     def _get_framework_references(self, control_id: str, frameworks: List[str]) -> List[str]:
@@ -169,24 +152,19 @@ class PolicyGenerator:
             "".join(separator)
         ]
         
-        # Build consolidated references by control ID
+        # Build consolidated references by control ID from the inverted reference index
+        index = self.corpus.index
         consolidated_refs = {}
         for control in controls:
             control_id = control.get("ccf_id")
             if not control_id:
                 continue
             
-            mappings = self.controls_mapping.get(control_id, {})
-            if control_id not in consolidated_refs:
-                consolidated_refs[control_id] = {fw: [] for fw in frameworks}
-            
-            # Process each framework's references
-            for framework in frameworks:
-                ref_key = f"{framework}_ref"
-                refs = mappings.get(ref_key, [])
-                if refs:
-                    # Sort and deduplicate references
-                    consolidated_refs[control_id][framework] = sorted(set(refs))
+            # References are stored sorted and de-duplicated
+            consolidated_refs[control_id] = {
+                framework: index.mapped_refs(control_id, framework)
+                for framework in frameworks
+            }
         
         # Generate table rows
         for control_id in sorted(consolidated_refs.keys()):
@@ -230,7 +208,7 @@ class PolicyGenerator:
             }
             
             # Render control section
-            control_section = Template(PolicyTemplate.CONTROL_SECTION_TEMPLATE).substitute(control_data)
+            control_section = PolicyTemplate.CONTROL_SECTION.substitute(control_data)
             control_sections.append(control_section)
         
         return '\n\n'.join(control_sections)
@@ -241,7 +219,7 @@ class PolicyGenerator:
         selected_frameworks = config.get("selected_frameworks", [])
         template_id = config.get("template_id", "standard")
         
-        print(f"Generating policy with template: {template_id}")  # Debug log
+        logger.debug("Generating %s with template: %s", policy_standard, template_id)
         
         # Get controls and sort them
         controls = self._get_controls_for_domain(policy_standard, selected_frameworks)
@@ -274,65 +252,97 @@ class PolicyGenerator:
 
     def _get_all_framework_references(self, controls: List[Dict], frameworks: List[str]) -> List[str]:
         """Get all framework references for controls"""
-        # Dictionary to store consolidated references
-        consolidated_refs = {}
-        
-        for control in controls:
-            control_id = control.get("ccf_id")
-            if not control_id:
-                continue
-                
-            if control_id in self.controls_mapping:
-                control_data = self.controls_mapping[control_id]
-                for framework in frameworks:
-                    framework_field = self._get_framework_field(framework)
-                    refs = control_data.get(framework_field, [])
-                    if refs:
-                        framework_name = self._format_framework_name(framework)
-                        # Create key for control-framework pair
-                        key = (control_id, framework_name)
-                        if key not in consolidated_refs:
-                            consolidated_refs[key] = []
-                        consolidated_refs[key].extend(refs)
+        index = self.corpus.index
+        control_ids = sorted({control.get("ccf_id") for control in controls if control.get("ccf_id")})
+        framework_names = sorted((self._format_framework_name(framework), framework) for framework in set(frameworks))
         
-        # Format into table rows
+        # Format into table rows, sorted by control ID and framework
         table_rows = []
-        # Sort by control ID and framework
-        for (control_id, framework), refs in sorted(consolidated_refs.items()):
-            # Remove duplicates and sort references
-            unique_refs = sorted(set(refs))
-            ref_string = ', '.join(unique_refs)
-            table_rows.append(f"| {control_id} | {framework} | {ref_string} |")
+        for control_id in control_ids:
+            for framework_name, framework in framework_names:
+                # References are stored sorted and de-duplicated
+                refs = index.mapped_refs(control_id, framework)
+                if refs:
+                    table_rows.append(f"| {control_id} | {framework_name} | {', '.join(refs)} |")
         
         return table_rows
 
-    def generate_policy(self, config: Dict, output_format: str = 'md'):
-        """Generate policy and save to file"""
-        # Generate markdown content
-        md_content = self.generate_policy_markdown(config)
-        
-        # Create output directory with proper permissions
-        output_dir = Path("output/policies")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate base filename (include template_id in filename)
+    def _cache_key(self, config: Dict, output_format: str = 'md') -> tuple:
+        """Build the render cache key for a config against this generator's corpus"""
+        return RenderCache.make_key(config, self.corpus.version, output_format,
+                                    datetime.now().strftime("%Y-%m-%d"), self._template_hash(config))
+
+    def _template_hash(self, config: Dict) -> str:
+        return self.template.content_hash(config.get("template_id", "standard"))
+
+    def generate_policy_markdown_cached(self, config: Dict) -> str:
+        """Generate markdown content, reusing a cached render of the same config"""
+        if self.render_cache is None:
+            return self.generate_policy_markdown(config)
+        
+        key = self._cache_key(config)
+        md_content = self.render_cache.get(key)
+        if md_content is None:
+            md_content = self.generate_policy_markdown(config)
+            self.render_cache.put(key, md_content)
+        return md_content
+
+    def policy_filename(self, config: Dict, extension: str) -> str:
+        """Return the output filename for a config
+
+        Besides template_id and date, the name carries a digest of the
+        canonical config and data version, so different framework selections
+        never share a file and an existing file is always up to date.
+        """
         domain_name = config["policy_standard"].lower().replace(" ", "_")
         template_id = config.get("template_id", "standard")
         current_date = datetime.now().strftime("%Y%m%d")
-        base_filename = f"{domain_name}_{template_id}_{current_date}"
-        
-        # Save markdown first
-        md_path = output_dir / f"{base_filename}.md"
-        with open(md_path, "w", encoding="utf-8") as f:
-            f.write(md_content)
-        
-        if output_format.lower() == 'docx':
-            # Convert markdown to Word
-            docx_path = output_dir / f"{base_filename}.docx"
+        digest = config_digest(config, self.corpus.version, self._template_hash(config))
+        return f"{domain_name}_{template_id}_{current_date}_{digest}.{extension}"
+
+    def generate_policy_docx(self, config: Dict, md_content: Optional[str] = None) -> bytes:
+        """Generate the Word document for a config, reusing a cached conversion"""
+        docx_key = self._cache_key(config, 'docx')
+        docx_content = self.render_cache.get(docx_key) if self.render_cache is not None else None
+        if docx_content is None:
+            if md_content is None:
+                md_content = self.generate_policy_markdown_cached(config)
             converter = DocumentConverter()
-            output_path = converter.markdown_to_docx(md_path, docx_path)
-            return str(output_path)
+            docx_content = converter.markdown_to_docx_bytes(md_content)
+            if self.render_cache is not None:
+                self.render_cache.put(docx_key, docx_content)
+        return docx_content
+
+    def generate_policy_bytes(self, config: Dict, output_format: str = 'md') -> bytes:
+        """Generate the policy document entirely in memory"""
+        if output_format.lower() == 'docx':
+            return self.generate_policy_docx(config)
+        return self.generate_policy_markdown_cached(config).encode('utf-8')
+
+    def generate_policy(self, config: Dict, output_format: str = 'md', output_dir: Path = Path("output/policies")):
+        """Generate policy and save to file (the markdown is always saved alongside a docx)
+
+        Files are content-addressed and written atomically; if the requested
+        artifacts already exist, generation is skipped.
+        """
+        output_dir = Path(output_dir)
+        md_path = output_dir / self.policy_filename(config, 'md')
+        docx_path = output_dir / self.policy_filename(config, 'docx')
+        wants_docx = output_format.lower() == 'docx'
+        
+        if md_path.exists() and (not wants_docx or docx_path.exists()):
+            logger.info("Reusing existing policy artifact: %s", docx_path if wants_docx else md_path)
+        else:
+            # Save markdown first
+            md_content = self.generate_policy_markdown_cached(config)
+            write_artifact(md_path, md_content.encode('utf-8'))
+            
+            if wants_docx:
+                # Convert markdown to Word
+                write_artifact(docx_path, self.generate_policy_docx(config, md_content))
         
+        if wants_docx:
+            return str(docx_path.resolve())
         return str(md_path)
 
     def _get_evidence_details(self, evidence_ids: List[str]) -> List[Dict[str, str]]:
@@ -349,35 +359,21 @@ class PolicyGenerator:
 
     def _get_reverse_framework_references(self, controls: List[Dict], frameworks: List[str]) -> List[str]:
         """Get reverse framework mapping (framework ref -> controls)"""
-        # Dictionary to store reverse mappings
-        reverse_refs = {}
+        index = self.corpus.index
+        control_ids = {control.get("ccf_id") for control in controls if control.get("ccf_id")}
+        framework_names = sorted((self._format_framework_name(framework), framework) for framework in set(frameworks))
         
-        for control in controls:
-            control_id = control.get("ccf_id")
-            if not control_id or control_id not in self.controls_mapping:
-                continue
-                
-            control_data = self.controls_mapping[control_id]
-            for framework in frameworks:
-                framework_field = self._get_framework_field(framework)
-                refs = control_data.get(framework_field, [])
-                if refs:
-                    framework_name = self._format_framework_name(framework)
-                    # For each reference, store the control ID
-                    for ref in refs:
-                        key = (framework_name, ref)
-                        if key not in reverse_refs:
-                            reverse_refs[key] = []
-                        reverse_refs[key].append(control_id)
-        
-        # Format into table rows
+        # Format into table rows, sorted by framework and reference
         table_rows = []
-        # Sort by framework and reference
-        for (framework, ref), controls in sorted(reverse_refs.items()):
-            # Remove duplicates and sort controls
-            unique_controls = sorted(set(controls))
-            controls_string = ', '.join(unique_controls)
-            table_rows.append(f"| {framework} | {ref} | {controls_string} |")
+        for framework_name, framework in framework_names:
+            refs = set()
+            for control_id in control_ids:
+                refs.update(index.mapped_refs(control_id, framework))
+            
+            for ref in sorted(refs):
+                # Slice the inverted index down to the controls in this policy
+                ref_controls = [cid for cid in index.controls_for_ref(framework, ref) if cid in control_ids]
+                table_rows.append(f"| {framework_name} | {ref} | {', '.join(ref_controls)} |")
         
         return table_rows
 
@@ -385,12 +381,52 @@ class PolicyGenerator:
         """Generate policy document based on configuration"""
         template_id = config.get('template_id', 'standard')
         # ... rest of the existing generation logic ...
-        return PolicyTemplate.render(template_data, template_id)
+        return self.template.render(template_data, template_id)
+
+def run_batch(args) -> None:
+    """Render many configs (--all or --configs) to a directory or zip archive"""
+    generator = PolicyGenerator()
+    try:
+        if args.all:
+            if not args.frameworks:
+                print("Error: --all requires --frameworks")
+                exit(1)
+            configs = configs_for_all(generator.corpus.index.policy_standards(), args.frameworks, args.template)
+        else:
+            configs = load_config_dir(args.configs)
+        validate_configs(configs)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+    batch = BatchGenerator(generator, workers=args.workers, engine=args.engine)
+    output = Path(args.output or f"output/batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    if output.suffix.lower() == '.zip':
+        batch.write_zip(configs, output, args.format)
+        print(f"Generated {len(configs)} policies into archive: {output}")
+    else:
+        manifest = batch.write_directory(configs, output, args.format)
+        print(f"Generated {len(configs) - manifest['failed']} of {len(configs)} policies "
+              f"in {manifest['total_seconds']}s into: {output}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Generate policy document from configuration')
-    parser.add_argument('config_file', help='Path to the configuration JSON file')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('config_file', nargs='?', help='Path to the configuration JSON file')
+    source.add_argument('--all', action='store_true', help='Generate every policy standard for --frameworks')
+    source.add_argument('--configs', metavar='DIR', help='Generate every *.json configuration in a directory')
+    parser.add_argument('--frameworks', nargs='+', help='Frameworks to map when using --all')
+    parser.add_argument('--template', default='standard', help='Template ID to use with --all')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='md', help='Output format')
+    parser.add_argument('--output', help='Output directory, or a .zip path, for batch runs')
+    parser.add_argument('--workers', type=int, help='Number of parallel workers for batch runs')
+    parser.add_argument('--engine', choices=ENGINES, help='Run batch workers as threads or processes')
     args = parser.parse_args()
+    setup_logging()
+
+    if args.all or args.configs:
+        run_batch(args)
+        exit(0)
 
     # Validate and resolve the config file path securely
     config_path = Path(args.config_file).resolve()
@@ -424,7 +460,7 @@ if __name__ == "__main__":
     # Create policy generator and generate policy
     generator = PolicyGenerator()
     try:
-        output_file = generator.generate_policy(config)
+        output_file = generator.generate_policy(config, args.format)
         print(f"Policy generated and saved to: {output_file}")
     except Exception as e:
         print(f"Error generating policy: {str(e)}")
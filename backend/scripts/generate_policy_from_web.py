@@ -3,13 +3,14 @@ import sys
 import os
 from pathlib import Path
 import base64
-import time
 from datetime import datetime, timedelta
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from itertools import chain
 
 # Add the parent directory to Python path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
 from flask_swagger_ui import get_swaggerui_blueprint
 from src.templates import PolicyTemplate
@@ -20,13 +21,26 @@ import logging
 
 # Configure secure logging (no stack traces to users)
 logger = logging.getLogger(__name__)
-import tempfile
+from src.utils.logger import logging_configured, setup_logging
+if not logging_configured():
+    # Non-blocking, level-gated logging; see setup_logging for LOG_LEVEL / LOG_LEVELS / LOG_FORMAT
+    setup_logging()
 from pathlib import Path
 from src.framework_mapper import FrameworkMapper
+from src.corpus_manager import get_corpus_manager
+from src.control_cover import solve_cover
+from src.render_cache import RENDER_CACHE
+from src.conversion_service import ConversionBusyError, get_conversion_service
+from src.batch import OUTPUT_FORMATS, BatchGenerator, configs_for_all, validate_configs
+from src.job_queue import DONE, JobQueueFullError, get_job_queue
+from src.artifacts import mapping_digest, write_artifact
 
 # Get base URL from environment variable with fallback for local development
 BASE_URL = os.getenv('BASE_URL', 'http://localhost:5000')
 
+# Generation runs in memory; set OUTPUT_DIR to also keep a copy of each document on disk
+OUTPUT_DIR = Path(os.environ['OUTPUT_DIR']) if os.getenv('OUTPUT_DIR') else None
+
 # Set up paths
 BACKEND_DIR = Path(__file__).parent.parent
 STATIC_DIR = BACKEND_DIR / 'static'
@@ -63,17 +77,27 @@ CORS(app, resources={
     }
 })
 
-# Debug print to verify paths
-print("Static folder path:", app.static_folder)
-print("Template folder path:", app.template_folder)
+logger.debug("Static folder path: %s, template folder path: %s", app.static_folder, app.template_folder)
 
 # After creating the Flask app
 PolicyTemplate.load_templates()
 
+# Load the CCF data once at startup and watch data/processed for new data.
+# Each request takes one snapshot (CORPUS_MANAGER.current) and uses it throughout,
+# so a reload never changes the data under a request in flight.
+CORPUS_MANAGER = get_corpus_manager().start()
+logger.info("Loaded control corpus version: %s", CORPUS_MANAGER.current.version)
+
+# Resolve pandoc and start the DOCX conversion workers before the first request
+try:
+    get_conversion_service().start()
+except OSError as e:
+    logger.warning(f"Pandoc not available, DOCX conversion disabled: {str(e)}")
+
 # Debug logging for static files
 @app.after_request
 def after_request(response):
-    print(f"Request: {request.path} -> Status: {response.status_code}")
+    logger.debug("Request: %s -> Status: %s", request.path, response.status_code)
     return response
 
 # Update security headers to use BASE_URL
@@ -102,35 +126,170 @@ def add_security_headers(response):
     
     return response
 
-def generate_policy_from_web_config(config_data, output_format='md'):
+def busy_response(error):
+    """Tell the client to retry when the conversion queue is full"""
+    response = jsonify({"error": str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
+CONTENT_TYPES = {
+    'md': 'text/markdown',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+}
+
+# Map Accept header media types back to output formats
+RAW_FORMATS = {content_type: output_format for output_format, content_type in CONTENT_TYPES.items()}
+
+# Documents larger than this are sent with chunked transfer encoding
+STREAM_THRESHOLD = int(os.getenv('STREAM_THRESHOLD_BYTES', str(1024 * 1024)))
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def requested_raw_format():
+    """Return 'md' or 'docx' if the Accept header explicitly asks for raw bytes
+
+    Wildcards and application/json keep the legacy JSON envelope, so existing
+    browser clients (which send */*) are unaffected.
+    """
+    for content_type, quality in request.accept_mimetypes:
+        if not quality:
+            continue
+        if content_type == 'application/json':
+            return None
+        if content_type in RAW_FORMATS:
+            return RAW_FORMATS[content_type]
+    return None
+
+def iter_chunks(content):
+    """Yield content in fixed-size slices without copying it"""
+    view = memoryview(content)
+    for start in range(0, len(view), STREAM_CHUNK_SIZE):
+        yield view[start:start + STREAM_CHUNK_SIZE]
+
+def iter_encoded(pieces):
+    """Encode streamed text pieces, yielding them in chunks of about STREAM_CHUNK_SIZE bytes"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        data = piece.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= STREAM_CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+def mapping_response(config_data, corpus, filename):
+    """Stream a markdown framework mapping to the client while its rows are rendered"""
+    pieces = FrameworkMapper(corpus=corpus).iter_mapping(config_data['selected_frameworks'])
+    # Controls are collected before the first piece, so errors still reach the endpoint's handler
+    first = next(pieces)
+    headers = {'Content-Disposition': f'attachment; filename={filename}', 'Vary': 'Accept'}
+    return Response(iter_encoded(chain([first], pieces)), mimetype=CONTENT_TYPES['md'], headers=headers)
+
+def document_response(content, output_format, filename):
+    """Send document bytes with their real content type
+
+    Small documents get a Content-Length; larger ones are streamed in
+    chunks so the WSGI server can start sending before it buffers the body.
+    """
+    headers = {'Content-Disposition': f'attachment; filename={filename}', 'Vary': 'Accept'}
+    if len(content) > STREAM_THRESHOLD:
+        return Response(iter_chunks(content), mimetype=CONTENT_TYPES[output_format], headers=headers)
+    return Response(content, mimetype=CONTENT_TYPES[output_format], headers=headers)
+
+def describe_config(config_data):
+    """Summarize a generation request for the logs without echoing its whole body"""
+    if not isinstance(config_data, dict):
+        return type(config_data).__name__
+    return {key: config_data[key] for key in ('policy_standard', 'selected_frameworks', 'template_id')
+            if key in config_data}
+
+def is_framework_mapping(config_data):
+    """Framework-only requests select frameworks without a policy standard"""
+    return 'selected_frameworks' in config_data and 'policy_standard' not in config_data
+
+def mapping_filename(config_data, output_format, corpus):
+    """Return the filename of a framework mapping, addressed by its frameworks and data version"""
+    digest = mapping_digest(config_data['selected_frameworks'], corpus.version)
+    return f"framework_mapping_{datetime.now().strftime('%Y%m%d')}_{digest}.{output_format}"
+
+def document_filename(config_data, output_format, corpus):
+    """Return the download filename for a policy or framework mapping"""
+    if is_framework_mapping(config_data):
+        return mapping_filename(config_data, output_format, corpus)
+    return PolicyGenerator(corpus=corpus).policy_filename(config_data, output_format)
+
+def render_document(config_data, output_format, corpus):
+    """Render a policy or framework mapping from a corpus snapshot straight to document bytes"""
+    if is_framework_mapping(config_data):
+        markdown_content = FrameworkMapper(corpus=corpus).generate_mapping(
+            selected_frameworks=config_data['selected_frameworks']
+        )
+        if output_format == 'docx':
+            return DocumentConverter().markdown_to_docx_bytes(markdown_content)
+        return markdown_content.encode('utf-8')
+    
+    return PolicyGenerator(corpus=corpus).generate_policy_bytes(config_data, output_format)
+
+def save_document(content, filename):
+    """Optionally persist a generated document when OUTPUT_DIR is configured"""
+    if OUTPUT_DIR is None:
+        return None
+    path = OUTPUT_DIR / filename
+    write_artifact(path, content)
+    return path
+
+def job_status(job):
+    """Describe a job with links for polling and downloading"""
+    status = job.to_dict()
+    status["status_url"] = f"/api/jobs/{job.id}"
+    if job.status == DONE:
+        status["download_url"] = f"/api/jobs/{job.id}/download"
+    return status
+
+def submit_generation_job(config_data, output_format):
+    """Queue generation in the background and answer 202 with the job id"""
+    if output_format not in CONTENT_TYPES:
+        return jsonify({"error": "Invalid format. Use 'md' or 'docx'"}), 400
+    if 'policy_standard' not in config_data and 'selected_frameworks' not in config_data:
+        return jsonify({"error": "policy_standard or selected_frameworks is required"}), 400
+    
+    # The job renders from the data that was live when it was submitted
+    corpus = CORPUS_MANAGER.current
     try:
-        print(f"Received config: {config_data}")  # Debug log
-        generator = PolicyGenerator()
-        output_file = generator.generate_policy(config_data, output_format)
-        
-        print(f"Generated file: {output_file}")  # Debug log
-        
-        # Get the filename from the output path
-        filename = Path(output_file).name
-        
-        try:
-            with open(output_file, 'rb' if output_format == 'docx' else 'r') as f:
-                content = f.read()
-        except PermissionError:
-            # If permission error, add small delay and retry
-            time.sleep(0.5)
-            with open(output_file, 'rb' if output_format == 'docx' else 'r') as f:
-                content = f.read()
+        job = get_job_queue().submit(
+            lambda: render_document(config_data, output_format, corpus),
+            document_filename(config_data, output_format, corpus),
+            CONTENT_TYPES[output_format]
+        )
+    except JobQueueFullError as e:
+        return busy_response(e)
+    
+    logger.info("Queued generation job %s", job.id)
+    return jsonify(job_status(job)), 202
+
+def generate_policy_from_web_config(config_data, output_format='md', corpus=None):
+    try:
+        corpus = corpus or CORPUS_MANAGER.current
+        filename = document_filename(config_data, output_format, corpus)
+        content = render_document(config_data, output_format, corpus)
+        save_document(content, filename)
         
         return {
             "success": True,
-            "content": content if output_format == 'md' else base64.b64encode(content).decode(),
+            "content": content.decode('utf-8') if output_format == 'md' else base64.b64encode(content).decode(),
             "format": output_format,
             "filename": filename,
             "message": f"Successfully generated policy for {config_data['policy_standard']} using template {config_data.get('template_id', 'standard')}"
         }
+    except ConversionBusyError:
+        # Let the endpoint answer with 503 so clients back off
+        raise
     except Exception as e:
-        print(f"Error generating policy: {str(e)}")  # Debug log
+        logger.error("Error generating policy: %s", e)
         return {"error": str(e)}
 
 @app.route('/')
@@ -162,64 +321,54 @@ def generate_policy_endpoint():
     try:
         config_data = request.json
         output_format = request.args.get('format', 'md').lower()
-        print(f"\n=== Starting Generate Request ===")
-        print(f"Config data: {config_data}")
-        print(f"Output format: {output_format}")
+        corpus = CORPUS_MANAGER.current
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Generate request: %s, format %s", describe_config(config_data), output_format)
+        
+        # Async mode: answer immediately with a job id instead of blocking on conversion
+        if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+            return submit_generation_job(config_data, output_format)
+        
+        # Clients that accept the document type directly get raw bytes, not base64 JSON
+        raw_format = requested_raw_format()
+        if raw_format:
+            filename = document_filename(config_data, raw_format, corpus)
+            if raw_format == 'md' and is_framework_mapping(config_data) and OUTPUT_DIR is None:
+                return mapping_response(config_data, corpus, filename)
+            content = render_document(config_data, raw_format, corpus)
+            save_document(content, filename)
+            return document_response(content, raw_format, filename)
         
         # Check if this is a framework-only mapping request
         if 'selected_frameworks' in config_data and 'policy_standard' not in config_data:
             try:
-                print("\n=== Framework Mapping Flow ===")
-                
                 # Create framework mapper instead of policy generator
-                mapper = FrameworkMapper()
-                print("FrameworkMapper initialized successfully")
-                
+                mapper = FrameworkMapper(corpus=corpus)
                 converter = DocumentConverter()
-                print("DocumentConverter initialized successfully")
                 
                 # Generate markdown content
-                print(f"\nGenerating mapping for frameworks: {config_data['selected_frameworks']}")
                 markdown_content = mapper.generate_mapping(
                     selected_frameworks=config_data['selected_frameworks']
                 )
-                print("Markdown content generated successfully")
                 
                 if output_format == 'docx':
-                    print("\n=== DOCX Conversion Flow ===")
-                    # Create temporary markdown file
-                    with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as temp_md:
-                        temp_md.write(markdown_content)
-                        temp_md_path = Path(temp_md.name)
-                        print(f"Temporary markdown file created: {temp_md_path}")
-                    
-                    # Convert to DOCX using existing converter
-                    docx_path = converter.markdown_to_docx(temp_md_path)
-                    print(f"DOCX file generated: {docx_path}")
-                    
-                    # Read the generated DOCX
-                    with open(docx_path, 'rb') as f:
-                        docx_content = f.read()
-                    print("DOCX content read successfully")
-                    
-                    # Clean up temporary files
-                    temp_md_path.unlink()
-                    docx_path.unlink()
-                    print("Temporary files cleaned up")
+                    # Convert in memory through the pandoc worker pool (no temp files)
+                    docx_content = converter.markdown_to_docx_bytes(markdown_content)
                     
                     return jsonify({
                         "success": True,
                         "content": base64.b64encode(docx_content).decode(),
                         "format": "docx",
-                        "filename": f"framework_mapping_{datetime.now().strftime('%Y%m%d')}.docx"
+                        "filename": mapping_filename(config_data, 'docx', corpus)
                     })
                 else:
-                    print("\nReturning markdown content")
                     return jsonify({
                         "success": True,
                         "content": markdown_content,
                         "format": "md"
                     })
+            except ConversionBusyError as e:
+                return busy_response(e)
             except Exception as e:
                 logger.error(f"Error in Framework Mapping: {type(e).__name__}: {str(e)}", exc_info=True)
                 return jsonify({"error": "An error occurred during framework mapping. Please check your input and try again."})
@@ -228,12 +377,208 @@ def generate_policy_endpoint():
         if output_format not in ['md', 'docx']:
             return jsonify({"error": "Invalid format. Use 'md' or 'docx'"})
         
-        result = generate_policy_from_web_config(config_data, output_format)
+        result = generate_policy_from_web_config(config_data, output_format, corpus)
         return jsonify(result)
+    except ConversionBusyError as e:
+        return busy_response(e)
     except Exception as e:
         logger.error(f"Error in Generate Endpoint: {type(e).__name__}: {str(e)}", exc_info=True)
         return jsonify({"error": "An error occurred during policy generation. Please check your input and try again."})
 
+@app.route('/api/generate/batch', methods=['POST'])
+def generate_batch_endpoint():
+    """Render many policies in one call and stream them back as a zip archive with a manifest"""
+    corpus = CORPUS_MANAGER.current
+    try:
+        body = request.json or {}
+        output_format = str(body.get('format', request.args.get('format', 'md'))).lower()
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError("Invalid format. Use 'md' or 'docx'")
+        
+        if body.get('all'):
+            configs = configs_for_all(
+                corpus.index.policy_standards(),
+                body.get('selected_frameworks', []),
+                body.get('template_id', 'standard')
+            )
+        else:
+            configs = body.get('configs')
+        validate_configs(configs)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    logger.info("Batch request: %d configs, format %s", len(configs), output_format)
+    batch = BatchGenerator(PolicyGenerator(corpus=corpus))
+    filename = f"policies_{datetime.now().strftime('%Y%m%d')}.zip"
+    return Response(
+        batch.iter_zip(configs, output_format),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the status of a background generation job"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found or expired"}), 404
+    return jsonify(job_status(job))
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+def download_job(job_id):
+    """Stream the raw document bytes of a finished job"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found or expired"}), 404
+    if job.status != DONE:
+        return jsonify(job_status(job)), 409
+    
+    return document_response(job.result, RAW_FORMATS[job.content_type], job.filename)
+
+@app.route('/api/frameworks/<framework>/refs', methods=['GET'])
+def get_framework_refs(framework):
+    """List all references of a framework that map to CCF controls"""
+    corpus = CORPUS_MANAGER.current
+    refs = corpus.index.refs_for_framework(framework)
+    if not refs:
+        return jsonify({"error": f"Framework {framework} not found"}), 404
+    
+    return jsonify({
+        "framework": framework,
+        "framework_name": FrameworkMapper(corpus=corpus).get_friendly_name(framework),
+        "refs": list(refs)
+    })
+
+@app.route('/api/frameworks/<framework>/refs/<path:ref>', methods=['GET'])
+def get_framework_ref_controls(framework, ref):
+    """Return the CCF controls that satisfy a framework reference"""
+    corpus = CORPUS_MANAGER.current
+    index = corpus.index
+    if not index.refs_for_framework(framework):
+        return jsonify({"error": f"Framework {framework} not found"}), 404
+    
+    control_ids = index.controls_for_ref(framework, ref)
+    if not control_ids:
+        return jsonify({"error": f"Reference {ref} not found for framework {framework}"}), 404
+    
+    controls = []
+    for control_id in control_ids:
+        guidance = index.guidance(control_id) or {}
+        controls.append({
+            "ccf_id": control_id,
+            "control_name": guidance.get('control_name', ''),
+            "policy_standard": guidance.get('policy_standard', 'N/A')
+        })
+    
+    return jsonify({
+        "framework": framework,
+        "framework_name": FrameworkMapper(corpus=corpus).get_friendly_name(framework),
+        "reference": ref,
+        "controls": controls
+    })
+
+@app.route('/api/coverage', methods=['GET'])
+def get_coverage():
+    """Report framework coverage from the corpus' precomputed controls x frameworks matrix
+
+    Query parameters: ``frameworks`` (comma-separated, default all),
+    ``policy_standard`` (limit the per-policy breakdown) and ``minimal``
+    (also pick a small control set covering every reference of the frameworks).
+    """
+    corpus = CORPUS_MANAGER.current
+    coverage = corpus.coverage
+    frameworks = [name.strip() for name in request.args.get('frameworks', '').split(',') if name.strip()]
+    frameworks = list(dict.fromkeys(frameworks)) or list(coverage.frameworks)
+    unknown = [name for name in frameworks if name not in coverage.frameworks]
+    if unknown:
+        return jsonify({"error": f"Unknown frameworks: {', '.join(unknown)}"}), 400
+    policy_standard = request.args.get('policy_standard')
+    if policy_standard is not None and policy_standard not in coverage.policy_standards:
+        return jsonify({"error": f"Policy standard {policy_standard} not found"}), 404
+
+    total = len(coverage.control_ids)
+    mapper = FrameworkMapper(corpus=corpus)
+    result = {
+        "corpus_version": corpus.version,
+        "controls": total,
+        "frameworks": {
+            framework: {
+                "name": mapper.get_friendly_name(framework),
+                "controls": count,
+                "percent": round(count / total * 100, 1) if total else 0.0,
+            }
+            for framework, count in coverage.framework_counts(frameworks).items()
+        },
+        "covered_by_any": coverage.any_coverage(frameworks),
+        "overlap": coverage.overlap(frameworks),
+        "policy_standards": coverage.policy_coverage(frameworks, policy_standard),
+    }
+    if request.args.get('minimal', '').lower() in ('1', 'true', 'yes'):
+        result["minimal_control_set"] = coverage.minimal_controls(frameworks)
+    return jsonify(result)
+
+@app.route('/api/coverage/minimal-controls', methods=['GET'])
+def get_minimal_controls():
+    """Return a small set of controls satisfying every reference of the selected frameworks
+
+    Query parameters: ``frameworks`` (comma-separated, default all) and
+    ``exact`` (default true; false skips the exact refinement).
+    """
+    corpus = CORPUS_MANAGER.current
+    index = corpus.index
+    frameworks = [name.strip() for name in request.args.get('frameworks', '').split(',') if name.strip()]
+    frameworks = list(dict.fromkeys(frameworks)) or list(index.frameworks)
+    unknown = [name for name in frameworks if name not in index.frameworks]
+    if unknown:
+        return jsonify({"error": f"Unknown frameworks: {', '.join(unknown)}"}), 400
+    exact = request.args.get('exact', 'true').lower() not in ('0', 'false', 'no')
+
+    result = solve_cover(index, frameworks, exact=exact).to_dict()
+    controls = []
+    for control_id in result["controls"]:
+        guidance = index.guidance(control_id) or {}
+        controls.append({
+            "ccf_id": control_id,
+            "control_name": guidance.get('control_name', ''),
+            "policy_standard": guidance.get('policy_standard', 'N/A')
+        })
+    result["controls"] = controls
+    result["corpus_version"] = corpus.version
+    return jsonify(result)
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Return rendered-document cache hit/miss counters"""
+    return jsonify(RENDER_CACHE.stats())
+
+@app.route('/api/admin/reload', methods=['POST'])
+def reload_corpus():
+    """Load data/processed in the background and swap in the new corpus once it is indexed
+
+    Requests already running keep the snapshot they started with. Answers
+    202 if the reload takes longer than ?timeout= seconds (default 30).
+    """
+    try:
+        timeout = float(request.args.get('timeout', '30'))
+    except ValueError:
+        return jsonify({"error": "timeout must be a number of seconds"}), 400
+    
+    reload = CORPUS_MANAGER.reload()
+    try:
+        result = reload.result(timeout=timeout)
+    except FuturesTimeoutError:
+        return jsonify({"status": "reloading", **CORPUS_MANAGER.stats()}), 202
+    if result.get("error"):
+        logger.error(f"Corpus reload failed: {result['error']}")
+        return jsonify({"error": "Reloading the processed data failed; the previous data is still served",
+                        "version": result["version"]}), 500
+    return jsonify({**result, **CORPUS_MANAGER.stats()})
+
+@app.route('/api/admin/corpus', methods=['GET'])
+def get_corpus_status():
+    """Report the live corpus version and reload state"""
+    return jsonify(CORPUS_MANAGER.stats())
+
 @app.route('/templates', methods=['GET'])
 def get_templates():
     """Return available templates with metadata"""
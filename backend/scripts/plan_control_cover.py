@@ -0,0 +1,52 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add the project root directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.control_cover import EXACT_MAX_CANDIDATES, solve_cover
+from src.corpus import ControlCorpus
+
+def main():
+    """Print a small set of CCF controls that satisfies every reference of the given frameworks"""
+    parser = argparse.ArgumentParser(description='Plan the controls needed to cover several frameworks')
+    parser.add_argument('frameworks', nargs='*', help='Framework IDs, e.g. soc_2 iso_27001 pci_dss_v4 (default all)')
+    parser.add_argument('--data', type=Path, default=None, help='Processed data directory')
+    parser.add_argument('--no-exact', action='store_true', help='Greedy selection only, skip the exact refinement')
+    parser.add_argument('--exact-max-candidates', type=int, default=EXACT_MAX_CANDIDATES,
+                        help='Largest number of candidate controls the exact refinement searches')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+    parser.add_argument('--list', action='store_true', help='List the available framework IDs')
+    args = parser.parse_args()
+
+    corpus = ControlCorpus.load(args.data)
+    index = corpus.index
+    if args.list:
+        for framework in index.frameworks:
+            print(framework)
+        return
+
+    frameworks = args.frameworks or list(index.frameworks)
+    unknown = [framework for framework in frameworks if framework not in index.frameworks]
+    if unknown:
+        parser.error(f"unknown frameworks: {', '.join(unknown)} (see --list)")
+
+    cover = solve_cover(index, frameworks, exact=not args.no_exact, exact_max_candidates=args.exact_max_candidates)
+    if args.json:
+        print(json.dumps(cover.to_dict(), indent=2))
+        return
+
+    print(f"{len(cover.controls)} controls cover {cover.covered} of {cover.requirements} requirements"
+          f" ({'minimal' if cover.optimal else 'greedy'})")
+    for framework, counts in cover.coverage.items():
+        print(f"  {framework}: {counts['covered']}/{counts['requirements']}")
+    print()
+    for control_id in cover.controls:
+        guidance = index.guidance(control_id) or {}
+        print(f"{control_id}\t{guidance.get('policy_standard', 'N/A')}\t{guidance.get('control_name', '')}")
+
+if __name__ == "__main__":
+    main()
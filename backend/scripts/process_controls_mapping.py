@@ -1,12 +1,16 @@
 import sys
 import json
 import csv
+import argparse
 from pathlib import Path
 
 # Add the project root directory to Python path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+from src.artifacts import atomic_open
+from src.data_processor import OUTPUT_LAYOUTS
+
 def process_ref_field(value):
     """Convert reference field string to array if it contains values"""
     if not value:
@@ -22,41 +26,50 @@ def process_ref_field(value):
                 refs.append(item)
     return refs
 
-def process_controls_mapping():
-    """Process controls_mapping_check.csv to JSON format"""
-    # Setup hardcoded paths
-    input_file = project_root / 'data/raw/controls_mapping_check.csv'
-    output_file = project_root / 'data/processed/controls_mapping_check.json'
+def process_row(row):
+    """Convert reference fields to arrays and strip the remaining values of a CSV row"""
+    for key in row:
+        if key.endswith('_ref'):
+            row[key] = process_ref_field(row[key])
+        elif row[key] == 'X':  # Handle framework fields
+            row[key] = 'X'
+        elif not row[key]:  # Handle empty fields
+            row[key] = ''
+        else:
+            row[key] = row[key].strip()
+    return row
+
+def iter_controls(input_file):
+    """Yield processed rows one at a time so large catalogs never sit in memory whole"""
+    with open(input_file, 'r', encoding='utf-8') as csv_file:
+        for row in csv.DictReader(csv_file):
+            yield process_row(row)
+
+def process_controls_mapping(input_file=None, output_file=None, layout='json'):
+    """Process controls_mapping_check.csv to JSON format
+    
+    The "json" layout writes {"controls": [...]} in one document; "jsonl"
+    streams one control per line while the CSV is read.
+    """
+    # Default to the hardcoded paths
+    input_file = Path(input_file or project_root / 'data/raw/controls_mapping_check.csv')
+    output_file = Path(output_file or project_root / f'data/processed/controls_mapping_check.{layout}')
     
     print(f"Processing {input_file} to {output_file}")
     
     try:
-        # Read CSV file
-        with open(input_file, 'r', encoding='utf-8') as csv_file:
-            reader = csv.DictReader(csv_file)
-            data = []
-            for row in reader:
-                # Convert all reference fields to arrays
-                for key in row:
-                    if key.endswith('_ref'):
-                        row[key] = process_ref_field(row[key])
-                    elif row[key] == 'X':  # Handle framework fields
-                        row[key] = 'X'
-                    elif not row[key]:  # Handle empty fields
-                        row[key] = ''
-                    else:
-                        row[key] = row[key].strip()
-                data.append(row)
-        
-        # Create output directory if it doesn't exist
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-            
-        # Wrap data in "controls" key to match existing format
-        output_data = {"controls": data}
-            
-        # Write JSON file
-        with open(output_file, 'w', encoding='utf-8') as json_file:
-            json.dump(output_data, json_file, indent=2)
+        with atomic_open(output_file, 'w', encoding='utf-8') as json_file:
+            if layout == 'jsonl':
+                count = 0
+                for row in iter_controls(input_file):
+                    json_file.write(json.dumps(row))
+                    json_file.write('\n')
+                    count += 1
+                print(f"Wrote {count} controls")
+            else:
+                # Wrap data in "controls" key to match existing format
+                output_data = {"controls": list(iter_controls(input_file))}
+                json.dump(output_data, json_file, indent=2)
             
         print(f"Successfully created: {output_file}")
                 
@@ -65,4 +78,10 @@ def process_controls_mapping():
         raise
 
 if __name__ == "__main__":
-    process_controls_mapping() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Convert controls_mapping_check.csv to JSON')
+    parser.add_argument('--input', type=Path, help='CSV file to convert')
+    parser.add_argument('--output', type=Path, help='Output file')
+    parser.add_argument('--layout', choices=OUTPUT_LAYOUTS, default='json',
+                        help='json: one document; jsonl: stream one control per line')
+    args = parser.parse_args()
+    process_controls_mapping(args.input, args.output, args.layout)
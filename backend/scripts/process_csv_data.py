@@ -1,3 +1,4 @@
+import argparse
 import sys
 from pathlib import Path
 
@@ -5,13 +6,23 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from src.data_processor import DataProcessor
+from src.data_processor import DEFAULT_CHUNKSIZE, OUTPUT_LAYOUTS, DataProcessor
 
 def main():
     """Process CSV files to JSON format"""
+    parser = argparse.ArgumentParser(description='Convert the raw CCF CSV files to JSON')
+    parser.add_argument('--raw', type=Path, default=Path('data/raw'), help='Directory containing the CSV files')
+    parser.add_argument('--output', type=Path, default=Path('data/processed'), help='Directory for the JSON files')
+    parser.add_argument('--layout', choices=OUTPUT_LAYOUTS, default='json',
+                        help='json: one document per file; jsonl: stream records to JSON Lines in bounded memory')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Rows per chunk for the jsonl layout')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-clean rows that changed since the last run (json layout)')
+    args = parser.parse_args()
+
     # Setup paths
-    raw_data_path = Path('data/raw')
-    processed_data_path = Path('data/processed')
+    raw_data_path = args.raw
+    processed_data_path = args.output
     
     print(f"Processing CSV files from {raw_data_path} to {processed_data_path}")
     
@@ -20,11 +31,11 @@ def main():
     
     try:
         # Convert CSV to JSON
-        processor.convert_csv_to_json()
+        processor.convert_csv_to_json(layout=args.layout, chunksize=args.chunksize, incremental=args.incremental)
         print("Successfully converted CSV files to JSON format")
         
         # Verify files were created
-        expected_files = ['controls_v2.json', 'control_guidance.json']
+        expected_files = [f'controls_v2.{args.layout}', f'control_guidance.{args.layout}']
         for file in expected_files:
             json_path = processed_data_path / file
             if json_path.exists():
@@ -0,0 +1,102 @@
+import contextlib
+import hashlib
+import json
+import os
+import secrets
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional
+
+DIGEST_LENGTH = 16
+
+# Temp files are created like open() would (0o666 less the umask), unlike
+# mkstemp's owner-only files; O_EXCL keeps the name from being taken twice
+TEMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+
+
+def config_digest(config: Dict, data_version: Optional[str], template_hash: str) -> str:
+    """Hash a generation config together with the data and template content it renders from
+
+    Framework order and duplicates do not change the document, so they do
+    not change the digest; template edits and data reloads do. template_hash
+    is the renderer's PolicyTemplate.content_hash of the config's template.
+    """
+    canonical = {
+        "policy_standard": config["policy_standard"],
+        "selected_frameworks": sorted(set(config.get("selected_frameworks") or [])),
+        "template_id": config.get("template_id", "standard"),
+        "template_hash": template_hash,
+        "data_version": data_version,
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:DIGEST_LENGTH]
+
+
+def mapping_digest(selected_frameworks: List[str], data_version: Optional[str]) -> str:
+    """Hash a framework mapping request together with the data it renders from
+
+    Unlike policies, framework order sets the mapping's column order, so it
+    is part of the digest.
+    """
+    canonical = {"selected_frameworks": list(selected_frameworks), "data_version": data_version}
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:DIGEST_LENGTH]
+
+
+def content_digest(content: bytes) -> str:
+    """Hash document content, for artifacts saved without their config"""
+    return hashlib.sha256(content).hexdigest()[:DIGEST_LENGTH]
+
+
+def _create_temp(path: Path):
+    """Create a new temporary file next to path and return its descriptor and name"""
+    while True:
+        temp_name = str(path.parent / f".{path.name}.{secrets.token_hex(8)}.tmp")
+        try:
+            return os.open(temp_name, TEMP_FLAGS, 0o666), temp_name
+        except FileExistsError:
+            continue
+
+
+@contextlib.contextmanager
+def atomic_open(path: Path, mode: str = 'wb', encoding: Optional[str] = None) -> Iterator[IO]:
+    """Open a file for writing that only replaces path once the block completes
+
+    The data goes to a temporary file in the same directory, is flushed to
+    disk and then renamed over the target in one step, so readers see either
+    the old file or the complete new one. If the block raises, the target is
+    left untouched.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = _create_temp(path)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write(path: Path, content: bytes) -> Path:
+    """Write content to path so readers see either the old file or the complete new one"""
+    with atomic_open(path) as f:
+        f.write(content)
+    return Path(path)
+
+
+def write_artifact(path: Path, content: bytes) -> bool:
+    """Atomically save a content-addressed artifact unless it already exists
+
+    Returns True if the file was written, False if an identical artifact was
+    already present.
+    """
+    if Path(path).exists():
+        return False
+    atomic_write(path, content)
+    return True
@@ -0,0 +1,275 @@
+import json
+import logging
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .artifacts import atomic_write
+from .corpus import get_corpus
+from .render_cache import RenderCache
+from .templates import PolicyTemplate
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('md', 'docx')
+ENGINES = ('thread', 'process')
+MAX_BATCH_SIZE = 1000
+REQUIRED_FIELDS = ('policy_standard', 'selected_frameworks')
+MANIFEST_NAME = 'manifest.json'
+
+
+class BatchResult:
+    """One rendered document of a batch, with its timings"""
+    __slots__ = ('config', 'filename', 'content', 'render_seconds', 'convert_seconds', 'error')
+
+    def __init__(self, config: Dict, filename: str, content: Optional[bytes] = None,
+                 render_seconds: float = 0.0, convert_seconds: float = 0.0, error: Optional[str] = None):
+        self.config = config
+        self.filename = filename
+        self.content = content
+        self.render_seconds = render_seconds
+        self.convert_seconds = convert_seconds
+        self.error = error
+
+    def manifest_entry(self) -> Dict:
+        return {
+            "filename": self.filename if self.error is None else None,
+            "policy_standard": self.config["policy_standard"],
+            "template_id": self.config.get("template_id", "standard"),
+            "selected_frameworks": self.config.get("selected_frameworks", []),
+            "bytes": len(self.content) if self.content is not None else 0,
+            "render_seconds": round(self.render_seconds, 4),
+            "convert_seconds": round(self.convert_seconds, 4),
+            "error": self.error,
+        }
+
+
+class _ZipStream:
+    """Write-only sink that lets zipfile build an archive chunk by chunk"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def validate_configs(configs) -> List[Dict]:
+    """Check a list of generation configs, raising ValueError on the first problem"""
+    if not isinstance(configs, list) or not configs:
+        raise ValueError("At least one config is required")
+    if len(configs) > MAX_BATCH_SIZE:
+        raise ValueError(f"Too many configs: {len(configs)} (maximum is {MAX_BATCH_SIZE})")
+    for position, config in enumerate(configs):
+        if not isinstance(config, dict):
+            raise ValueError(f"Config {position} must be an object")
+        missing_fields = [field for field in REQUIRED_FIELDS if field not in config]
+        if missing_fields:
+            raise ValueError(f"Config {position} is missing required fields: {', '.join(missing_fields)}")
+        if not isinstance(config["selected_frameworks"], list):
+            raise ValueError(f"Config {position}: selected_frameworks must be a list")
+    return configs
+
+
+def configs_for_all(policy_standards: Iterable[str], selected_frameworks: List[str],
+                    template_id: str = "standard") -> List[Dict]:
+    """Build one config per policy standard for a framework profile"""
+    return [
+        {
+            "policy_standard": policy_standard,
+            "selected_frameworks": list(selected_frameworks),
+            "template_id": template_id
+        }
+        for policy_standard in policy_standards
+    ]
+
+
+def load_config_dir(config_dir: Path) -> List[Dict]:
+    """Load every *.json config in a directory (a file may hold one config or a list)"""
+    config_dir = Path(config_dir).resolve()
+    if not config_dir.is_dir():
+        raise ValueError(f"Config directory '{config_dir}' not found")
+
+    configs = []
+    for config_path in sorted(config_dir.glob('*.json')):
+        try:
+            with open(config_path, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            raise ValueError(f"Config file '{config_path.name}' is not valid JSON")
+        configs.extend(data if isinstance(data, list) else [data])
+    return configs
+
+
+def render_config(generator, config: Dict, output_format: str = 'md') -> BatchResult:
+    """Render a single config with a generator, recording failures instead of raising"""
+    result = BatchResult(config, generator.policy_filename(config, output_format))
+    try:
+        started = time.perf_counter()
+        md_content = generator.generate_policy_markdown_cached(config)
+        result.render_seconds = time.perf_counter() - started
+        if output_format == 'docx':
+            started = time.perf_counter()
+            result.content = generator.generate_policy_docx(config, md_content)
+            result.convert_seconds = time.perf_counter() - started
+        else:
+            result.content = md_content.encode('utf-8')
+    except Exception as e:
+        logger.error("Error generating policy for %s: %s", config.get('policy_standard'), e)
+        result.error = str(e)
+    return result
+
+
+# Per-process generator, built once by _init_worker in each pool process
+_worker_generator = None
+
+
+def _init_worker(generator_factory: Callable, data_dir: str, templates: Dict,
+                 cache_settings: Optional[Tuple[int, int]]) -> None:
+    """Load the read-only corpus once per worker process
+
+    cache_settings are the (max_entries, max_bytes) of the parent generator's
+    render cache, or None if it renders without one.
+    """
+    global _worker_generator
+    PolicyTemplate.registry.publish(templates)
+    render_cache = RenderCache(*cache_settings) if cache_settings is not None else None
+    _worker_generator = generator_factory(corpus=get_corpus(data_dir), render_cache=render_cache)
+
+
+def _render_in_worker(config: Dict, output_format: str) -> BatchResult:
+    return render_config(_worker_generator, config, output_format)
+
+
+class BatchGenerator:
+    """Render many policy configs in parallel
+
+    With the 'thread' engine every worker shares the given generator (and so
+    its loaded corpus, index and render cache); pandoc conversions run
+    concurrently but Python rendering is serialised by the GIL. The
+    'process' engine shards configs across a ProcessPoolExecutor for
+    CPU-bound batches: each worker process loads the corpus once in its
+    initializer and only configs and results cross the process boundary.
+    Either way results come back in input order, so archives and manifests
+    are deterministic.
+    """
+
+    def __init__(self, generator, workers: Optional[int] = None, engine: Optional[str] = None):
+        engine = (engine or os.getenv('BATCH_ENGINE', 'thread')).lower()
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown batch engine: {engine}. Available engines: {', '.join(ENGINES)}")
+        self.generator = generator
+        self.engine = engine
+        self.workers = workers or int(os.getenv('BATCH_WORKERS', '0')) or min(8, os.cpu_count() or 1)
+
+    def _executor(self):
+        if self.engine == 'thread':
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='batch')
+        # Caches cannot be shared across processes; each worker gets one with the same bounds
+        cache = self.generator.render_cache
+        cache_settings = (cache.max_entries, cache.max_bytes) if cache is not None else None
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(type(self.generator), str(self.generator.corpus.data_dir),
+                      self.generator.template.registry.to_dict(), cache_settings)
+        )
+
+    def _map(self, executor, configs: List[Dict], output_format: str) -> Iterator[BatchResult]:
+        if self.engine == 'thread':
+            return executor.map(lambda config: self.render_one(config, output_format), configs)
+        # Larger chunks amortise inter-process overhead while keeping workers balanced
+        chunksize = max(1, len(configs) // (self.workers * 4))
+        return executor.map(_render_in_worker, configs, [output_format] * len(configs), chunksize=chunksize)
+
+    def render_one(self, config: Dict, output_format: str = 'md') -> BatchResult:
+        """Render a single config, recording failures instead of raising"""
+        return render_config(self.generator, config, output_format)
+
+    def render(self, configs: List[Dict], output_format: str = 'md') -> Iterator[BatchResult]:
+        """Render configs across the worker pool, yielding results in input order"""
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Invalid format. Use {' or '.join(OUTPUT_FORMATS)}")
+
+        used_names = set()
+        with self._executor() as executor:
+            for result in self._map(executor, configs, output_format):
+                # The same policy can appear with several framework profiles
+                stem, suffix = result.filename.rsplit('.', 1)
+                counter = 1
+                while result.filename in used_names:
+                    counter += 1
+                    result.filename = f"{stem}_{counter}.{suffix}"
+                used_names.add(result.filename)
+                yield result
+
+    def manifest(self, entries: List[Dict], output_format: str, started: float) -> Dict:
+        """Describe a finished batch: one entry per document with its timings"""
+        return {
+            "generated_at": datetime.now().isoformat(timespec='seconds'),
+            "corpus_version": self.generator.corpus.version,
+            "format": output_format,
+            "engine": self.engine,
+            "workers": self.workers,
+            "documents": entries,
+            "failed": sum(1 for entry in entries if entry["error"] is not None),
+            "total_seconds": round(time.perf_counter() - started, 4),
+        }
+
+    def iter_zip(self, configs: List[Dict], output_format: str = 'md') -> Iterator[bytes]:
+        """Stream a zip archive of the rendered documents plus manifest.json
+
+        Each document is yielded as soon as it is rendered, so the archive
+        never has to be held in memory in full.
+        """
+        started = time.perf_counter()
+        # DOCX files are already compressed
+        compression = zipfile.ZIP_STORED if output_format == 'docx' else zipfile.ZIP_DEFLATED
+        stream = _ZipStream()
+        entries = []
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for result in self.render(configs, output_format):
+                if result.error is None:
+                    archive.writestr(result.filename, result.content, compress_type=compression)
+                entries.append(result.manifest_entry())
+                yield stream.drain()
+            manifest = self.manifest(entries, output_format, started)
+            archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+        yield stream.drain()
+
+    def write_directory(self, configs: List[Dict], output_dir: Path, output_format: str = 'md') -> Dict:
+        """Write the rendered documents and manifest.json to a directory"""
+        started = time.perf_counter()
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for result in self.render(configs, output_format):
+            if result.error is None:
+                atomic_write(output_dir / result.filename, result.content)
+            entries.append(result.manifest_entry())
+        manifest = self.manifest(entries, output_format, started)
+        with open(output_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def write_zip(self, configs: List[Dict], output_path: Path, output_format: str = 'md') -> Path:
+        """Stream the zip archive to a file"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'wb') as f:
+            for chunk in self.iter_zip(configs, output_format):
+                f.write(chunk)
+        return output_path
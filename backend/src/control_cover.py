@@ -0,0 +1,227 @@
+import heapq
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Exact refinement runs when at most this many candidate controls remain
+# after dropping dominated and essential ones, and gives up after this many
+# search nodes
+EXACT_MAX_CANDIDATES = 40
+EXACT_MAX_NODES = 200_000
+
+Requirement = Tuple[str, str]
+
+
+def popcount(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+def requirement_bitsets(index, frameworks: Iterable[str]) -> Tuple[List[Requirement], Dict[str, int]]:
+    """Number the (framework, ref) requirements of frameworks and return each control's bitset over them
+
+    Bit i of a control's bitset is set if the control satisfies requirements[i],
+    according to the inverted reference index built from controls_mapping.
+    Raises KeyError for a framework the corpus does not know.
+    """
+    requirements: List[Requirement] = []
+    bitsets: Dict[str, int] = {}
+    for framework in dict.fromkeys(frameworks):
+        if framework not in index.frameworks:
+            raise KeyError(framework)
+        for ref in index.refs_for_framework(framework):
+            bit = 1 << len(requirements)
+            requirements.append((framework, ref))
+            for control_id in index.controls_for_ref(framework, ref):
+                bitsets[control_id] = bitsets.get(control_id, 0) | bit
+    return requirements, bitsets
+
+
+def candidate_controls(bitsets: Dict[str, int]) -> List[Tuple[str, int]]:
+    """Drop controls whose requirements another control covers too (keeping the lowest id of equals)
+
+    Returns (control_id, bitset) pairs, largest coverage first.
+    """
+    ranked = sorted(bitsets.items(), key=lambda item: (-popcount(item[1]), item[0]))
+    candidates: List[Tuple[str, int]] = []
+    for control_id, bits in ranked:
+        if not any(bits & kept == bits for _, kept in candidates):
+            candidates.append((control_id, bits))
+    return candidates
+
+
+def essential_controls(candidates: List[Tuple[str, int]], target: int) -> List[int]:
+    """Return positions of controls that are the only candidate for some requirement of target"""
+    once = twice = 0
+    for _, bits in candidates:
+        twice |= once & bits
+        once |= bits
+    unique = once & ~twice & target
+    return [position for position, (_, bits) in enumerate(candidates) if bits & unique]
+
+
+def greedy_cover(candidates: List[Tuple[str, int]], target: int) -> List[int]:
+    """Greedy set cover with lazy gain updates; returns positions in candidates
+
+    Gains only shrink as requirements get covered, so a control popped from
+    the heap whose recomputed gain still beats the next entry is the best
+    pick without rescoring every other control.
+    """
+    heap = [(-popcount(bits & target), position) for position, (_, bits) in enumerate(candidates)]
+    heapq.heapify(heap)
+    uncovered = target
+    chosen: List[int] = []
+    while uncovered and heap:
+        _, position = heapq.heappop(heap)
+        gain = popcount(candidates[position][1] & uncovered)
+        if not gain:
+            continue
+        if heap and -heap[0][0] > gain:
+            heapq.heappush(heap, (-gain, position))
+            continue
+        chosen.append(position)
+        uncovered &= ~candidates[position][1]
+    return chosen
+
+
+def prune_redundant(candidates: List[Tuple[str, int]], chosen: List[int]) -> List[int]:
+    """Remove chosen controls whose requirements the other chosen controls already cover"""
+    chosen = list(chosen)
+    for position in reversed(list(chosen)):
+        others = 0
+        for other in chosen:
+            if other != position:
+                others |= candidates[other][1]
+        if candidates[position][1] & ~others == 0:
+            chosen.remove(position)
+    return chosen
+
+
+def exact_cover(candidates: List[Tuple[str, int]], target: int, best: List[int],
+                max_nodes: int = EXACT_MAX_NODES) -> Tuple[List[int], bool]:
+    """Branch and bound for the smallest cover, starting from a known cover ``best``
+
+    Branches on the uncovered requirement with the fewest covering controls.
+    Returns the best cover found and whether the search finished (so it is
+    optimal) within max_nodes.
+    """
+    covering: Dict[int, List[int]] = {}
+    remaining = target
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+        covering[bit] = [position for position, (_, bits) in enumerate(candidates) if bits & bit]
+    largest = max((popcount(bits & target) for _, bits in candidates), default=1)
+    best = list(best)
+    nodes = 0
+
+    def search(uncovered: int, chosen: List[int]) -> bool:
+        nonlocal best, nodes
+        nodes += 1
+        if nodes > max_nodes:
+            return False
+        if not uncovered:
+            if len(chosen) < len(best):
+                best = list(chosen)
+            return True
+        # Every further control covers at most `largest` requirements
+        if len(chosen) + -(-popcount(uncovered) // largest) >= len(best):
+            return True
+        bits_left = uncovered
+        branch = None
+        while bits_left:
+            bit = bits_left & -bits_left
+            bits_left ^= bit
+            if branch is None or len(covering[bit]) < len(branch):
+                branch = covering[bit]
+        for position in branch:
+            chosen.append(position)
+            finished = search(uncovered & ~candidates[position][1], chosen)
+            chosen.pop()
+            if not finished:
+                return False
+        return True
+
+    finished = search(target, [])
+    return best, finished
+
+
+class ControlCover:
+    """Controls chosen to cover every framework reference of a selection"""
+    __slots__ = ('frameworks', 'controls', 'requirements', 'covered', 'coverage', 'optimal')
+
+    def __init__(self, frameworks: List[str], controls: List[str], requirements: int, covered: int,
+                 coverage: Dict[str, Dict[str, int]], optimal: bool):
+        self.frameworks = frameworks
+        self.controls = controls
+        self.requirements = requirements
+        self.covered = covered
+        self.coverage = coverage
+        self.optimal = optimal
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        return (f"ControlCover(frameworks={len(self.frameworks)}, controls={len(self.controls)}, "
+                f"covered={self.covered}/{self.requirements}, optimal={self.optimal})")
+
+
+def solve_cover(index, frameworks: Iterable[str], exact: bool = True,
+                exact_max_candidates: int = EXACT_MAX_CANDIDATES) -> ControlCover:
+    """Find a small set of controls that satisfies every reference of frameworks
+
+    Controls are bitsets over the selection's (framework, ref) requirements.
+    Dominated controls are dropped and controls that alone satisfy some
+    requirement are always taken. A lazy greedy pass covers what those leave
+    and redundant picks are pruned. With exact=True and few enough remaining
+    candidates, a bounded branch and bound search then looks for a smaller
+    set; ``optimal`` reports whether that search proved the result minimal.
+    Raises KeyError for an unknown framework.
+    """
+    frameworks = list(dict.fromkeys(frameworks))
+    requirements, bitsets = requirement_bitsets(index, frameworks)
+    candidates = candidate_controls(bitsets)
+    target = 0
+    for _, bits in candidates:
+        target |= bits
+
+    # Controls that are the only way to satisfy a requirement are in every
+    # cover; the search only has to choose among the rest for what they leave
+    essential = essential_controls(candidates, target)
+    remaining = target
+    for position in essential:
+        remaining &= ~candidates[position][1]
+    rest = [position for position, (_, bits) in enumerate(candidates) if bits & remaining]
+    reduced = candidate_controls({candidates[position][0]: candidates[position][1] & remaining for position in rest})
+    position_of = {control_id: position for position, (control_id, _) in enumerate(candidates)}
+
+    picked = prune_redundant(reduced, greedy_cover(reduced, remaining))
+    optimal = False
+    if exact and len(reduced) <= exact_max_candidates:
+        picked, optimal = exact_cover(reduced, remaining, picked)
+    chosen = prune_redundant(candidates, essential + [position_of[reduced[position][0]] for position in picked])
+    logger.debug("Covered %d requirements of %d frameworks with %d controls (%d essential, %d of %d candidates "
+                 "searched, optimal=%s)", popcount(target), len(frameworks), len(chosen), len(essential),
+                 len(reduced), len(candidates), optimal)
+
+    covered_bits = 0
+    for position in chosen:
+        covered_bits |= candidates[position][1]
+    # Each framework's requirements are a contiguous run of bits
+    coverage: Dict[str, Dict[str, int]] = {}
+    start = 0
+    for framework in frameworks:
+        count = len(index.refs_for_framework(framework))
+        span = ((1 << count) - 1) << start
+        coverage[framework] = {"requirements": count, "covered": popcount(covered_bits & span)}
+        start += count
+
+    return ControlCover(
+        frameworks=frameworks,
+        controls=sorted(candidates[position][0] for position in chosen),
+        requirements=len(requirements),
+        covered=popcount(covered_bits),
+        coverage=coverage,
+        optimal=optimal,
+    )
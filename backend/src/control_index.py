@@ -0,0 +1,227 @@
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+REF_SUFFIX = '_ref'
+
+
+def index_by_id(records: Iterable[Dict]) -> Dict[str, Dict]:
+    """Map ccf_id to record, keeping the first record seen for each id"""
+    by_id = {}
+    for record in records:
+        control_id = record.get('ccf_id')
+        if control_id and control_id not in by_id:
+            by_id[control_id] = record
+    return by_id
+
+
+def ref_fields(records: Iterable[Dict]) -> List[Tuple[str, str]]:
+    """Return (field, framework) for every *_ref field of the records, in first-seen order"""
+    fields = dict.fromkeys(chain.from_iterable(records))
+    return [(field, field[:-len(REF_SUFFIX)]) for field in fields if field.endswith(REF_SUFFIX)]
+
+
+def _append(index: Dict[str, List[str]], key, control_id: str) -> None:
+    if key:
+        index.setdefault(key, []).append(control_id)
+
+
+def _freeze(index: Dict[str, List[str]]) -> Dict[str, Tuple[str, ...]]:
+    return {key: tuple(ids) for key, ids in index.items()}
+
+
+def bitset_array(bitsets: Iterable[int], width: int) -> np.ndarray:
+    """Pack framework bitsets into an array that can be ANDed with a mask in one operation
+
+    Up to 64 frameworks fit a uint64 array; wider catalogs fall back to an
+    object array of Python ints, which numpy ANDs the same way.
+    """
+    if width <= 64:
+        return np.fromiter(bitsets, dtype=np.uint64)
+    return np.array(list(bitsets), dtype=object)
+
+
+def _select(ids: Tuple[str, ...], bitsets: np.ndarray, mask: int) -> Tuple[str, ...]:
+    """Return the ids whose bitset shares a bit with mask, in order"""
+    if not mask or not ids:
+        return ()
+    if bitsets.dtype != object:
+        mask = np.uint64(mask)
+    return tuple(ids[position] for position in np.flatnonzero(bitsets & mask))
+
+
+class ControlIndex:
+    """Precomputed hash indexes over a control corpus
+
+    Built once per corpus; every lookup is a dictionary access. Id tuples keep
+    the order of the source files, records are shared with the corpus and must
+    not be modified. The inverted framework reference index is pre-sorted, so
+    reverse mappings are answered by slicing it.
+
+    Framework membership is stored as one bitset per control (bit i set if
+    the control references ``frameworks[i]``). A framework selection is
+    compiled once into a mask with ``framework_mask``; matching a control is
+    then a single AND, and filtering a policy standard or the whole catalog
+    ANDs the mask with a bitset array.
+    """
+
+    def __init__(self, control_guidance, controls_data, controls_mapping):
+        guidance_records = control_guidance.get('controls', ())
+        control_records = controls_data.get('controls', ())
+
+        self._guidance = index_by_id(guidance_records)
+        self._controls = index_by_id(control_records)
+
+        by_policy: Dict[str, List[str]] = {}
+        by_domain: Dict[str, List[str]] = {}
+        for control_id, record in self._guidance.items():
+            _append(by_policy, record.get('policy_standard'), control_id)
+            _append(by_domain, record.get('control_domain'), control_id)
+
+        # Framework -> controls with references, from controls_v2 records.
+        # Records share their fields, so the *_ref fields are found once up front.
+        by_framework: Dict[str, List[str]] = {}
+        control_ref_fields = ref_fields(self._controls.values())
+        mapping_ref_fields = ref_fields(controls_mapping.values())
+        guidance_ref_fields = ref_fields(self._guidance.values())
+        self.frameworks = tuple(dict.fromkeys(
+            framework for _, framework in chain(control_ref_fields, mapping_ref_fields, guidance_ref_fields)))
+        self._framework_bit = {framework: 1 << bit for bit, framework in enumerate(self.frameworks)}
+        bit = self._framework_bit
+
+        control_bits: Dict[str, int] = {}
+        for control_id, record in self._controls.items():
+            bits = 0
+            for field, framework in control_ref_fields:
+                if record.get(field):
+                    _append(by_framework, framework, control_id)
+                    bits |= bit[framework]
+            control_bits[control_id] = bits
+
+        # From controls_mapping: framework -> controls with references, and the
+        # inverted framework reference index
+        # (control, framework) -> sorted refs and (framework, ref) -> sorted controls
+        by_mapped_framework: Dict[str, List[str]] = {}
+        refs_by_control: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        controls_by_ref: Dict[Tuple[str, str], set] = {}
+        # Control -> frameworks it maps to in controls_mapping or its own guidance record
+        mapped_bits: Dict[str, int] = {}
+        for control_id, record in self._guidance.items():
+            bits = 0
+            for field, framework in guidance_ref_fields:
+                if record.get(field):
+                    bits |= bit[framework]
+            mapped_bits[control_id] = bits
+        for control_id, mappings in controls_mapping.items():
+            for field, framework in mapping_ref_fields:
+                refs = mappings.get(field)
+                if not refs:
+                    continue
+                mapped_bits[control_id] = mapped_bits.get(control_id, 0) | bit[framework]
+                _append(by_mapped_framework, framework, control_id)
+                unique_refs = tuple(sorted(set(refs)))
+                refs_by_control[(control_id, framework)] = unique_refs
+                for ref in unique_refs:
+                    controls_by_ref.setdefault((framework, ref), set()).add(control_id)
+
+        refs_by_framework: Dict[str, List[str]] = {}
+        for framework, ref in controls_by_ref:
+            refs_by_framework.setdefault(framework, []).append(ref)
+
+        self._refs_by_control = refs_by_control
+        self._controls_by_ref = {key: tuple(sorted(ids)) for key, ids in controls_by_ref.items()}
+        self._refs_by_framework = {framework: tuple(sorted(refs)) for framework, refs in refs_by_framework.items()}
+
+        self._by_policy = _freeze(by_policy)
+        self._by_domain = _freeze(by_domain)
+        self._by_framework = _freeze(by_framework)
+        self._by_mapped_framework = _freeze(by_mapped_framework)
+
+        width = len(self.frameworks)
+        self._mapped_bits = mapped_bits
+        self._policy_bitsets = {
+            policy_standard: bitset_array((mapped_bits.get(control_id, 0) for control_id in ids), width)
+            for policy_standard, ids in self._by_policy.items()
+        }
+        self._sorted_control_ids = tuple(sorted(control_bits))
+        self._control_bitsets = bitset_array((control_bits[control_id] for control_id in self._sorted_control_ids), width)
+
+    @classmethod
+    def from_corpus(cls, corpus) -> 'ControlIndex':
+        """Build the index for a ControlCorpus"""
+        return cls(corpus.control_guidance, corpus.controls_data, corpus.controls_mapping)
+
+    def control(self, control_id: str) -> Optional[Dict]:
+        """Return the controls_v2 record for a control"""
+        return self._controls.get(control_id)
+
+    def guidance(self, control_id: str) -> Optional[Dict]:
+        """Return the control_guidance record for a control"""
+        return self._guidance.get(control_id)
+
+    def policy_standards(self) -> List[str]:
+        """Return all policy standards, sorted"""
+        return sorted(self._by_policy)
+
+    def control_domains(self) -> List[str]:
+        """Return all control domains, sorted"""
+        return sorted(self._by_domain)
+
+    def ids_for_policy(self, policy_standard: str) -> Tuple[str, ...]:
+        """Return ids of the controls belonging to a policy standard"""
+        return self._by_policy.get(policy_standard, ())
+
+    def ids_for_domain(self, control_domain: str) -> Tuple[str, ...]:
+        """Return ids of the controls belonging to a control domain"""
+        return self._by_domain.get(control_domain, ())
+
+    def ids_for_framework(self, framework: str) -> Tuple[str, ...]:
+        """Return ids of the controls with controls_v2 references for a framework"""
+        return self._by_framework.get(framework, ())
+
+    def mapped_ids_for_framework(self, framework: str) -> Tuple[str, ...]:
+        """Return ids of the controls with controls_mapping references for a framework"""
+        return self._by_mapped_framework.get(framework, ())
+
+    def ids_for_frameworks(self, frameworks: Iterable[str]) -> List[str]:
+        """Return sorted ids of the controls referencing any of the frameworks"""
+        return list(_select(self._sorted_control_ids, self._control_bitsets, self.framework_mask(frameworks)))
+
+    def framework_mask(self, frameworks: Iterable[str]) -> int:
+        """Compile a framework selection into a bitmask (unknown frameworks match nothing)"""
+        mask = 0
+        for framework in frameworks:
+            mask |= self._framework_bit.get(framework, 0)
+        return mask
+
+    def mapped_framework_bits(self, control_id: str) -> int:
+        """Return the bitset of frameworks a control maps to (controls_mapping or guidance references)"""
+        return self._mapped_bits.get(control_id, 0)
+
+    def matches_frameworks(self, control_id: str, mask: int) -> bool:
+        """Return whether a control maps to any framework of a compiled mask"""
+        return bool(self._mapped_bits.get(control_id, 0) & mask)
+
+    def ids_for_policy_matching(self, policy_standard: str, mask: int) -> Tuple[str, ...]:
+        """Return ids of a policy standard's controls that map to any framework of a compiled mask"""
+        ids = self.ids_for_policy(policy_standard)
+        if not ids:
+            return ()
+        return _select(ids, self._policy_bitsets[policy_standard], mask)
+
+    def mapped_refs(self, control_id: str, framework: str) -> Tuple[str, ...]:
+        """Return the sorted, de-duplicated controls_mapping references of a control for a framework"""
+        return self._refs_by_control.get((control_id, framework), ())
+
+    def refs_for_framework(self, framework: str) -> Tuple[str, ...]:
+        """Return all references of a framework that map to at least one control, sorted"""
+        return self._refs_by_framework.get(framework, ())
+
+    def controls_for_ref(self, framework: str, ref: str) -> Tuple[str, ...]:
+        """Return sorted ids of the controls that satisfy a framework reference"""
+        return self._controls_by_ref.get((framework, ref), ())
+
+    def controls_for_policy(self, policy_standard: str) -> List[Dict]:
+        """Return guidance records for a policy standard"""
+        return [self._guidance[control_id] for control_id in self.ids_for_policy(policy_standard)]
@@ -0,0 +1,154 @@
+import os
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+import pypandoc
+
+PANDOC_ARGS = ['--standalone', '--from', 'markdown-raw_html', '--wrap=none']
+
+
+class ConversionError(Exception):
+    """Raised when pandoc fails to convert a document"""
+
+
+class ConversionBusyError(ConversionError):
+    """Raised when the conversion queue is full"""
+
+
+class ConversionTimeoutError(ConversionError):
+    """Raised when a conversion job exceeds its timeout"""
+
+
+class ConversionService:
+    """Bounded pool of pandoc converter workers
+
+    At most ``workers`` pandoc processes run at once and at most ``max_queue``
+    further jobs wait for a worker; beyond that, callers get
+    ConversionBusyError after ``queue_timeout`` seconds instead of forking
+    without bound. Markdown is piped to pandoc on stdin and the document is
+    read from stdout, so no temp files are involved.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: int = 16, job_timeout: float = 60,
+                 queue_timeout: float = 5, pandoc_path: Optional[str] = None):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.queue_timeout = queue_timeout
+        self.pandoc_path = pandoc_path
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> 'ConversionService':
+        """Resolve pandoc and start the workers (idempotent)"""
+        with self._lock:
+            if self._executor is None:
+                if self.pandoc_path is None:
+                    self.pandoc_path = pypandoc.get_pandoc_path()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pandoc')
+        return self
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and wait for running conversions"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        # Running jobs take the lock to update counters, so wait outside it
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _command(self, to: str) -> List[str]:
+        return [self.pandoc_path, '--to', to, '--output', '-', *PANDOC_ARGS]
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _run(self, markdown: str, to: str) -> bytes:
+        try:
+            process = subprocess.Popen(
+                self._command(to),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except OSError as e:
+            self._count('failed')
+            raise ConversionError(f"Could not start pandoc: {e}") from e
+        try:
+            output, errors = process.communicate(markdown.encode('utf-8'), timeout=self.job_timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            self._count('failed')
+            raise ConversionTimeoutError(f"Conversion exceeded {self.job_timeout}s timeout")
+        if process.returncode != 0:
+            self._count('failed')
+            raise ConversionError(f"pandoc exited with {process.returncode}: {errors.decode('utf-8', 'replace').strip()}")
+        self._count('completed')
+        return output
+
+    def submit(self, markdown: str, to: str = 'docx') -> Future:
+        """Queue a conversion and return a Future with the document bytes
+
+        Raises ConversionBusyError if no queue slot frees up within queue_timeout
+        or the service is shut down meanwhile.
+        """
+        self.start()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count('rejected')
+            raise ConversionBusyError("Document conversion queue is full, try again later")
+        try:
+            # A concurrent shutdown() may have stopped the workers since start()
+            with self._lock:
+                executor = self._executor
+            if executor is None:
+                raise RuntimeError("conversion service was shut down")
+            future = executor.submit(self._run, markdown, to)
+        except RuntimeError as e:
+            self._slots.release()
+            raise ConversionBusyError("Document conversion service is shutting down, try again later") from e
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def convert(self, markdown: str, to: str = 'docx') -> bytes:
+        """Convert markdown and wait for the document bytes"""
+        return self.submit(markdown, to).result()
+
+    def stats(self) -> dict:
+        """Return worker pool counters"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+
+_service: Optional[ConversionService] = None
+_service_lock = threading.Lock()
+
+
+def get_conversion_service() -> ConversionService:
+    """Return the process-wide conversion service, configured from the environment"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            workers = os.getenv('PANDOC_WORKERS')
+            _service = ConversionService(
+                workers=int(workers) if workers else None,
+                max_queue=int(os.getenv('PANDOC_MAX_QUEUE', '16')),
+                job_timeout=float(os.getenv('PANDOC_TIMEOUT', '60')),
+                queue_timeout=float(os.getenv('PANDOC_QUEUE_TIMEOUT', '5'))
+            )
+        return _service
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+
+from .artifacts import atomic_write
+from .control_index import ControlIndex
+from .coverage import CoverageMatrix
+from .corpus_pack import PACK_FILENAME, CorpusPackError, decode_pack, encode_pack
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).parent.parent
+PROCESSED_DATA_DIR = BACKEND_DIR / 'data' / 'processed'
+
+# Attribute name -> processed data file
+CORPUS_FILES = {
+    'control_guidance': 'control_guidance.json',
+    'controls_data': 'controls_v2.json',
+    'controls_mapping': 'controls_mapping.json',
+    'erl_data': 'erl.json',
+}
+
+# "auto" loads the precompiled corpus pack when it matches the JSON files, "json" never uses it
+CORPUS_FORMATS = ('auto', 'json')
+
+
+def read_sources(data_dir: Path) -> Tuple[Dict[str, bytes], str]:
+    """Read the raw processed data files and return them with their corpus version"""
+    digest = hashlib.sha256()
+    sources = {}
+    for attr, filename in CORPUS_FILES.items():
+        file_path = data_dir / filename
+        if not file_path.exists():
+            raise FileNotFoundError(f"Processed data file not found at: {file_path}")
+        sources[attr] = file_path.read_bytes()
+        digest.update(sources[attr])
+    return sources, digest.hexdigest()[:16]
+
+
+def source_stamp(data_dir: Path) -> Optional[List]:
+    """Return [filename, size, mtime_ns] of every processed data file, or None if one is missing"""
+    stamp = []
+    for filename in CORPUS_FILES.values():
+        try:
+            stat = (data_dir / filename).stat()
+        except FileNotFoundError:
+            return None
+        stamp.append([filename, stat.st_size, stat.st_mtime_ns])
+    return stamp
+
+
+def load_stamped_pack(data_dir: Path) -> Optional[Tuple[Dict, str]]:
+    """Return the documents and version of data_dir's corpus pack if its source files are unchanged
+
+    Only stats the JSON files: a pack records the size and mtime of the
+    files it was built from, and is trusted while they still match.
+    """
+    pack_path = data_dir / PACK_FILENAME
+    stamp = source_stamp(data_dir)
+    if stamp is None or not pack_path.exists():
+        return None
+    try:
+        documents, version = decode_pack(pack_path.read_bytes(), expected_sources=stamp)
+    except CorpusPackError as e:
+        logger.debug("Corpus pack %s needs a content check: %s", pack_path, e)
+        return None
+    if set(documents) != set(CORPUS_FILES):
+        return None
+    return documents, version
+
+
+def load_pack(data_dir: Path, version: str) -> Optional[Dict]:
+    """Return the documents of data_dir's corpus pack, or None if it is missing or unusable
+
+    A pack is only used if it was built from exactly the JSON files present
+    (same corpus version); anything else falls back to JSON.
+    """
+    pack_path = data_dir / PACK_FILENAME
+    if not pack_path.exists():
+        return None
+    try:
+        documents, _ = decode_pack(pack_path.read_bytes(), expected_version=version)
+    except CorpusPackError as e:
+        logger.warning("Ignoring corpus pack %s: %s", pack_path, e)
+        return None
+    if set(documents) != set(CORPUS_FILES):
+        logger.warning("Ignoring corpus pack %s: unexpected documents", pack_path)
+        return None
+    return documents
+
+
+def write_corpus_pack(data_dir: Optional[Path] = None) -> Path:
+    """Compile the processed JSON files of data_dir into a corpus pack next to them"""
+    data_dir = Path(data_dir or PROCESSED_DATA_DIR)
+    # Stamped before reading, so a file changed meanwhile never matches the pack
+    stamp = source_stamp(data_dir)
+    sources, version = read_sources(data_dir)
+    documents = {attr: json.loads(raw) for attr, raw in sources.items()}
+    return atomic_write(data_dir / PACK_FILENAME, encode_pack(documents, version, stamp))
+
+
+def _freeze_document(document):
+    """Make the top level of a processed JSON document read-only.
+
+    Dicts become mapping proxies and the ``controls`` list becomes a tuple, so
+    callers cannot add, drop or reorder records of a shared corpus.
+    """
+    if isinstance(document, dict):
+        return MappingProxyType({
+            key: tuple(value) if key == 'controls' and isinstance(value, list) else value
+            for key, value in document.items()
+        })
+    return document
+
+
+class ControlCorpus:
+    """Read-only, in-memory snapshot of the processed CCF data files.
+
+    A corpus is loaded once and shared by every generator in the process.
+    Treat the records it holds as immutable: copy a record before changing it.
+    ``index`` holds the precomputed lookups (see ControlIndex) and
+    ``coverage`` the controls x frameworks matrix (see CoverageMatrix).
+    """
+
+    __slots__ = ('data_dir', 'control_guidance', 'controls_data', 'controls_mapping', 'erl_data', 'version', 'index',
+                 'coverage')
+
+    def __init__(self, data_dir: Path, control_guidance, controls_data, controls_mapping, erl_data, version: str):
+        object.__setattr__(self, 'data_dir', Path(data_dir))
+        object.__setattr__(self, 'control_guidance', _freeze_document(control_guidance))
+        object.__setattr__(self, 'controls_data', _freeze_document(controls_data))
+        object.__setattr__(self, 'controls_mapping', _freeze_document(controls_mapping))
+        object.__setattr__(self, 'erl_data', _freeze_document(erl_data))
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'index', ControlIndex.from_corpus(self))
+        object.__setattr__(self, 'coverage', CoverageMatrix.from_corpus(self))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ControlCorpus is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("ControlCorpus is read-only")
+
+    def __repr__(self):
+        return f"ControlCorpus(data_dir={str(self.data_dir)!r}, version={self.version!r})"
+
+    @classmethod
+    def load(cls, data_dir: Optional[Path] = None, corpus_format: Optional[str] = None) -> 'ControlCorpus':
+        """Load all processed data files from ``data_dir``
+
+        The corpus version is a digest of the raw file contents, so two loads of
+        the same data always report the same version. The documents are decoded
+        from the corpus pack when it matches that version (see CORPUS_FORMATS,
+        default from the CORPUS_FORMAT environment variable), otherwise parsed
+        from JSON. While the JSON files keep the size and mtime recorded in the
+        pack, the pack's version is used without reading them at all.
+        """
+        data_dir = Path(data_dir or PROCESSED_DATA_DIR)
+        corpus_format = corpus_format or os.getenv('CORPUS_FORMAT', 'auto')
+        if corpus_format not in CORPUS_FORMATS:
+            raise ValueError(f"Unknown corpus format: {corpus_format}")
+
+        stamped = load_stamped_pack(data_dir) if corpus_format == 'auto' else None
+        if stamped is not None:
+            documents, version = stamped
+            return cls(data_dir, version=version, **documents)
+
+        sources, version = read_sources(data_dir)
+        documents = load_pack(data_dir, version) if corpus_format == 'auto' else None
+        if documents is None:
+            documents = {attr: json.loads(raw) for attr, raw in sources.items()}
+        return cls(data_dir, version=version, **documents)
+
+
+_corpora: Dict[Path, ControlCorpus] = {}
+_corpora_lock = threading.Lock()
+
+
+def get_corpus(data_dir: Optional[Path] = None) -> ControlCorpus:
+    """Return the process-wide corpus for ``data_dir``, loading it on first use"""
+    key = Path(data_dir or PROCESSED_DATA_DIR).resolve()
+    corpus = _corpora.get(key)
+    if corpus is None:
+        with _corpora_lock:
+            corpus = _corpora.get(key)
+            if corpus is None:
+                corpus = ControlCorpus.load(key)
+                _corpora[key] = corpus
+    return corpus
+
+
+def publish_corpus(corpus: ControlCorpus) -> None:
+    """Make ``corpus`` the process-wide corpus of its data directory (see CorpusManager)"""
+    with _corpora_lock:
+        _corpora[corpus.data_dir.resolve()] = corpus
+
+
+def refresh_corpus(data_dir: Optional[Path] = None) -> Optional[ControlCorpus]:
+    """Reload and publish the corpus of ``data_dir`` if this process already shares one
+
+    Called after the processed files are rewritten in-process, so get_corpus
+    callers see the new data without waiting for a CorpusManager poll.
+    """
+    key = Path(data_dir or PROCESSED_DATA_DIR).resolve()
+    if key not in _corpora:
+        return None
+    corpus = ControlCorpus.load(key)
+    publish_corpus(corpus)
+    return corpus
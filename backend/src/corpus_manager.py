@@ -0,0 +1,178 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .corpus import CORPUS_FILES, PROCESSED_DATA_DIR, ControlCorpus, get_corpus, publish_corpus
+from .ingest_manifest import MANIFEST_NAME, ChangeSet, load_manifest
+from .render_cache import RENDER_CACHE, RenderCache
+
+logger = logging.getLogger(__name__)
+
+
+def data_stamp(data_dir: Path) -> Tuple:
+    """Return the (name, mtime, size) of every processed data file, None for missing files"""
+    stamp = []
+    for filename in CORPUS_FILES.values():
+        try:
+            stat = (data_dir / filename).stat()
+        except FileNotFoundError:
+            stamp.append((filename, None, None))
+        else:
+            stamp.append((filename, stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+class CorpusManager:
+    """Owns the live corpus snapshot of a data directory and swaps in new data
+
+    ``current`` is a single attribute read, so a request that takes the
+    snapshot once keeps using it until it finishes, even if a reload swaps
+    in a newer corpus meanwhile. Reloads load and index the new corpus on a
+    background thread and replace the snapshot with one assignment; if
+    loading fails the old snapshot stays live.
+
+    With ``poll_interval`` > 0, ``start`` watches the data files' mtimes and
+    reloads once they have stayed unchanged for one poll (an ingest writes
+    its files one after another).
+    """
+
+    def __init__(self, data_dir: Optional[Path] = None, poll_interval: float = 0,
+                 render_cache: Optional[RenderCache] = RENDER_CACHE):
+        self.data_dir = Path(data_dir or PROCESSED_DATA_DIR).resolve()
+        self.poll_interval = poll_interval
+        self.render_cache = render_cache
+        self._stamp = self._seen = data_stamp(self.data_dir)
+        self._corpus = get_corpus(self.data_dir)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending: Optional[Future] = None
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.reloads = 0
+        self.loaded_at = time.time()
+        self.last_error: Optional[str] = None
+
+    @property
+    def current(self) -> ControlCorpus:
+        """The live corpus snapshot"""
+        return self._corpus
+
+    def reload(self) -> Future:
+        """Load the data directory in the background and swap it in if it changed
+
+        Concurrent calls share the reload already queued. The future resolves
+        to a status dict (see ``_reload``).
+        """
+        with self._lock:
+            if self._pending is None or self._pending.done():
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='corpus-reload')
+                self._pending = self._executor.submit(self._reload)
+            return self._pending
+
+    def _reload(self) -> Dict:
+        stamp = data_stamp(self.data_dir)
+        previous = self._corpus
+        try:
+            corpus = ControlCorpus.load(self.data_dir)
+        except (OSError, ValueError) as e:
+            # Retry once the files change again, not on every poll
+            self._stamp = stamp
+            self.last_error = str(e)
+            logger.error("Corpus reload failed, keeping version %s: %s", previous.version, e)
+            return {"reloaded": False, "version": previous.version, "error": self.last_error}
+
+        self._stamp = stamp
+        self.last_error = None
+        if corpus.version == previous.version:
+            return {"reloaded": False, "version": previous.version}
+
+        publish_corpus(corpus)
+        self._corpus = corpus
+        self.reloads += 1
+        self.loaded_at = time.time()
+        carried_over = self._update_render_cache(previous.version, corpus.version)
+        logger.info("Swapped control corpus %s -> %s", previous.version, corpus.version)
+        return {"reloaded": True, "previous_version": previous.version, "version": corpus.version,
+                "carried_over": carried_over}
+
+    def _update_render_cache(self, previous_version: str, version: str) -> Optional[int]:
+        """Keep cached renders the last ingest did not affect, drop the rest
+
+        Returns the number of entries carried over, or None if the ingest
+        manifest does not describe this exact change.
+        """
+        if self.render_cache is None:
+            return None
+        last_change = load_manifest(self.data_dir / MANIFEST_NAME).get('last_change')
+        if last_change:
+            change_set = ChangeSet.from_dict(last_change)
+            if change_set.previous_version == previous_version and change_set.version == version:
+                return self.render_cache.carry_over(previous_version, version, change_set.policy_standards)
+        self.render_cache.retain_corpus_version(version)
+        return None
+
+    def check(self) -> Optional[Future]:
+        """Reload if the data files changed and looked the same at the previous check"""
+        stamp = data_stamp(self.data_dir)
+        seen, self._seen = self._seen, stamp
+        if stamp == self._stamp or stamp != seen:
+            return None
+        return self.reload()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.exception("Corpus watcher error: %s", e)
+
+    def start(self) -> 'CorpusManager':
+        """Start watching the data directory (idempotent, no-op without a poll interval)"""
+        with self._lock:
+            if self.poll_interval > 0 and self._watcher is None:
+                self._stop.clear()
+                self._watcher = threading.Thread(target=self._watch, name='corpus-watcher', daemon=True)
+                self._watcher.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the watcher and wait for a running reload (``start`` or ``reload`` work again afterwards)"""
+        self._stop.set()
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.join()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict:
+        return {
+            "data_dir": str(self.data_dir),
+            "version": self._corpus.version,
+            "reloads": self.reloads,
+            "loaded_at": datetime.fromtimestamp(self.loaded_at).isoformat(timespec='seconds'),
+            "watching": self._watcher is not None,
+            "poll_interval": self.poll_interval,
+            "last_error": self.last_error,
+        }
+
+
+_manager: Optional[CorpusManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_corpus_manager() -> CorpusManager:
+    """Return the process-wide manager of the processed data directory, configured from the environment"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = CorpusManager(poll_interval=float(os.getenv('CORPUS_WATCH_INTERVAL', '5')))
+        return _manager
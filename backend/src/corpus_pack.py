@@ -0,0 +1,201 @@
+import hashlib
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+# File layout: fixed header, then the payload the header checksums.
+#   header:  magic, format version, reserved, payload length, sha256(payload), corpus version
+#   payload: u32 manifest length, manifest (JSON), string table, uint32 arrays
+#
+# Every string in the corpus is stored once in the string table, NUL separated.
+# Documents are stored as columns: a string column is one array of string ids,
+# a list column is an array of string ids plus an array of row offsets. String
+# id 0 stands for None.
+MAGIC = b'CCFPACK\x00'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHI32s16s')
+PACK_FILENAME = 'corpus.pack'
+
+STRING_COLUMN = 'str'
+LIST_COLUMN = 'list'
+
+# {"controls": [record, ...]} documents and {key: record} documents
+RECORDS_DOCUMENT = 'records'
+KEYED_DOCUMENT = 'keyed'
+
+
+class CorpusPackError(ValueError):
+    """Raised when a corpus pack is corrupt, stale or cannot hold a document"""
+
+
+def _uint32(values: List[int]) -> bytes:
+    packed = array('I', values)
+    if packed.itemsize != 4:
+        raise CorpusPackError("Platform has no 4-byte unsigned int array type")
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+class _Encoder:
+    """Accumulates the string table and arrays of one pack"""
+
+    def __init__(self):
+        self.string_ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+        self.arrays: List[bytes] = []
+        self.offset = 0
+
+    def string_id(self, value) -> int:
+        if value is None:
+            return 0
+        if not isinstance(value, str) or '\x00' in value:
+            raise CorpusPackError(f"Cannot pack value {value!r}")
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            self.strings.append(value)
+            string_id = self.string_ids[value] = len(self.strings)
+        return string_id
+
+    def add_array(self, values: List[int]) -> List[int]:
+        """Append a uint32 array and return its [offset, count] reference"""
+        data = _uint32(values)
+        reference = [self.offset, len(values)]
+        self.arrays.append(data)
+        self.offset += len(data)
+        return reference
+
+    def table(self, records: List[Dict]) -> Dict:
+        """Encode records sharing one set of keys as columns"""
+        if not records:
+            return {"rows": 0, "columns": []}
+        names = list(records[0])
+        if not names or any(list(record) != names for record in records):
+            raise CorpusPackError("Records do not share the same fields")
+
+        columns = []
+        for name in names:
+            cells = [record[name] for record in records]
+            if all(isinstance(cell, list) for cell in cells):
+                offsets = [0]
+                ids = []
+                for cell in cells:
+                    ids.extend(self.string_id(item) for item in cell)
+                    offsets.append(len(ids))
+                columns.append([name, LIST_COLUMN, self.add_array(ids), self.add_array(offsets)])
+            else:
+                columns.append([name, STRING_COLUMN, self.add_array([self.string_id(cell) for cell in cells])])
+        return {"rows": len(records), "columns": columns}
+
+    def document(self, document: Any) -> Dict:
+        if not isinstance(document, dict):
+            raise CorpusPackError("Documents must be JSON objects")
+        if len(document) == 1 and isinstance(next(iter(document.values())), list):
+            (key, records), = document.items()
+            return {"kind": RECORDS_DOCUMENT, "key": key, **self.table(records)}
+        if all(isinstance(record, dict) for record in document.values()):
+            keys = list(document)
+            return {"kind": KEYED_DOCUMENT, "keys": self.add_array([self.string_id(key) for key in keys]),
+                    **self.table(list(document.values()))}
+        raise CorpusPackError("Unsupported document layout")
+
+
+def encode_pack(documents: Dict[str, Any], version: str, sources: Optional[List] = None) -> bytes:
+    """Encode processed corpus documents, tagged with the corpus version they came from
+
+    ``sources`` is a stamp of the source files (see corpus.source_stamp) that
+    lets loaders trust the pack without reading and hashing those files.
+    Raises CorpusPackError if a document does not fit the columnar layout
+    (the corpus is then simply loaded from JSON).
+    """
+    encoder = _Encoder()
+    manifest = {"documents": {name: encoder.document(document) for name, document in documents.items()},
+                "sources": sources}
+
+    string_table = '\x00'.join(encoder.strings).encode('utf-8')
+    manifest["strings"] = [len(encoder.strings), len(string_table)]
+    string_table += b'\x00' * (-len(string_table) % 4)
+
+    manifest_bytes = json.dumps(manifest, separators=(',', ':')).encode('utf-8')
+    manifest_bytes += b' ' * (-len(manifest_bytes) % 4)
+    payload = b''.join([struct.pack('<I', len(manifest_bytes)), manifest_bytes, string_table, *encoder.arrays])
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(payload), hashlib.sha256(payload).digest(),
+                         version.encode('ascii'))
+    pack = header + payload
+
+    # Never write a pack that does not reproduce its source exactly
+    decoded, _ = decode_pack(pack)
+    if json.dumps(decoded) != json.dumps(documents):
+        raise CorpusPackError("Pack does not round-trip its documents")
+    return pack
+
+
+def read_header(data: bytes) -> Tuple[int, str]:
+    """Validate the header and checksum and return (payload length, corpus version)"""
+    if len(data) < HEADER.size:
+        raise CorpusPackError("Pack is truncated")
+    magic, format_version, _, length, checksum, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise CorpusPackError("Not a corpus pack")
+    if format_version != FORMAT_VERSION:
+        raise CorpusPackError(f"Unsupported corpus pack version {format_version}")
+    if len(data) != HEADER.size + length:
+        raise CorpusPackError("Pack is truncated")
+    if hashlib.sha256(memoryview(data)[HEADER.size:]).digest() != checksum:
+        raise CorpusPackError("Pack checksum mismatch")
+    return length, version.rstrip(b'\x00').decode('ascii')
+
+
+def decode_pack(data: bytes, expected_version: Optional[str] = None,
+                expected_sources: Optional[List] = None) -> Tuple[Dict[str, Any], str]:
+    """Decode a pack into its documents and corpus version
+
+    Raises CorpusPackError if the pack is invalid, was built from a different
+    corpus version than ``expected_version`` or from source files whose stamp
+    differs from ``expected_sources``.
+    """
+    if sys.byteorder != 'little':
+        raise CorpusPackError("Corpus packs are only read on little-endian platforms")
+    _, version = read_header(data)
+    if expected_version is not None and version != expected_version:
+        raise CorpusPackError(f"Pack is for corpus {version}, expected {expected_version}")
+
+    payload = memoryview(data)[HEADER.size:]
+    manifest_length, = struct.unpack_from('<I', payload)
+    position = 4 + manifest_length
+    manifest = json.loads(bytes(payload[4:position]))
+    if expected_sources is not None and manifest.get("sources") != expected_sources:
+        raise CorpusPackError("Pack was built from different source files")
+
+    count, table_length = manifest["strings"]
+    table = str(payload[position:position + table_length], 'utf-8')
+    strings = [None] + (table.split('\x00') if count else [])
+    if len(strings) != count + 1:
+        raise CorpusPackError("String table is corrupt")
+    arrays = payload[position + table_length + (-table_length % 4):]
+    lookup = strings.__getitem__
+
+    def ids(reference):
+        offset, length = reference
+        return arrays[offset:offset + 4 * length].cast('I')
+
+    def column(spec):
+        kind, values = spec[1], spec[2]
+        cells = list(map(lookup, ids(values)))
+        if kind == LIST_COLUMN:
+            offsets = ids(spec[3]).tolist()
+            cells = [cells[start:end] for start, end in zip(offsets, offsets[1:])]
+        return cells
+
+    documents = {}
+    for name, spec in manifest["documents"].items():
+        names = [column_spec[0] for column_spec in spec["columns"]]
+        records = [dict(zip(names, row)) for row in zip(*map(column, spec["columns"]))]
+        if spec["kind"] == KEYED_DOCUMENT:
+            documents[name] = dict(zip(map(lookup, ids(spec["keys"])), records))
+        else:
+            documents[name] = {spec["key"]: records}
+    return documents, version
@@ -0,0 +1,105 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .control_cover import solve_cover
+
+
+class CoverageMatrix:
+    """Controls x frameworks coverage of a corpus, precomputed when the corpus loads
+
+    ``matrix[i, j]`` is True if control ``control_ids[i]`` has controls_mapping
+    references for ``frameworks[j]`` (the same source as the reference index
+    and policy generation). ``policies[k, i]`` is True if the control belongs
+    to ``policy_standards[k]``. Every query is a column selection plus a sum
+    or a matrix product over these arrays; minimal control sets come from
+    the set-cover solver in control_cover.
+    """
+
+    __slots__ = ('index', 'frameworks', 'control_ids', 'policy_standards', 'matrix', 'policies',
+                 '_framework_columns', '_control_rows')
+
+    def __init__(self, index, control_ids: Sequence[str]):
+        self.index = index
+        self.frameworks = tuple(index.frameworks)
+        self.control_ids = tuple(control_ids)
+        self.policy_standards = tuple(index.policy_standards())
+        self._framework_columns = {framework: column for column, framework in enumerate(self.frameworks)}
+        self._control_rows = {control_id: row for row, control_id in enumerate(self.control_ids)}
+
+        self.matrix = np.zeros((len(self.control_ids), len(self.frameworks)), dtype=bool)
+        for framework, column in self._framework_columns.items():
+            rows = [self._control_rows[control_id] for control_id in index.mapped_ids_for_framework(framework)
+                    if control_id in self._control_rows]
+            self.matrix[rows, column] = True
+
+        self.policies = np.zeros((len(self.policy_standards), len(self.control_ids)), dtype=bool)
+        for position, policy_standard in enumerate(self.policy_standards):
+            rows = [self._control_rows[control_id] for control_id in index.ids_for_policy(policy_standard)
+                    if control_id in self._control_rows]
+            self.policies[position, rows] = True
+
+    @classmethod
+    def from_corpus(cls, corpus) -> 'CoverageMatrix':
+        """Build the matrix over every control of a ControlCorpus, sorted by id"""
+        control_ids = {record['ccf_id']
+                       for document in (corpus.control_guidance, corpus.controls_data)
+                       for record in document.get('controls', ()) if record.get('ccf_id')}
+        control_ids.update(corpus.controls_mapping)
+        return cls(corpus.index, sorted(control_ids))
+
+    def columns(self, frameworks: Optional[Iterable[str]] = None) -> List[int]:
+        """Return the matrix columns of frameworks (all by default)
+
+        Raises KeyError for an unknown framework.
+        """
+        if frameworks is None:
+            return list(range(len(self.frameworks)))
+        return [self._framework_columns[framework] for framework in frameworks]
+
+    def framework_counts(self, frameworks: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Number of controls with references for each framework"""
+        columns = self.columns(frameworks)
+        counts = self.matrix[:, columns].sum(axis=0)
+        return {self.frameworks[column]: int(count) for column, count in zip(columns, counts)}
+
+    def overlap(self, frameworks: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        """Number of controls with references for both frameworks of every pair (diagonal: per framework)"""
+        columns = self.columns(frameworks)
+        selected = self.matrix[:, columns].astype(np.int32)
+        shared = selected.T @ selected
+        names = [self.frameworks[column] for column in columns]
+        return {name: {other: int(count) for other, count in zip(names, row)} for name, row in zip(names, shared)}
+
+    def any_coverage(self, frameworks: Optional[Iterable[str]] = None) -> int:
+        """Number of controls with references for at least one of the frameworks"""
+        return int(self.matrix[:, self.columns(frameworks)].any(axis=1).sum())
+
+    def policy_coverage(self, frameworks: Optional[Iterable[str]] = None,
+                        policy_standard: Optional[str] = None) -> Dict[str, Dict]:
+        """Per policy standard: its number of controls and how many have references for each framework
+
+        Raises KeyError for an unknown policy standard.
+        """
+        columns = self.columns(frameworks)
+        policies = self.policies
+        names = self.policy_standards
+        if policy_standard is not None:
+            if policy_standard not in names:
+                raise KeyError(policy_standard)
+            position = names.index(policy_standard)
+            policies, names = policies[position:position + 1], (policy_standard,)
+
+        counts = policies.astype(np.int32) @ self.matrix[:, columns].astype(np.int32)
+        totals = policies.sum(axis=1)
+        return {
+            name: {
+                "controls": int(total),
+                "frameworks": {self.frameworks[column]: int(count) for column, count in zip(columns, row)},
+            }
+            for name, total, row in zip(names, totals, counts)
+        }
+
+    def minimal_controls(self, frameworks: Iterable[str]) -> Dict:
+        """Pick a small set of controls that together cover every reference of the frameworks (see solve_cover)"""
+        return solve_cover(self.index, frameworks).to_dict()
@@ -1,25 +1,77 @@
 import pandas as pd
+import hashlib
+import copy
 import json
 import logging
 from pathlib import Path
 import numpy as np
+from .artifacts import atomic_open, atomic_write
+from .corpus import get_corpus, load_pack, read_sources, refresh_corpus, write_corpus_pack
+from .corpus_pack import CorpusPackError
+from .ingest_manifest import (MANIFEST_FORMAT, MANIFEST_NAME, ChangeSet, diff_ids, file_digest,
+                              load_manifest, row_fingerprints)
+from .utils.logger import logging_configured, setup_logging
+
+logger = logging.getLogger(__name__)
+
+NA_VALUES = ['', 'NA', 'N/A']
+REQUIRED_GUIDANCE_COLUMNS = {
+    'ccf_id', 'control_domain', 'control_name',
+    'control_description', 'policy_standard'
+}
+TEXT_COLUMNS = [
+    'control_description', 'implementation_guidance',
+    'testing_procedure', 'control_name'
+]
+
+# "json" writes one document per file; "jsonl" streams one record per line
+OUTPUT_LAYOUTS = ('json', 'jsonl')
+DEFAULT_CHUNKSIZE = 5000
+
+# Frameworks marked with an 'X' in controls_v2.csv, each with a matching *_ref column
+FRAMEWORK_COLUMNS = [
+    'nist_cybersecurity', 'bsi_c5', 'cis_v8', 'mlps', 'iso_22301',
+    'cyber_essentials_uk', 'ens', 'iso_27001', 'iso_27002', 'iso_27017',
+    'iso_27018', 'tx_ramp_L1', 'fedramp_tailored', 'fedramp_moderate',
+    'hipaa_security', 'irap', 'ismap', 'mas', 'pci_dss_v4', 'kfsi', 'soc_2'
+]
+FRAMEWORK_REF_COLUMNS = [f"{framework}_ref" for framework in FRAMEWORK_COLUMNS]
+# Read as text: pandas infers types per chunk, and a chunk whose refs are all
+# numeric would otherwise turn "60" into 60.0 and "4.10" into 4.1
+STRING_COLUMNS = {column: str for column in FRAMEWORK_COLUMNS + FRAMEWORK_REF_COLUMNS}
+
+def regroup(parts: pd.Series, length: int) -> list:
+    """Collect exploded items back into one list per row
+    
+    ``parts`` must be indexed by row position in ascending order, as produced
+    by ``explode``; rows without any items get an empty list.
+    """
+    values = parts.tolist()
+    ends = np.cumsum(np.bincount(parts.index.to_numpy(dtype=np.int64), minlength=length)).tolist()
+    return [values[start:end] for start, end in zip([0] + ends[:-1], ends)]
+
+def write_json_lines(file, records) -> int:
+    """Write records to an open text file as JSON Lines and return how many were written"""
+    count = 0
+    for record in records:
+        file.write(json.dumps(record, ensure_ascii=False))
+        file.write('\n')
+        count += 1
+    return count
 
 class DataProcessor:
     def __init__(self, raw_data_path, processed_data_path):
         """Initialize with paths as strings"""
         self.raw_data_path = raw_data_path
         self.processed_data_path = processed_data_path
-        print(f"\n=== DataProcessor Initialization ===")
-        print(f"Raw data path: {self.raw_data_path}")
-        print(f"Processed data path: {self.processed_data_path}")
         self.setup_logging()
+        logger.debug("DataProcessor raw data path: %s, processed data path: %s",
+                     self.raw_data_path, self.processed_data_path)
 
     def setup_logging(self):
-        """Setup logging configuration"""
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        """Configure logging (see src.utils.logger) unless the application already has"""
+        if not logging_configured():
+            setup_logging()
 
     def clean_framework_references(self, value):
         """
@@ -100,37 +152,76 @@ class DataProcessor:
         # Remove duplicates while preserving order
         return list(dict.fromkeys(artifacts))
 
-    def create_controls_mapping(self, controls_df: pd.DataFrame) -> dict:
+    def clean_framework_reference_column(self, column: pd.Series) -> pd.Series:
+        """
+        Column-wise equivalent of clean_framework_references.
+        
+        Strings are split on newlines and commas with vectorized string
+        operations, exploded to one reference per row and grouped back into
+        lists, so the result matches applying clean_framework_references to
+        every cell.
+        """
+        values = column.reset_index(drop=True)
+        is_list = values.map(lambda value: isinstance(value, (list, np.ndarray))).astype(bool)
+        
+        # Cells that are already lists only have their items stripped
+        items = values[is_list].explode().dropna().astype(str)
+        items = items[items.str.strip() != ''].str.strip().str.replace('¿½', '', regex=False)
+        
+        strings = values[~is_list & values.notna()].astype(str)
+        refs = strings.str.replace('¿½', '', regex=False).str.split(r'[\n,]', regex=True).explode().str.strip()
+        refs = refs[refs != '']
+        
+        parts = pd.concat([items, refs]).sort_index(kind='stable')
+        return pd.Series(regroup(parts, len(values)), index=column.index, dtype=object)
+
+    def clean_text_column(self, column: pd.Series) -> pd.Series:
+        """Column-wise equivalent of clean_text_field"""
+        text = column.astype(object).where(column.notna(), '').astype(str)
+        text = text.str.replace('\u2018', "'", regex=False).str.replace('\u2019', "'", regex=False)
+        text = text.str.replace('\u201c', '"', regex=False).str.replace('\u201d', '"', regex=False)
+        return text.str.split().str.join(' ')
+
+    def clean_audit_artifacts_column(self, column: pd.Series) -> pd.Series:
+        """Column-wise equivalent of clean_audit_artifacts"""
+        values = column.reset_index(drop=True)
+        artifacts = values[values.notna()].astype(str).str.split('\n').explode().str.strip()
+        artifacts = artifacts[artifacts != '']
+        # Drop repeats of the same artifact within a row, keeping the first
+        artifacts = artifacts[~artifacts.reset_index().duplicated().to_numpy()]
+        return pd.Series(regroup(artifacts, len(values)), index=column.index, dtype=object)
+
+    def clean_framework_flag_column(self, column: pd.Series) -> pd.Series:
+        """Standardize a framework column to 'X' where the control is in scope, else None"""
+        marked = column.notna() & column.astype(str).str.strip().str.upper().eq('X')
+        return pd.Series(np.where(marked, 'X', None), index=column.index, dtype=object)
+
+    def create_controls_mapping(self, controls_df: pd.DataFrame, clean: bool = True) -> dict:
         """
         Create a mapping of controls to framework references.
         
         Args:
             controls_df: DataFrame containing control framework mappings
+            clean: Clean the reference columns first; pass False when they
+                already hold cleaned lists
             
         Returns:
             dict: Mapping of control IDs to their framework references
         """
-        framework_columns = [
-            'nist_cybersecurity_ref', 'bsi_c5_ref', 'cis_v8_ref', 'mlps_ref', 
-            'iso_22301_ref', 'cyber_essentials_uk_ref', 'ens_ref', 'iso_27001_ref', 
-            'iso_27002_ref', 'iso_27017_ref', 'iso_27018_ref', 'tx_ramp_L1_ref',
-            'fedramp_tailored_ref', 'fedramp_moderate_ref', 'hipaa_security_ref',
-            'irap_ref', 'ismap_ref', 'mas_ref', 'pci_dss_v4_ref', 'kfsi_ref', 'soc_2_ref'
-        ]
+        control_ids = controls_df['ccf_id'].tolist()
+        references = []
+        for framework in FRAMEWORK_REF_COLUMNS:
+            if framework not in controls_df.columns:
+                references.append([[] for _ in control_ids])
+            elif clean:
+                references.append(self.clean_framework_reference_column(controls_df[framework]).tolist())
+            else:
+                references.append([list(refs) for refs in controls_df[framework]])
         
-        mapping = {}
-        for _, row in controls_df.iterrows():
-            control_id = row['ccf_id']
-            framework_map = {}
-            
-            for framework in framework_columns:
-                value = row.get(framework)
-                # Clean and keep the actual reference value
-                framework_map[framework] = self.clean_framework_references(value)
-                    
-            mapping[control_id] = framework_map
-            
-        return mapping
+        return {
+            control_id: dict(zip(FRAMEWORK_REF_COLUMNS, control_refs))
+            for control_id, control_refs in zip(control_ids, zip(*references))
+        }
 
     def create_erl_mapping(self, erl_df: pd.DataFrame) -> dict:
         """
@@ -142,148 +233,351 @@ class DataProcessor:
         Returns:
             dict: Mapping of evidence references with their details
         """
-        erl_mapping = {}
-        
-        for _, row in erl_df.iterrows():
-            reference_id = row['reference_id']
-            erl_mapping[reference_id] = {
-                'evidence_domain': row['evidence_domain'],
-                'evidence_title': row['evidence_title']
-            }
-            
-        return erl_mapping
+        return {
+            reference_id: {'evidence_domain': domain, 'evidence_title': title}
+            for reference_id, domain, title in zip(
+                erl_df['reference_id'].tolist(),
+                erl_df['evidence_domain'].tolist(),
+                erl_df['evidence_title'].tolist()
+            )
+        }
+
+    def read_csv(self, filename: str, chunksize: int = None):
+        """Read a raw CSV, or return an iterator of DataFrames when chunksize is set"""
+        return pd.read_csv(
+            self.raw_data_path / filename,
+            encoding='utf-8',
+            na_values=NA_VALUES,
+            dtype=STRING_COLUMNS,
+            chunksize=chunksize
+        )
+
+    def clean_controls(self, controls_df: pd.DataFrame) -> pd.DataFrame:
+        """Clean framework references and standardize framework flags in place"""
+        for column in controls_df.columns:
+            if column.endswith('_ref'):
+                controls_df[column] = self.clean_framework_reference_column(controls_df[column])
+            elif column in FRAMEWORK_COLUMNS:
+                controls_df[column] = self.clean_framework_flag_column(controls_df[column])
+        return controls_df
+
+    def clean_guidance(self, guidance_df: pd.DataFrame) -> pd.DataFrame:
+        """Validate control guidance columns and clean text fields and audit artifacts in place"""
+        if not REQUIRED_GUIDANCE_COLUMNS.issubset(guidance_df.columns):
+            missing = REQUIRED_GUIDANCE_COLUMNS - set(guidance_df.columns)
+            raise ValueError(f"Missing required columns: {missing}")
+
+        for col in TEXT_COLUMNS:
+            if col in guidance_df.columns:
+                guidance_df[col] = self.clean_text_column(guidance_df[col])
 
-    def convert_csv_to_json(self):
+        # Convert audit artifacts to arrays before JSON conversion
+        guidance_df['audit_artifacts'] = self.clean_audit_artifacts_column(
+            guidance_df['audit_artifacts']
+        )
+        return guidance_df
+
+    def convert_csv_to_json(self, layout: str = 'json', chunksize: int = None, incremental: bool = False):
         """
         Convert CSV files to JSON format with improved data cleaning and validation.
         
+        Args:
+            layout: "json" writes each file as one JSON document, "jsonl"
+                streams the CSVs in chunks to JSON Lines files
+            chunksize: Rows per chunk in the "jsonl" layout
+            incremental: Only re-clean rows that changed since the last run
+                ("json" layout, see convert_csv_to_json_incremental)
+        
+        Returns:
+            ChangeSet: What changed since the last "json" ingest (None for "jsonl")
+        
         Raises:
             FileNotFoundError: If source CSV files are not found
-            ValueError: If required columns are missing
+            ValueError: If required columns are missing or the layout is unknown
         """
-        try:
-            print(f"Processing CSV files from {self.raw_data_path} to {self.processed_data_path}")
-            
-            # Read CSVs with explicit encoding
-            controls_df = pd.read_csv(
-                self.raw_data_path / 'controls_v2.csv',
-                encoding='utf-8',
-                na_values=['', 'NA', 'N/A']
-            )
-            guidance_df = pd.read_csv(
-                self.raw_data_path / 'control_guidance.csv', 
-                encoding='utf-8',
-                na_values=['', 'NA', 'N/A']
-            )
-            erl_df = pd.read_csv(
-                self.raw_data_path / 'erl.csv',
-                encoding='utf-8',
-                na_values=['', 'NA', 'N/A']
-            )
-            
-            # Validate required columns
-            required_columns = {
-                'ccf_id', 'control_domain', 'control_name',
-                'control_description', 'policy_standard'
-            }
-            if not required_columns.issubset(guidance_df.columns):
-                missing = required_columns - set(guidance_df.columns)
-                raise ValueError(f"Missing required columns: {missing}")
-
-            # Clean text fields
-            text_columns = [
-                'control_description', 'implementation_guidance',
-                'testing_procedure', 'control_name'
-            ]
-            for col in text_columns:
-                if col in guidance_df.columns:
-                    guidance_df[col] = guidance_df[col].apply(self.clean_text_field)
-
-            # Convert audit artifacts to arrays before JSON conversion
-            guidance_df['audit_artifacts'] = guidance_df['audit_artifacts'].apply(
-                self.clean_audit_artifacts
-            )
+        if layout not in OUTPUT_LAYOUTS:
+            raise ValueError(f"Unknown output layout: {layout}")
 
-            # Process framework columns in controls_df
-            framework_columns = [
-                'nist_cybersecurity', 'bsi_c5', 'cis_v8', 'mlps', 'iso_22301',
-                'cyber_essentials_uk', 'ens', 'iso_27001', 'iso_27002', 'iso_27017',
-                'iso_27018', 'tx_ramp_L1', 'fedramp_tailored', 'fedramp_moderate',
-                'hipaa_security', 'irap', 'ismap', 'mas', 'pci_dss_v4', 'kfsi', 'soc_2'
-            ]
+        try:
+            logger.info("Processing CSV files from %s to %s", self.raw_data_path, self.processed_data_path)
             
-            # Clean framework references and standardize values
-            for column in controls_df.columns:
-                if column.endswith('_ref'):
-                    controls_df[column] = controls_df[column].apply(self.clean_framework_references)
-                elif column in framework_columns:
-                    controls_df[column] = controls_df[column].apply(
-                        lambda x: 'X' if pd.notnull(x) and str(x).strip().upper() == 'X' else None
-                    )
+            if layout == 'jsonl':
+                self.convert_csv_to_json_lines(chunksize or DEFAULT_CHUNKSIZE)
+                logger.info("Successfully converted CSV files to JSON Lines format")
+                return None
 
-            # Convert to dictionaries while ensuring audit_artifacts remains as array
-            controls_records = controls_df.to_dict(orient='records')
-            guidance_records = guidance_df.to_dict(orient='records')
-            
-            # Create final JSON structures
-            controls_json = {"controls": controls_records}
-            guidance_json = {"controls": guidance_records}
-                
-            # Save all files
-            files_to_save = [
-                ('controls_v2.json', controls_json),
-                ('control_guidance.json', guidance_json),
-                ('controls_mapping.json', self.create_controls_mapping(controls_df)),
-                ('erl.json', self.create_erl_mapping(erl_df))
-            ]
-            
-            for filename, data in files_to_save:
-                file_path = self.processed_data_path / filename
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                print(f"Created: {file_path}")
-                
-            print("\nSuccessfully converted CSV files to JSON format")
+            change_set = self.convert_csv_to_json_incremental(reuse=incremental)
+            logger.info("Controls added: %d, modified: %d, removed: %d; affected policy standards: %d",
+                        len(change_set.added), len(change_set.modified), len(change_set.removed),
+                        len(change_set.policy_standards))
+            logger.info("Successfully converted CSV files to JSON format")
+            return change_set
                 
         except FileNotFoundError as e:
-            logging.error(f"Source CSV file not found: {str(e)}")
+            logger.error("Source CSV file not found: %s", e)
             raise
         except Exception as e:
-            logging.error(f"Error processing CSV files: {str(e)}")
+            logger.error("Error processing CSV files: %s", e)
             raise
 
+    def _previous_outputs(self, manifest: dict) -> dict:
+        """Load the JSON files of the last ingest, skipping any changed since it wrote them"""
+        outputs = {}
+        for filename, digest in manifest.get('outputs', {}).items():
+            file_path = Path(self.processed_data_path) / filename
+            if digest and file_digest(file_path) == digest:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    outputs[filename] = json.load(f)
+        return outputs
+
+    def convert_csv_to_json_incremental(self, reuse: bool = True) -> ChangeSet:
+        """
+        Build the processed JSON files, reusing the records of unchanged rows.
+        
+        Every raw row is fingerprinted and the fingerprints are kept in
+        ingest_manifest.json. With ``reuse``, rows whose fingerprint matches
+        the last run are taken from the previous JSON output instead of being
+        cleaned again (the result is identical to a full rebuild). Files
+        whose content did not change are not rewritten, so their mtime and
+        any caches keyed on them stay valid.
+        
+        Returns:
+            ChangeSet: Controls and evidence references added, modified or
+                removed since the last run, and the affected policy standards
+        """
+        output = Path(self.processed_data_path)
+        manifest = load_manifest(output / MANIFEST_NAME)
+        previous_rows = manifest.get('sources', {})
+        previous = self._previous_outputs(manifest)
+        try:
+            previous_version = read_sources(output)[1]
+        except FileNotFoundError:
+            previous_version = None
+        
+        frames = {name: self.read_csv(name) for name in ('controls_v2.csv', 'control_guidance.csv', 'erl.csv')}
+        rows = {}
+        for name, id_column in (('controls_v2.csv', 'ccf_id'), ('control_guidance.csv', 'ccf_id'),
+                                ('erl.csv', 'reference_id')):
+            rows[name] = dict(zip(frames[name][id_column].tolist(), row_fingerprints(frames[name])))
+        
+        def changed_rows(name, id_column, *previous_files):
+            """Boolean mask of the rows to clean; all of them unless every previous output can be reused"""
+            df = frames[name]
+            ids = df[id_column].tolist()
+            known = previous_rows.get(name, {})
+            # Reuse needs unique ids now and one previous record per known row
+            reusable = reuse and len(rows[name]) == len(ids) and all(
+                filename in previous and len(previous[filename].get('controls', previous[filename])) == len(known)
+                for filename in previous_files
+            )
+            if not reusable:
+                return np.ones(len(ids), dtype=bool), False
+            return np.array([known.get(row_id) != rows[name][row_id] for row_id in ids], dtype=bool), True
+        
+        def merge(ids, fresh, old, reusing):
+            """Records in source order, cleaned ones from fresh and the rest from old"""
+            if not reusing:
+                return fresh
+            return [fresh[row_id] if row_id in fresh else old[row_id] for row_id in ids]
+        
+        # controls_v2.json and controls_mapping.json
+        controls_df = frames['controls_v2.csv']
+        control_ids = controls_df['ccf_id'].tolist()
+        mask, reusing = changed_rows('controls_v2.csv', 'ccf_id', 'controls_v2.json', 'controls_mapping.json')
+        cleaned = self.clean_controls(controls_df[mask].copy())
+        mapping = self.create_controls_mapping(cleaned, clean=False)
+        if reusing:
+            fresh = dict(zip(cleaned['ccf_id'].tolist(), cleaned.to_dict(orient='records')))
+            old = {record['ccf_id']: record for record in previous['controls_v2.json']['controls']}
+            controls_records = merge(control_ids, fresh, old, True)
+            old_mapping = previous['controls_mapping.json']
+            mapping = {control_id: mapping[control_id] if control_id in mapping else old_mapping[control_id]
+                       for control_id in control_ids}
+        else:
+            controls_records = cleaned.to_dict(orient='records')
+        
+        # control_guidance.json
+        guidance_df = frames['control_guidance.csv']
+        mask, reusing = changed_rows('control_guidance.csv', 'ccf_id', 'control_guidance.json')
+        cleaned = self.clean_guidance(guidance_df[mask].copy())
+        if reusing:
+            fresh = dict(zip(cleaned['ccf_id'].tolist(), cleaned.to_dict(orient='records')))
+            old = {record['ccf_id']: record for record in previous['control_guidance.json']['controls']}
+            guidance_records = merge(guidance_df['ccf_id'].tolist(), fresh, old, True)
+        else:
+            guidance_records = cleaned.to_dict(orient='records')
+        
+        # erl.json
+        erl_df = frames['erl.csv']
+        mask, reusing = changed_rows('erl.csv', 'reference_id', 'erl.json')
+        erl = self.create_erl_mapping(erl_df[mask])
+        if reusing:
+            old_erl = previous['erl.json']
+            erl = {reference_id: erl[reference_id] if reference_id in erl else old_erl[reference_id]
+                   for reference_id in erl_df['reference_id'].tolist()}
+        
+        # Save the files whose content changed
+        documents = [
+            ('controls_v2.json', {"controls": controls_records}),
+            ('control_guidance.json', {"controls": guidance_records}),
+            ('controls_mapping.json', mapping),
+            ('erl.json', erl)
+        ]
+        files_written = []
+        outputs = {}
+        for filename, data in documents:
+            file_path = output / filename
+            content = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+            outputs[filename] = hashlib.sha256(content).hexdigest()
+            if file_digest(file_path) != outputs[filename]:
+                atomic_write(file_path, content)
+                files_written.append(filename)
+                logger.info("Created: %s", file_path)
+            else:
+                logger.info("Unchanged: %s", file_path)
+        version = read_sources(output)[1]
+        
+        # Precompiled copy of the JSON files for fast corpus loading; optional
+        if files_written or load_pack(output, version) is None:
+            try:
+                logger.info("Created: %s", write_corpus_pack(output))
+            except CorpusPackError as e:
+                logger.warning("Corpus pack not written, the corpus will load from JSON: %s", e)
+        if files_written:
+            refresh_corpus(output)
+        
+        change_set = self._change_set(previous_rows, rows, previous, guidance_records, files_written,
+                                      previous_version, version)
+        new_manifest = {
+            "format": MANIFEST_FORMAT,
+            "sources": rows,
+            "outputs": outputs,
+            "last_change": change_set.to_dict() if change_set.changed else manifest.get('last_change'),
+        }
+        if new_manifest != manifest:
+            atomic_write(output / MANIFEST_NAME, json.dumps(new_manifest, indent=2).encode('utf-8'))
+        return change_set
+
+    def _change_set(self, previous_rows, rows, previous, guidance_records, files_written,
+                    previous_version, version) -> ChangeSet:
+        """Diff the row fingerprints of two ingests and find the affected policy standards"""
+        controls = {}
+        for name in ('controls_v2.csv', 'control_guidance.csv'):
+            diff = diff_ids(previous_rows.get(name, {}), rows[name])
+            for kind, ids in diff.items():
+                controls.setdefault(kind, set()).update(ids)
+        # A control only counts as added or removed if it is new to (or gone from) both files
+        all_previous = set(previous_rows.get('controls_v2.csv', {})) | set(previous_rows.get('control_guidance.csv', {}))
+        all_current = set(rows['controls_v2.csv']) | set(rows['control_guidance.csv'])
+        added = all_current - all_previous
+        removed = all_previous - all_current
+        modified = (controls['added'] | controls['removed'] | controls['modified']) - added - removed
+        evidence = diff_ids(previous_rows.get('erl.csv', {}), rows['erl.csv'])
+        changed_evidence = evidence['added'] | evidence['removed'] | evidence['modified']
+        
+        old_guidance = previous.get('control_guidance.json', {}).get('controls', [])
+        changed_controls = added | removed | modified
+        policy_standards = {
+            record.get('policy_standard')
+            for record in list(old_guidance) + list(guidance_records)
+            if record.get('ccf_id') in changed_controls
+            or changed_evidence.intersection(record.get('audit_artifacts') or [])
+        }
+        if not previous_rows or 'control_guidance.json' not in previous:
+            # First run, or the previous guidance was changed since it was written: the old
+            # standards of removed or moved controls are unknown, so every standard is affected
+            policy_standards.update(record.get('policy_standard') for record in guidance_records)
+        
+        return ChangeSet(
+            added=added, modified=modified, removed=removed,
+            evidence_added=evidence['added'], evidence_modified=evidence['modified'],
+            evidence_removed=evidence['removed'],
+            policy_standards=[standard for standard in policy_standards if isinstance(standard, str)],
+            files_written=files_written, previous_version=previous_version, version=version
+        )
+
+    def convert_csv_to_json_lines(self, chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+        """
+        Stream the CSV files to JSON Lines, holding at most one chunk of rows in memory.
+        
+        Each line of controls_v2.jsonl and control_guidance.jsonl is one
+        control record. controls_mapping.jsonl holds one
+        {"ccf_id", *_ref...} object per control and erl.jsonl one
+        {"reference_id", "evidence_domain", "evidence_title"} object per
+        evidence reference. Every output file is replaced atomically once it
+        is complete.
+        
+        Returns:
+            dict: Number of lines written per file
+        """
+        output = Path(self.processed_data_path)
+        counts = {}
+        
+        # Open every source up front so a missing CSV fails before anything is written
+        with self.read_csv('controls_v2.csv', chunksize) as controls_chunks, \
+                self.read_csv('control_guidance.csv', chunksize) as guidance_chunks, \
+                self.read_csv('erl.csv', chunksize) as erl_chunks:
+            
+            with atomic_open(output / 'controls_v2.jsonl', 'w', encoding='utf-8') as controls_file, \
+                    atomic_open(output / 'controls_mapping.jsonl', 'w', encoding='utf-8') as mapping_file:
+                counts['controls_v2.jsonl'] = counts['controls_mapping.jsonl'] = 0
+                for chunk in controls_chunks:
+                    chunk = self.clean_controls(chunk)
+                    counts['controls_v2.jsonl'] += write_json_lines(controls_file, chunk.to_dict(orient='records'))
+                    mapping = self.create_controls_mapping(chunk, clean=False)
+                    counts['controls_mapping.jsonl'] += write_json_lines(
+                        mapping_file, ({'ccf_id': control_id, **refs} for control_id, refs in mapping.items())
+                    )
+            
+            with atomic_open(output / 'control_guidance.jsonl', 'w', encoding='utf-8') as guidance_file:
+                counts['control_guidance.jsonl'] = 0
+                for chunk in guidance_chunks:
+                    chunk = self.clean_guidance(chunk)
+                    counts['control_guidance.jsonl'] += write_json_lines(guidance_file, chunk.to_dict(orient='records'))
+            
+            with atomic_open(output / 'erl.jsonl', 'w', encoding='utf-8') as erl_file:
+                counts['erl.jsonl'] = 0
+                for chunk in erl_chunks:
+                    erl = self.create_erl_mapping(chunk)
+                    counts['erl.jsonl'] += write_json_lines(
+                        erl_file, ({'reference_id': reference_id, **details} for reference_id, details in erl.items())
+                    )
+        
+        for filename, count in counts.items():
+            logger.info("Created: %s (%d lines)", output / filename, count)
+        return counts
+
     def get_processed_controls(self):
         """Load and return processed controls data"""
         try:
-            print(f"Loading controls from: {self.raw_data_path}")
+            logger.debug("Loading controls from: %s", self.raw_data_path)
             with open(self.raw_data_path, 'r', encoding='utf-8') as f:
                 controls_data = json.load(f)
-            print(f"Successfully loaded {len(controls_data.get('controls', []))} controls")
+            logger.debug("Successfully loaded %d controls", len(controls_data.get('controls', [])))
             return controls_data
         except Exception as e:
-            print(f"Error loading controls: {str(e)}")
+            logger.error("Error loading controls: %s", e)
             raise
 
     def get_controls_by_policy(self, policy_name: str) -> list:
         """Retrieve controls for specified policy"""
-        logging.debug(f"Retrieving controls for policy: {policy_name}")
+        logger.debug("Retrieving controls for policy: %s", policy_name)
         
-        guidance_path = self.processed_data_path / 'control_guidance.json'
+        guidance_path = Path(self.processed_data_path) / 'control_guidance.json'
         if not guidance_path.exists():
             raise FileNotFoundError("Control guidance JSON not found. Run convert_csv_to_json first.")
-            
-        with open(guidance_path) as f:
-            data = json.load(f)
         
-        controls = [c for c in data["controls"] 
-                   if c["policy_standard"] == policy_name]
+        # Use the policy_standard index of the shared corpus instead of scanning every control;
+        # callers get copies, the corpus records are shared
+        controls = copy.deepcopy(get_corpus(self.processed_data_path).index.controls_for_policy(policy_name))
         
-        logging.debug(f"Found {len(controls)} controls: {[c['ccf_id'] for c in controls]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %d controls: %s", len(controls), [c['ccf_id'] for c in controls])
         return controls
 
     def get_framework_mappings(self, control_ids: list, frameworks: list) -> dict:
         """Get framework mappings for specified controls and frameworks"""
-        logging.debug(f"Getting framework mappings for controls: {control_ids}")
+        logger.debug("Getting framework mappings for controls: %s", control_ids)
         
         controls = self.get_processed_controls()
         
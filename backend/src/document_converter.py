@@ -1,10 +1,41 @@
+import logging
+import os
 from pathlib import Path
 from typing import Optional
-import pypandoc
+from . import docx_writer
+from .conversion_service import ConversionService, get_conversion_service
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('native', 'pandoc')
 
 class DocumentConverter:
+    def __init__(self, service: Optional[ConversionService] = None, engine: Optional[str] = None):
+        """Initialize with a DOCX engine and a conversion service (defaults to the shared pandoc worker pool)
+
+        The engine defaults to the DOCX_ENGINE environment variable, or 'native'.
+        """
+        engine = (engine or os.getenv('DOCX_ENGINE', 'native')).lower()
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown DOCX engine: {engine}. Available engines: {', '.join(ENGINES)}")
+        self.engine = engine
+        self.service = service or get_conversion_service()
+
+    def markdown_to_docx_bytes(self, markdown_content: str) -> bytes:
+        """Convert markdown text to Word document bytes
+
+        The native engine renders in-process and falls back to the pandoc worker
+        pool for markdown outside the subset it supports.
+        """
+        if self.engine == 'native':
+            try:
+                return docx_writer.markdown_to_docx_bytes(markdown_content)
+            except docx_writer.UnsupportedMarkdownError as e:
+                logger.info("Native DOCX writer fell back to pandoc: %s", e)
+        return self.service.convert(markdown_content, 'docx')
+
     def markdown_to_docx(self, source_path: Path, output_path: Optional[Path] = None) -> Path:
-        """Convert markdown file to Word document using pandoc"""
+        """Convert markdown file to Word document"""
         # Security: Validate source path
         source_path = Path(source_path).resolve()
         if not source_path.exists():
@@ -22,16 +53,8 @@ class DocumentConverter:
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Convert markdown to docx using pandoc
-        pypandoc.convert_file(
-            str(source_path),
-            'docx',
-            outputfile=str(output_path),
-            extra_args=[
-                '--standalone',
-                '--from', 'markdown-raw_html',
-                '--wrap=none'
-            ]
-        )
-        
-        return output_path
\ No newline at end of file
+        # Convert markdown to docx with the configured engine
+        docx_content = self.markdown_to_docx_bytes(source_path.read_text(encoding='utf-8'))
+        output_path.write_bytes(docx_content)
+
+        return output_path
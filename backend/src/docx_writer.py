@@ -0,0 +1,395 @@
+import io
+import re
+import zipfile
+from typing import List, Optional, Tuple
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+HEADING_RE = re.compile(r'^(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$')
+LIST_ITEM_RE = re.compile(r'^( *)([-*+]|\d{1,9}[.)])[ \t]+(.*)$')
+TABLE_SEPARATOR_RE = re.compile(r'^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+BOLD_RE = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*')
+SETEXT_RE = re.compile(r'^(=+|-+)\s*$')
+RULE_RE = re.compile(r'^ {0,3}([-*_])( *\1){2,} *$')
+UNSUPPORTED_INLINE_RE = re.compile(
+    r'`|\\|\$|!?\[[^\]]*\]\(|\[\^|<[a-zA-Z/!]|&#?\w+;|\^[^\s^]+\^|~[^\s~]*~|(?:^|\W)_|_(?:\W|$)'
+)
+INVALID_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+BULLETS = ('\u2022', '\u2013')
+
+# pandoc's default abbreviation list; with smart punctuation the space after one becomes non-breaking
+ABBREVIATIONS = (
+    'aet. aetat. al. Apr. Aug. bk. Bros. c. Capt. cf. ch. chap. chs. Co. col. Corp. cp. d. Dec. Dr. '
+    'e.g. ed. eds. esp. f. fasc. Feb. ff. fig. fl. fol. fols. Fr. Gen. Gov. Hon. i.e. ill. Inc. incl. '
+    'Jan. Jr. Jul. Jun. Ltd. M.A. M.D. Mar. Mr. Mrs. Ms. n. n.b. nn. No. Nov. Oct. p. Ph.D. pp. Pres. '
+    'Prof. pt. q.v. Rep. Rev. s.v. s.vv. saec. sec. Sen. Sep. Sept. Sgt. Sr. St. univ. viz. vol. vs.'
+).split()
+ABBREVIATION_RE = re.compile(
+    r'(?<![\w.])(' + '|'.join(re.escape(word) for word in ABBREVIATIONS) + r') +(?=\S)'
+)
+
+# Usable width of a US Letter page with 1 inch margins, in twentieths of a point
+TEXT_WIDTH = 9360
+
+
+class UnsupportedMarkdownError(ValueError):
+    """Raised for markdown constructs the native writer does not handle"""
+
+
+class Heading:
+    __slots__ = ('level', 'text')
+
+    def __init__(self, level: int, text: str):
+        self.level = level
+        self.text = text
+
+
+class Paragraph:
+    __slots__ = ('lines',)
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+
+
+class ListItem:
+    __slots__ = ('list_id', 'ordered', 'level', 'start', 'lines')
+
+    def __init__(self, list_id: int, ordered: bool, level: int, start: int, lines: List[str]):
+        self.list_id = list_id
+        self.ordered = ordered
+        self.level = level
+        self.start = start
+        self.lines = lines
+
+
+class Table:
+    __slots__ = ('alignments', 'header', 'rows')
+
+    def __init__(self, alignments: List[str], header: List[str], rows: List[List[str]]):
+        self.alignments = alignments
+        self.header = header
+        self.rows = rows
+
+
+def _split_row(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|'):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split('|')]
+
+
+def _alignment(spec: str) -> str:
+    spec = spec.strip()
+    if spec.startswith(':') and spec.endswith(':'):
+        return 'center'
+    if spec.endswith(':'):
+        return 'right'
+    return 'left'
+
+
+def parse_markdown(text: str) -> list:
+    """Parse the supported markdown subset into a list of blocks"""
+    lines = text.replace('\r\n', '\n').replace('\t', '    ').split('\n')
+    blocks = []
+    paragraph: Optional[List[str]] = None
+    # Open lists as (indent, list_id, ordered); the last entry is the innermost list
+    list_stack: List[Tuple[int, int, bool]] = []
+    after_blank = False
+    next_list_id = 0
+    i = 0
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        if not stripped:
+            paragraph = None
+            after_blank = True
+            i += 1
+            continue
+
+        if paragraph is not None:
+            # Like pandoc, a paragraph only ends at a blank line
+            if SETEXT_RE.match(stripped):
+                raise UnsupportedMarkdownError("Setext headings are not supported")
+            paragraph.append(line)
+            i += 1
+            continue
+
+        item = LIST_ITEM_RE.match(line)
+        if list_stack:
+            if item:
+                indent = len(item.group(1))
+                ordered = item.group(2)[0].isdigit()
+                while list_stack and indent < list_stack[-1][0]:
+                    list_stack.pop()
+                if list_stack and indent == list_stack[-1][0] and list_stack[-1][2] != ordered:
+                    list_stack.pop()
+                if not list_stack or indent > list_stack[-1][0]:
+                    next_list_id += 1
+                    list_stack.append((indent, next_list_id, ordered))
+                _, list_id, _ = list_stack[-1]
+                start = int(item.group(2)[:-1]) if ordered else 1
+                blocks.append(ListItem(list_id, ordered, len(list_stack) - 1, start, [item.group(3)]))
+                after_blank = False
+                i += 1
+                continue
+            if not after_blank:
+                # Lazy continuation of the previous list item
+                blocks[-1].lines.append(line)
+                i += 1
+                continue
+            if line.startswith('  '):
+                raise UnsupportedMarkdownError("Multi-paragraph list items are not supported")
+            list_stack = []
+
+        after_blank = False
+
+        if line.startswith('    '):
+            raise UnsupportedMarkdownError("Indented code blocks are not supported")
+        if stripped.startswith(('```', '~~~', '>', '<!--')) or RULE_RE.match(line):
+            raise UnsupportedMarkdownError(f"Unsupported block: {stripped[:20]}")
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            blocks.append(Heading(len(heading.group(1)), heading.group(2)))
+            i += 1
+            continue
+
+        if item:
+            ordered = item.group(2)[0].isdigit()
+            next_list_id += 1
+            list_stack = [(len(item.group(1)), next_list_id, ordered)]
+            start = int(item.group(2)[:-1]) if ordered else 1
+            blocks.append(ListItem(next_list_id, ordered, 0, start, [item.group(3)]))
+            i += 1
+            continue
+
+        if '|' in line and i + 1 < len(lines) and '|' in lines[i + 1] and TABLE_SEPARATOR_RE.match(lines[i + 1].strip()):
+            header = _split_row(line)
+            alignments = [_alignment(spec) for spec in _split_row(lines[i + 1])]
+            if len(alignments) != len(header):
+                raise UnsupportedMarkdownError("Table header and separator do not match")
+            rows = []
+            i += 2
+            while i < len(lines) and lines[i].strip() and '|' in lines[i]:
+                cells = _split_row(lines[i])[:len(header)]
+                rows.append(cells + [''] * (len(header) - len(cells)))
+                i += 1
+            blocks.append(Table(alignments, header, rows))
+            continue
+
+        paragraph = [line]
+        blocks.append(Paragraph(paragraph))
+        i += 1
+
+    return blocks
+
+
+def _escape(text: str) -> str:
+    text = INVALID_XML_RE.sub('', text)
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _smart(text: str) -> str:
+    """Apply pandoc's smart punctuation to plain text"""
+    text = text.replace('---', '\u2014').replace('--', '\u2013').replace('...', '\u2026')
+    text = ABBREVIATION_RE.sub('\\1\u00a0', text)
+    if '"' in text:
+        text = re.sub(r'(^|[\s(\[{\u2014\u2013])"', '\\1\u201c', text).replace('"', '\u201d')
+    if "'" in text:
+        text = re.sub(r"(^|[\s(\[{\u2014\u2013\u201c])'(?=\S)", '\\1\u2018', text).replace("'", '\u2019')
+    return text
+
+
+def _run(text: str, bold: bool = False) -> str:
+    props = '<w:rPr><w:b/><w:bCs/></w:rPr>' if bold else ''
+    return f'<w:r>{props}<w:t xml:space="preserve">{_escape(_smart(text))}</w:t></w:r>'
+
+
+def _runs(lines: List[str]) -> str:
+    """Render inline content (soft breaks, hard breaks and bold) as runs"""
+    parts = []
+    for index, line in enumerate(lines):
+        hard_break = line.endswith('  ')
+        text = line.strip()
+        if UNSUPPORTED_INLINE_RE.search(text) or '*' in BOLD_RE.sub('', text):
+            raise UnsupportedMarkdownError(f"Unsupported inline markup: {text[:40]}")
+        position = 0
+        for match in BOLD_RE.finditer(text):
+            if match.start() > position:
+                parts.append(_run(text[position:match.start()]))
+            parts.append(_run(match.group(1), bold=True))
+            position = match.end()
+        if position < len(text):
+            parts.append(_run(text[position:]))
+        if index < len(lines) - 1:
+            parts.append('<w:r><w:br/></w:r>' if hard_break else _run(' '))
+    return ''.join(parts)
+
+
+def _paragraph(style: str, content: str, extra_props: str = '') -> str:
+    return f'<w:p><w:pPr><w:pStyle w:val="{style}"/>{extra_props}</w:pPr>{content}</w:p>'
+
+
+def _table(table: Table) -> str:
+    column_width = TEXT_WIDTH // max(len(table.header), 1)
+    parts = [
+        '<w:tbl><w:tblPr><w:tblStyle w:val="Table"/><w:tblW w:type="pct" w:w="5000"/>'
+        '<w:tblLook w:firstRow="1" w:lastRow="0" w:firstColumn="0" w:lastColumn="0" '
+        'w:noHBand="0" w:noVBand="0" w:val="0020"/></w:tblPr><w:tblGrid>',
+        f'<w:gridCol w:w="{column_width}"/>' * len(table.header),
+        '</w:tblGrid>'
+    ]
+    for row_index, row in enumerate([table.header] + table.rows):
+        parts.append('<w:tr><w:trPr><w:tblHeader w:val="on"/></w:trPr>' if row_index == 0 else '<w:tr>')
+        for cell, alignment in zip(row, table.alignments):
+            content = _runs([cell]) if cell else ''
+            justification = '<w:jc w:val="%s"/>' % alignment
+            parts.append('<w:tc><w:tcPr/>' + _paragraph('Compact', content, justification) + '</w:tc>')
+        parts.append('</w:tr>')
+    parts.append('</w:tbl>')
+    return ''.join(parts)
+
+
+def _numbering(lists: List[Tuple[int, bool, int, int]]) -> str:
+    """Build numbering.xml: one abstract definition per list kind, one instance per list"""
+    def levels(ordered: bool) -> str:
+        result = []
+        for level in range(9):
+            indent = 720 * (level + 1)
+            if ordered:
+                fmt = f'<w:numFmt w:val="decimal"/><w:lvlText w:val="%{level + 1}."/>'
+            else:
+                bullet = BULLETS[level % len(BULLETS)]
+                fmt = f'<w:numFmt w:val="bullet"/><w:lvlText w:val="{bullet}"/>'
+            result.append(
+                f'<w:lvl w:ilvl="{level}"><w:start w:val="1"/>{fmt}<w:lvlJc w:val="left"/>'
+                f'<w:pPr><w:tabs><w:tab w:val="num" w:pos="{indent}"/></w:tabs>'
+                f'<w:ind w:left="{indent}" w:hanging="360"/></w:pPr></w:lvl>'
+            )
+        return ''.join(result)
+
+    parts = [
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:numbering xmlns:w="{W_NS}">',
+        f'<w:abstractNum w:abstractNumId="0"><w:multiLevelType w:val="multilevel"/>{levels(False)}</w:abstractNum>',
+        f'<w:abstractNum w:abstractNumId="1"><w:multiLevelType w:val="multilevel"/>{levels(True)}</w:abstractNum>',
+    ]
+    for list_id, ordered, level, start in lists:
+        override = (f'<w:lvlOverride w:ilvl="{level}"><w:startOverride w:val="{start}"/></w:lvlOverride>'
+                    if ordered else '')
+        parts.append(f'<w:num w:numId="{list_id}"><w:abstractNumId w:val="{int(ordered)}"/>{override}</w:num>')
+    parts.append('</w:numbering>')
+    return ''.join(parts)
+
+
+def _heading_style(level: int, size: int) -> str:
+    spacing = 480 if level == 1 else 200
+    return (
+        f'<w:style w:type="paragraph" w:styleId="Heading{level}"><w:name w:val="heading {level}"/>'
+        f'<w:basedOn w:val="Normal"/><w:next w:val="BodyText"/><w:uiPriority w:val="9"/><w:qFormat/>'
+        f'<w:pPr><w:keepNext/><w:keepLines/><w:spacing w:before="{spacing}" w:after="0"/>'
+        f'<w:outlineLvl w:val="{level - 1}"/></w:pPr>'
+        f'<w:rPr><w:rFonts w:asciiTheme="majorHAnsi" w:hAnsiTheme="majorHAnsi"/><w:b/><w:bCs/>'
+        f'<w:color w:val="0F4761"/><w:sz w:val="{size}"/><w:szCs w:val="{size}"/></w:rPr></w:style>'
+    )
+
+
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:styles xmlns:w="{W_NS}">'
+    '<w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:asciiTheme="minorHAnsi" w:hAnsiTheme="minorHAnsi" '
+    'w:eastAsiaTheme="minorHAnsi" w:cstheme="minorBidi"/><w:sz w:val="24"/><w:szCs w:val="24"/>'
+    '<w:lang w:val="en-US"/></w:rPr></w:rPrDefault><w:pPrDefault><w:pPr><w:spacing w:after="200"/></w:pPr>'
+    '</w:pPrDefault></w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="BodyText"><w:name w:val="Body Text"/><w:basedOn w:val="Normal"/>'
+    '<w:qFormat/><w:pPr><w:spacing w:before="180" w:after="180"/></w:pPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="FirstParagraph"><w:name w:val="First Paragraph"/>'
+    '<w:basedOn w:val="BodyText"/><w:next w:val="BodyText"/><w:qFormat/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Compact"><w:name w:val="Compact"/><w:basedOn w:val="BodyText"/>'
+    '<w:qFormat/><w:pPr><w:spacing w:before="36" w:after="36"/></w:pPr></w:style>'
+    + ''.join(_heading_style(level, size) for level, size in zip(range(1, 7), (32, 28, 28, 24, 24, 24))) +
+    '<w:style w:type="table" w:default="1" w:styleId="TableNormal"><w:name w:val="Normal Table"/>'
+    '<w:uiPriority w:val="99"/><w:semiHidden/><w:tblPr><w:tblInd w:w="0" w:type="dxa"/><w:tblCellMar>'
+    '<w:top w:w="0" w:type="dxa"/><w:left w:w="108" w:type="dxa"/><w:bottom w:w="0" w:type="dxa"/>'
+    '<w:right w:w="108" w:type="dxa"/></w:tblCellMar></w:tblPr></w:style>'
+    '<w:style w:type="table" w:styleId="Table"><w:name w:val="Table"/><w:basedOn w:val="TableNormal"/><w:tblPr>'
+    '<w:tblBorders><w:top w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:left w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:bottom w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:right w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:insideH w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:insideV w:val="single" w:sz="4" w:space="0" w:color="auto"/></w:tblBorders></w:tblPr>'
+    '<w:tblStylePr w:type="firstRow"><w:rPr><w:b/></w:rPr><w:tblPr/><w:tcPr><w:vAlign w:val="bottom"/></w:tcPr>'
+    '</w:tblStylePr></w:style>'
+    '</w:styles>'
+)
+
+CONTENT_TYPES_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+<Override PartName="/word/numbering.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>
+</Types>'''
+
+PACKAGE_RELS_XML = f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{R_NS}/officeDocument" Target="word/document.xml"/>
+</Relationships>'''
+
+DOCUMENT_RELS_XML = f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{R_NS}/styles" Target="styles.xml"/>
+<Relationship Id="rId2" Type="{R_NS}/numbering" Target="numbering.xml"/>
+</Relationships>'''
+
+SECTION_XML = ('<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+               '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" '
+               'w:header="720" w:footer="720" w:gutter="0"/></w:sectPr>')
+
+
+def markdown_to_docx_bytes(markdown_content: str) -> bytes:
+    """Render markdown to DOCX bytes without pandoc
+
+    Raises UnsupportedMarkdownError if the markdown uses constructs outside
+    the supported subset.
+    """
+    body = []
+    lists = {}
+    previous = None
+    for block in parse_markdown(markdown_content):
+        if isinstance(block, Heading):
+            body.append(_paragraph(f'Heading{block.level}', _runs([block.text])))
+        elif isinstance(block, Paragraph):
+            style = 'BodyText' if isinstance(previous, Paragraph) else 'FirstParagraph'
+            body.append(_paragraph(style, _runs(block.lines)))
+        elif isinstance(block, ListItem):
+            lists.setdefault(block.list_id, (block.list_id, block.ordered, block.level, block.start))
+            numbering = f'<w:numPr><w:ilvl w:val="{block.level}"/><w:numId w:val="{block.list_id}"/></w:numPr>'
+            body.append(_paragraph('Compact', _runs(block.lines), numbering))
+        else:
+            body.append(_table(block))
+        previous = block
+
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{W_NS}" xmlns:r="{R_NS}"><w:body>'
+        f'{"".join(body)}{SECTION_XML}</w:body></w:document>'
+    )
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        package.writestr('_rels/.rels', PACKAGE_RELS_XML)
+        package.writestr('word/_rels/document.xml.rels', DOCUMENT_RELS_XML)
+        package.writestr('word/document.xml', document)
+        package.writestr('word/styles.xml', STYLES_XML)
+        package.writestr('word/numbering.xml', _numbering(list(lists.values())))
+    return buffer.getvalue()
@@ -1,14 +1,58 @@
 import logging
 from pathlib import Path
 from datetime import datetime
-from .data_processor import DataProcessor
-import json
+from typing import Dict, List, Optional, Sequence, Tuple
+from .corpus import ControlCorpus, get_corpus
+
+logger = logging.getLogger(__name__)
 
 BACKEND_DIR = Path(__file__).parent.parent
 
+# One mapping table row: (ccf_id, first line of the control name, policy standard,
+# references per selected framework, None where the control has none)
+MappingRow = Tuple[str, str, str, Tuple[Optional[Sequence[str]], ...]]
+
+
+def mapping_rows(index, selected_frameworks: Sequence[str]) -> Tuple[List[MappingRow], Dict[str, int]]:
+    """Collect the mapping table rows of a framework selection in one pass
+
+    Returns the rows of every control with references for at least one of
+    the frameworks, sorted by control id, and the number of rows with
+    references per framework. Records are only read: reference lists are
+    the index's own and must not be modified.
+    """
+    fields = [f"{framework}_ref" for framework in selected_frameworks]
+    # Count each framework once even if it was selected twice
+    positions = {framework: position for position, framework in enumerate(selected_frameworks)}
+    coverage_counts = dict.fromkeys(selected_frameworks, 0)
+    rows = []
+    for control_id in index.ids_for_frameworks(selected_frameworks):
+        control = index.control(control_id)
+        refs = tuple(control.get(field) or None for field in fields)
+        if not any(refs):
+            continue
+        refs = tuple(ref if ref is None or isinstance(ref, list) else [ref] for ref in refs)
+        for framework, position in positions.items():
+            if refs[position]:
+                coverage_counts[framework] += 1
+        guidance = index.guidance(control_id)
+        rows.append((
+            control_id,
+            control.get('control_name', '').split('\n')[0],
+            guidance['policy_standard'] if guidance else 'N/A',
+            refs,
+        ))
+    return rows, coverage_counts
+
+
+def format_refs(refs: Optional[Sequence[str]]) -> str:
+    """Format one mapping table cell"""
+    return ", ".join(refs) if refs else "-"
+
+
 class FrameworkMapper:
-    def __init__(self):
-        """Initialize FrameworkMapper"""
+    def __init__(self, corpus: ControlCorpus = None):
+        """Initialize FrameworkMapper with the shared control corpus"""
         # Create framework name mapping
         self.framework_names = {
             'nist_cybersecurity': 'NIST CSF',
@@ -34,22 +78,9 @@ class FrameworkMapper:
             'pci_dss_v4': 'PCI DSS v4'
         }
         
-        # Create data processor with correct path
-        controls_file = Path(BACKEND_DIR) / 'data' / 'processed' / 'controls_v2.json'
-        
-        print(f"\n=== FrameworkMapper Initialization ===")
-        print(f"Controls file path: {controls_file}")
-        print(f"Checking if file exists: {controls_file.exists()}")
-        
-        if not controls_file.exists():
-            raise FileNotFoundError(f"Controls data file not found at: {controls_file}")
-        
-        # Pass the same path for both parameters since we're reading directly from the file
-        self.data_processor = DataProcessor(
-            raw_data_path=str(controls_file),  # Convert Path to string
-            processed_data_path=str(controls_file)  # Convert Path to string
-        )
-        print("DataProcessor initialized successfully")
+        # Reuse the process-wide corpus instead of re-reading controls_v2.json
+        self.corpus = corpus or get_corpus()
+        logger.debug("FrameworkMapper using control corpus version: %s", self.corpus.version)
 
     def get_friendly_name(self, framework_id):
         """Get friendly name for a framework ID"""
@@ -57,90 +88,41 @@ class FrameworkMapper:
 
     def generate_mapping(self, selected_frameworks):
         """Generate framework mapping table"""
+        return ''.join(self.iter_mapping(selected_frameworks))
+
+    def iter_mapping(self, selected_frameworks):
+        """Yield the framework mapping document in pieces: title and summary, table header, one row per control
+
+        Controls are collected and their coverage counted in a single pass
+        before the first piece is yielded, so most errors surface before any
+        output; the table itself is produced row by row and can be streamed
+        without building the whole document.
+        """
         try:
-            print("\n=== Starting Framework Mapping Generation ===")
-            # Get controls data using the data processor
-            print("Getting controls data from processor...")
-            controls_data = self.data_processor.get_processed_controls()
-            
-            # Get control guidance data for policy standards
-            guidance_path = Path(BACKEND_DIR) / 'data' / 'processed' / 'control_guidance.json'
-            with open(guidance_path, 'r', encoding='utf-8') as f:
-                guidance_data = json.load(f)
-            
-            # Create guidance lookup by ccf_id
-            guidance_lookup = {
-                control['ccf_id']: control['policy_standard']
-                for control in guidance_data['controls']
-            }
-            
-            if not controls_data or 'controls' not in controls_data:
-                raise ValueError("Invalid controls data format")
-            
-            print(f"Retrieved {len(controls_data.get('controls', []))} controls")
-            
-            # Filter controls that have mappings to selected frameworks
-            print(f"\nFiltering controls for frameworks: {selected_frameworks}")
-            mapped_controls = []
-            for control in controls_data['controls']:
-                framework_refs = {}
-                for framework in selected_frameworks:
-                    ref_field = f"{framework}_ref"
-                    if ref_field in control:
-                        refs = control[ref_field]
-                        if refs:
-                            if not isinstance(refs, list):
-                                refs = [refs]
-                            framework_refs[framework] = refs
-                
-                if any(framework in framework_refs for framework in selected_frameworks):
-                    control['framework_refs'] = framework_refs
-                    # Add policy standard from guidance
-                    control['policy_standard'] = guidance_lookup.get(control['ccf_id'], 'N/A')
-                    mapped_controls.append(control)
-            
-            print(f"Found {len(mapped_controls)} controls with framework mappings")
-            
-            # Generate markdown table with policy standard column
-            print("\nGenerating markdown table...")
-            table = "| Control ID | Control Name | Document Name | " + " | ".join(self.get_friendly_name(f) for f in selected_frameworks) + " |\n"
-            table += "|" + "---|" * (len(selected_frameworks) + 3) + "\n"
-            
-            for control in sorted(mapped_controls, key=lambda x: x['ccf_id']):
-                row = [
-                    control['ccf_id'],
-                    control.get('control_name', '').split('\n')[0],
-                    control.get('policy_standard', 'N/A')
-                ]
-                
-                for framework in selected_frameworks:
-                    refs = control.get('framework_refs', {}).get(framework, [])
-                    row.append(", ".join(refs) if refs else "-")
-                
-                table += "| " + " | ".join(row) + " |\n"
-            
-            print("Table generation complete")
-            
-            # Add title and summary
-            title = f"Framework Mapping Analysis ({datetime.now().strftime('%Y-%m-%d')})\n\n"
-            summary = "### Summary\n"
-            summary += f"Total Controls Mapped: {len(mapped_controls)}\n\n"
+            # Look up controls through the corpus index instead of scanning every record
+            rows, coverage_counts = mapping_rows(self.corpus.index, selected_frameworks)
+            logger.debug("Found %d controls with mappings to frameworks: %s", len(rows), selected_frameworks)
             
-            # Add framework coverage stats with friendly names
+            # Add title and summary with framework coverage stats and friendly names
+            summary = [
+                f"Framework Mapping Analysis ({datetime.now().strftime('%Y-%m-%d')})\n\n",
+                "### Summary\n",
+                f"Total Controls Mapped: {len(rows)}\n\n",
+            ]
             for framework in selected_frameworks:
-                friendly_name = self.get_friendly_name(framework)
-                controls_with_refs = sum(1 for c in mapped_controls if c['framework_refs'].get(framework))
-                coverage = (controls_with_refs / len(mapped_controls)) * 100
-                summary += f"- {friendly_name}: {controls_with_refs} controls ({coverage:.1f}%)\n"
+                coverage = (coverage_counts[framework] / len(rows)) * 100
+                summary.append(f"- {self.get_friendly_name(framework)}: {coverage_counts[framework]} controls ({coverage:.1f}%)\n")
+            summary.append("\n### Mapping Table\n")
+            yield ''.join(summary)
             
-            summary += "\n### Mapping Table\n"
+            # Markdown table with policy standard column
+            yield ("| Control ID | Control Name | Document Name | "
+                   + " | ".join(self.get_friendly_name(f) for f in selected_frameworks) + " |\n"
+                   + "|" + "---|" * (len(selected_frameworks) + 3) + "\n")
             
-            # Combine all parts
-            return title + summary + table
+            for control_id, control_name, policy_standard, refs in rows:
+                yield "| " + " | ".join([control_id, control_name, policy_standard, *map(format_refs, refs)]) + " |\n"
 
         except Exception as e:
-            print(f"\n=== Error in Framework Mapping Generation ===")
-            print(f"Error type: {type(e)}")
-            print(f"Error message: {str(e)}")
-            print(f"Error location: {e.__traceback__.tb_frame.f_code.co_filename}:{e.__traceback__.tb_lineno}")
+            logger.error("Error in framework mapping generation: %s: %s", type(e).__name__, e, exc_info=True)
             raise Exception(f"Error generating framework mapping: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,106 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+MANIFEST_NAME = 'ingest_manifest.json'
+MANIFEST_FORMAT = 1
+
+# Raw CSV -> column identifying its rows
+SOURCE_IDS = {
+    'controls_v2.csv': 'ccf_id',
+    'control_guidance.csv': 'ccf_id',
+    'erl.csv': 'reference_id',
+}
+
+
+def row_fingerprints(df: pd.DataFrame) -> List[str]:
+    """Hash every raw CSV row, in row order
+
+    The header is part of each hash, so adding, dropping or renaming a column
+    changes every fingerprint. Missing values hash like empty cells.
+    """
+    if df.empty:
+        return []
+    header = hashlib.blake2b('\x1f'.join(map(str, df.columns)).encode('utf-8'), digest_size=16).digest()
+    text = df.astype(object).where(df.notna(), '').astype(str)
+    rows = text.iloc[:, 0]
+    if len(df.columns) > 1:
+        rows = rows.str.cat([text[column] for column in df.columns[1:]], sep='\x1f')
+    return [hashlib.blake2b(row.encode('utf-8'), digest_size=16, key=header).hexdigest() for row in rows]
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """Return the sha256 of a file, or None if it does not exist"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_manifest(path: Path) -> Dict:
+    """Load an ingest manifest, or return an empty one if it is missing or unreadable"""
+    try:
+        manifest = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('format') != MANIFEST_FORMAT:
+        return {}
+    return manifest
+
+
+class ChangeSet:
+    """What an ingest run changed, by control and by evidence reference
+
+    ``policy_standards`` lists the policy standards whose documents may
+    render differently: those of every added, modified or removed control
+    (before and after the change) and of every control citing changed
+    evidence. Render caches can keep everything else (see
+    RenderCache.carry_over).
+    """
+    __slots__ = ('added', 'modified', 'removed', 'evidence_added', 'evidence_modified',
+                 'evidence_removed', 'policy_standards', 'files_written', 'previous_version', 'version')
+
+    def __init__(self, added: Iterable[str] = (), modified: Iterable[str] = (), removed: Iterable[str] = (),
+                 evidence_added: Iterable[str] = (), evidence_modified: Iterable[str] = (),
+                 evidence_removed: Iterable[str] = (), policy_standards: Iterable[str] = (),
+                 files_written: Iterable[str] = (), previous_version: Optional[str] = None,
+                 version: Optional[str] = None):
+        self.added = sorted(added)
+        self.modified = sorted(modified)
+        self.removed = sorted(removed)
+        self.evidence_added = sorted(evidence_added)
+        self.evidence_modified = sorted(evidence_modified)
+        self.evidence_removed = sorted(evidence_removed)
+        self.policy_standards = sorted(policy_standards)
+        self.files_written = list(files_written)
+        self.previous_version = previous_version
+        self.version = version
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.modified or self.removed or self.evidence_added
+                    or self.evidence_modified or self.evidence_removed)
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ChangeSet':
+        return cls(**{slot: data[slot] for slot in cls.__slots__ if slot in data})
+
+    def __repr__(self):
+        return (f"ChangeSet(added={len(self.added)}, modified={len(self.modified)}, "
+                f"removed={len(self.removed)}, policy_standards={len(self.policy_standards)})")
+
+
+def diff_ids(previous: Dict[str, str], current: Dict[str, str]) -> Dict[str, Set[str]]:
+    """Compare id -> fingerprint maps of two ingests"""
+    return {
+        'added': set(current) - set(previous),
+        'removed': set(previous) - set(current),
+        'modified': {row_id for row_id, fingerprint in current.items()
+                     if row_id in previous and previous[row_id] != fingerprint},
+    }
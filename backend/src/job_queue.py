@@ -0,0 +1,183 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many jobs are already waiting"""
+
+
+class Job:
+    """A background document generation job and, once finished, its result"""
+    __slots__ = ('id', 'status', 'filename', 'content_type', 'result', 'error',
+                 'created_at', 'started_at', 'finished_at')
+
+    def __init__(self, filename: str, content_type: str):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.filename = filename
+        self.content_type = content_type
+        self.result: Optional[bytes] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self) -> Dict:
+        """Describe the job for status responses (without the result bytes)"""
+        def timestamp(value):
+            return datetime.fromtimestamp(value).isoformat(timespec='seconds') if value else None
+
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "bytes": len(self.result) if self.result is not None else None,
+            "error": self.error,
+            "created_at": timestamp(self.created_at),
+            "started_at": timestamp(self.started_at),
+            "finished_at": timestamp(self.finished_at),
+        }
+
+
+class JobStore:
+    """Thread-safe job registry that forgets finished jobs after ``ttl`` seconds
+
+    At most ``max_finished`` finished jobs are kept; beyond that the oldest
+    results are dropped before their TTL runs out.
+    """
+
+    def __init__(self, ttl: float = 600, max_finished: int = 256):
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def add(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job, or None if it is unknown or has expired"""
+        self.evict_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def evict_expired(self) -> int:
+        """Drop finished jobs older than the TTL or beyond max_finished and return how many were dropped"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+            overflow = max(0, len(finished) - self.max_finished)
+            expired = [job.id for position, job in enumerate(finished)
+                       if position < overflow or job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+
+class JobQueue:
+    """In-process queue that runs document generation off the request thread
+
+    Jobs run on a small worker pool; at most ``max_pending`` jobs may be
+    queued or running at once, beyond that ``submit`` raises
+    JobQueueFullError. Finished results stay downloadable for ``ttl`` seconds
+    (at most ``max_finished`` of them); expired results are dropped whenever
+    a job is submitted or looked up, so unpolled jobs do not pile up.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64, ttl: float = 600, max_finished: int = 256):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.store = JobStore(ttl, max_finished)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, task: Callable[[], bytes], filename: str, content_type: str) -> Job:
+        """Queue a task returning the document bytes and return its Job"""
+        self.store.evict_expired()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFullError("Too many generation jobs queued, try again later")
+            self._pending += 1
+
+        job = Job(filename, content_type)
+        self.store.add(job)
+        try:
+            self._executor.submit(self._run, job, task)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job
+
+    def _run(self, job: Job, task: Callable[[], bytes]) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            result, error = task(), None
+        except Exception as e:
+            logger.error("Job %s failed: %s", job.id, e)
+            result, error = None, str(e)
+        # Publish the outcome before the status so readers never see a half-finished job
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.status = DONE if error is None else FAILED
+        with self._lock:
+            self._pending -= 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "ttl": self.store.ttl,
+            "max_finished": self.store.max_finished,
+            **self.store.counts(),
+        }
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, configured from the environment"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(
+                workers=int(os.getenv('JOB_WORKERS', '2')),
+                max_pending=int(os.getenv('JOB_MAX_PENDING', '64')),
+                ttl=float(os.getenv('JOB_TTL', '600')),
+                max_finished=int(os.getenv('JOB_MAX_FINISHED', '256'))
+            )
+        return _queue
@@ -2,34 +2,31 @@ import logging
 from pathlib import Path
 from datetime import datetime
 from .templates import PolicyTemplate
+from .control_index import ControlIndex
+from .framework_mapper import format_refs, mapping_rows
+from .artifacts import config_digest, content_digest, write_artifact
+
+logger = logging.getLogger(__name__)
 
 # Add BACKEND_DIR definition
 BACKEND_DIR = Path(__file__).parent.parent
 
 class PolicyGenerator:
-    def __init__(self, data_processor=None):
-        """Initialize PolicyGenerator with optional data processor"""
+    def __init__(self, data_processor=None, corpus=None):
+        """Initialize PolicyGenerator with optional data processor or shared corpus"""
+        self.corpus = None
         if data_processor is None:
-            # Create default data processor if none provided
-            from src.data_processor import DataProcessor
-            
-            # Fix path construction - only use controls_v2.json
-            raw_data_path = Path(BACKEND_DIR) / 'data' / 'processed' / 'controls_v2.json'
-            processed_data_path = raw_data_path  # Use same file for both since we don't need preprocessing
-            
-            print(f"\n=== PolicyGenerator Initialization ===")
-            print(f"Raw data path: {raw_data_path}")
-            print(f"Checking if file exists: {raw_data_path.exists()}")
-            
-            if not raw_data_path.exists():
-                raise FileNotFoundError(f"Controls data file not found at: {raw_data_path}")
-            
-            data_processor = DataProcessor(
-                raw_data_path=raw_data_path,
-                processed_data_path=processed_data_path
-            )
+            # Read controls from the process-wide corpus instead of re-parsing controls_v2.json
+            from src.corpus import get_corpus
+            self.corpus = corpus or get_corpus()
         self.data_processor = data_processor
         self.template = PolicyTemplate()
+
+    def _get_control_index(self) -> ControlIndex:
+        """Return the control index of the shared corpus or one built from the data processor"""
+        if self.corpus is not None:
+            return self.corpus.index
+        return ControlIndex({}, self.data_processor.get_processed_controls(), {})
         
     def generate_policy(self, config_data, output_format='md'):
         """Generate a policy document based on the provided configuration"""
@@ -42,15 +39,15 @@ class PolicyGenerator:
         # Get current date for versioning
         current_date = datetime.now().strftime("%Y-%m-%d")
         
-        # Get controls data
-        controls_data = self.data_processor.get_processed_controls()
+        # Get indexed controls data
+        index = self._get_control_index()
         
         # Build policy statements from controls
         policy_statements = []
         implementation_reqs = []
         
         for control_id in config['expected_controls']:
-            control = next((c for c in controls_data['controls'] if c['ccf_id'] == control_id), None)
+            control = index.control(control_id)
             if control:
                 # Add control title and description to policy statements
                 policy_statements.append(f"### {control_id}: {control.get('control_name', '')}")
@@ -79,7 +76,7 @@ class PolicyGenerator:
         
         # Add framework mappings for each control
         for control_id in config['expected_controls']:
-            control = next((c for c in controls_data['controls'] if c['ccf_id'] == control_id), None)
+            control = index.control(control_id)
             if control:
                 for framework in config['selected_frameworks']:
                     ref_field = f"{framework}_ref"
@@ -104,74 +101,53 @@ class PolicyGenerator:
         
         return document
     
-    def save_policy_document(self, document: str, output_path: Path) -> Path:
-        """Save the generated policy document to a file"""
-        output_path.mkdir(parents=True, exist_ok=True)
+    def save_policy_document(self, document: str, output_path: Path, config: dict = None) -> Path:
+        """Save the generated policy document to a content-addressed file
+
+        The name ends in a digest of the config and data version (or of the
+        document itself when no config is given). The write is atomic and
+        skipped if the file already exists.
+        """
+        content = document.encode('utf-8')
+        if config is not None:
+            data_version = self.corpus.version if self.corpus is not None else None
+            digest = config_digest(config, data_version,
+                                   PolicyTemplate.content_hash(config.get("template_id", "standard")))
+        else:
+            digest = content_digest(content)
         
-        # Generate filename based on policy name and date
+        # Generate filename based on policy name, date and digest
         safe_name = document.split('\n')[0].replace('#', '').strip().lower().replace(' ', '_')
-        filename = f"{safe_name}_{datetime.now().strftime('%Y%m%d')}.md"
+        filename = f"{safe_name}_{datetime.now().strftime('%Y%m%d')}_{digest}.md"
         
-        file_path = output_path / filename
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(document)
+        file_path = Path(output_path) / filename
+        write_artifact(file_path, content)
         
         return file_path
 
     def generate_framework_mapping(self, selected_frameworks):
         """Generate framework mapping table without policy filtering"""
+        return ''.join(self.iter_framework_mapping(selected_frameworks))
+
+    def iter_framework_mapping(self, selected_frameworks):
+        """Yield the framework mapping table: the header, then one row per control"""
         try:
-            print("\n=== Starting Framework Mapping Generation ===")
-            # Get controls data using the data processor
-            print("Getting controls data from processor...")
-            controls_data = self.data_processor.get_processed_controls()
-            print(f"Retrieved {len(controls_data.get('controls', []))} controls")
+            # Look up candidate controls through the control index
+            index = self._get_control_index()
             
             # Filter controls that have mappings to selected frameworks
-            print(f"\nFiltering controls for frameworks: {selected_frameworks}")
-            mapped_controls = []
-            for control in controls_data['controls']:
-                framework_refs = {}
-                for framework in selected_frameworks:
-                    ref_field = f"{framework}_ref"
-                    if ref_field in control:
-                        refs = control[ref_field]
-                        if refs:
-                            if not isinstance(refs, list):
-                                refs = [refs]
-                            framework_refs[framework] = refs
-                
-                if any(framework in framework_refs for framework in selected_frameworks):
-                    control['framework_refs'] = framework_refs
-                    mapped_controls.append(control)
-            
-            print(f"Found {len(mapped_controls)} controls with framework mappings")
+            rows, _ = mapping_rows(index, selected_frameworks)
+            logger.debug("Found %d controls with framework mappings", len(rows))
             
             # Generate markdown table
-            print("\nGenerating markdown table...")
-            table = "| Control ID | Description | " + " | ".join(selected_frameworks) + " |\n"
-            table += "|" + "---|" * (len(selected_frameworks) + 2) + "\n"
-            
-            for control in sorted(mapped_controls, key=lambda x: x['ccf_id']):
-                row = [
-                    control['ccf_id'],
-                    control.get('control_name', '').split('\n')[0]
-                ]
-                
-                for framework in selected_frameworks:
-                    refs = control.get('framework_refs', {}).get(framework, [])
-                    row.append(", ".join(refs) if refs else "-")
-                
-                table += "| " + " | ".join(row) + " |\n"
+            yield ("| Control ID | Description | " + " | ".join(selected_frameworks) + " |\n"
+                   + "|" + "---|" * (len(selected_frameworks) + 2) + "\n")
             
-            print("Table generation complete")
-            return table
+            for control_id, control_name, _, refs in rows:
+                yield "| " + " | ".join([control_id, control_name, *map(format_refs, refs)]) + " |\n"
 
         except Exception as e:
-            print(f"\n=== Error in Framework Mapping Generation ===")
-            print(f"Error type: {type(e)}")
-            print(f"Error message: {str(e)}")
-            print(f"Error location: {e.__traceback__.tb_frame.f_code.co_filename}:{e.__traceback__.tb_lineno}")
+            logger.error("Error in framework mapping generation: %s: %s", type(e).__name__, e, exc_info=True)
             raise Exception(f"Error generating framework mapping: {str(e)}")
 
     def convert_mapping_to_docx(self, markdown_content):
@@ -0,0 +1,152 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+from .templates import PolicyTemplate
+
+CacheValue = Union[str, bytes]
+
+
+def _sizeof(value: CacheValue) -> int:
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return len(value)
+
+
+class RenderCache:
+    """Bounded, thread-safe LRU cache of rendered policy documents
+
+    Entries are evicted least recently used first once either ``max_entries``
+    or ``max_bytes`` is exceeded. Keys come from ``make_key`` and embed the
+    template content hash and corpus version, so stale entries are never
+    served; ``invalidate_template`` and ``retain_corpus_version`` release
+    their memory early, and ``carry_over`` keeps the entries an incremental
+    ingest did not affect.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple, Tuple[CacheValue, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(config: Dict, corpus_version: str, output_format: str = 'md',
+                 current_date: str = '', template_hash: Optional[str] = None) -> Tuple:
+        """Build a canonical cache key for a generation config
+
+        Framework order does not affect the rendered document, so frameworks
+        are de-duplicated and sorted. template_hash defaults to the shared
+        template's content hash; renderers with their own templates (see
+        PolicyTemplate.from_file) pass theirs.
+        """
+        template_id = config.get("template_id", "standard")
+        return (
+            config["policy_standard"],
+            tuple(sorted(set(config.get("selected_frameworks", [])))),
+            template_id,
+            template_hash or PolicyTemplate.content_hash(template_id),
+            corpus_version,
+            output_format.lower(),
+            current_date,
+        )
+
+    def get(self, key: Hashable) -> Optional[CacheValue]:
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: CacheValue) -> None:
+        """Store a rendered document, evicting old entries to stay within bounds"""
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def _remove_where(self, predicate) -> int:
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                self._size -= self._entries.pop(key)[1]
+            return len(stale)
+
+    def invalidate_template(self, template_id: str) -> int:
+        """Drop every entry rendered with template_id"""
+        return self._remove_where(lambda key: key[2] == template_id)
+
+    def retain_corpus_version(self, corpus_version: str) -> int:
+        """Drop every entry rendered from a different corpus version (after a data reload)"""
+        return self._remove_where(lambda key: key[4] != corpus_version)
+
+    def carry_over(self, previous_version: str, corpus_version: str, policy_standards) -> int:
+        """Re-key entries of an unaffected policy standard to a new corpus version
+
+        After an incremental ingest only the policy standards in the change
+        set render differently, so their entries from ``previous_version`` are
+        dropped and every other entry of that version is kept under
+        ``corpus_version`` in its current LRU position. Returns the number of
+        entries carried over.
+        """
+        affected = set(policy_standards)
+        with self._lock:
+            carried = OrderedDict()
+            kept = 0
+            for key, entry in self._entries.items():
+                if key[4] == previous_version:
+                    if key[0] in affected:
+                        self._size -= entry[1]
+                        continue
+                    key = key[:4] + (corpus_version,) + key[5:]
+                    kept += 1
+                if key in carried:
+                    self._size -= carried.pop(key)[1]
+                carried[key] = entry
+            self._entries = carried
+            return kept
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current usage"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Process-wide cache shared by all policy generators
+RENDER_CACHE = RenderCache(
+    max_entries=int(os.getenv('RENDER_CACHE_MAX_ENTRIES', '256')),
+    max_bytes=int(os.getenv('RENDER_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+)
+PolicyTemplate.add_change_listener(RENDER_CACHE.invalidate_template)
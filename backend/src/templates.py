@@ -1,13 +1,215 @@
 from string import Template
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
 from datetime import datetime
 import re
 import json
+import hashlib
+import logging
+import threading
 from pathlib import Path
 
+from .artifacts import atomic_write
+
+logger = logging.getLogger(__name__)
+
+BUILTIN_TEMPLATE_IDS = ("standard", "detailed")
+
+Templates = Mapping[str, Mapping]
+
+
+def _freeze_templates(templates: Mapping[str, Mapping]) -> Templates:
+    """Return a read-only copy of template records keyed by template_id"""
+    return MappingProxyType({template_id: MappingProxyType(dict(record)) for template_id, record in templates.items()})
+
+
+def _thaw_templates(templates: Templates) -> Dict[str, Dict]:
+    return {template_id: dict(record) for template_id, record in templates.items()}
+
+
+class TemplateRegistry:
+    """Policy templates by id, read lock-free and edited copy-on-write
+
+    ``snapshot()`` is a single attribute read returning a read-only mapping
+    that never changes afterwards, so renders never take a lock and never see
+    a half-applied edit. Edits serialise on one writer lock: they validate
+    against the current snapshot, build a new mapping, save the custom
+    templates atomically to ``path`` and only then publish the new snapshot,
+    so a failed save leaves the published templates untouched.
+    """
+    __slots__ = ('path', 'builtin_ids', '_snapshot', '_lock')
+
+    def __init__(self, templates: Mapping[str, Mapping], path: Optional[Path] = None,
+                 builtin_ids=BUILTIN_TEMPLATE_IDS):
+        self.path = Path(path) if path is not None else None
+        self.builtin_ids = tuple(builtin_ids)
+        self._snapshot = _freeze_templates(templates)
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Templates:
+        """The current templates; later edits publish a new mapping instead of changing this one"""
+        return self._snapshot
+
+    def get(self, template_id: str) -> Optional[Mapping]:
+        return self._snapshot.get(template_id)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Plain copies of the current templates, e.g. to hand to worker processes"""
+        return _thaw_templates(self._snapshot)
+
+    def publish(self, templates: Mapping[str, Mapping]) -> None:
+        """Replace every template without saving (e.g. in worker processes)"""
+        with self._lock:
+            self._snapshot = _freeze_templates(templates)
+
+    def load(self) -> None:
+        """Merge the custom templates saved at ``path``, keeping the built-in ones"""
+        with self._lock:
+            if self.path is None or not self.path.exists():
+                return
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+            current = self._snapshot
+            builtin = {template_id: current[template_id] for template_id in self.builtin_ids if template_id in current}
+            self._snapshot = _freeze_templates({**current, **stored, **builtin})
+
+    def save(self) -> None:
+        """Atomically save the custom templates to ``path``"""
+        with self._lock:
+            self._save(self._snapshot)
+
+    def _save(self, templates: Templates) -> None:
+        if self.path is None:
+            return
+        custom = {template_id: dict(record) for template_id, record in templates.items()
+                  if template_id not in self.builtin_ids}
+        atomic_write(self.path, json.dumps(custom, indent=2).encode('utf-8'))
+
+    def _commit(self, templates: Dict[str, Mapping]) -> None:
+        # Callers hold the writer lock
+        frozen = _freeze_templates(templates)
+        self._save(frozen)
+        self._snapshot = frozen
+
+    def add(self, template_id: str, record: Dict) -> None:
+        with self._lock:
+            if template_id in self._snapshot:
+                raise ValueError(f"Template {template_id} already exists")
+            self._commit({**self._snapshot, template_id: record})
+
+    def update(self, template_id: str, updates: Dict) -> None:
+        with self._lock:
+            if template_id not in self._snapshot:
+                raise ValueError(f"Template {template_id} not found")
+            if template_id in self.builtin_ids:
+                raise ValueError("Cannot modify built-in templates")
+            self._commit({**self._snapshot, template_id: {**self._snapshot[template_id], **updates}})
+
+    def delete(self, template_id: str) -> None:
+        with self._lock:
+            if template_id in self.builtin_ids:
+                raise ValueError("Cannot delete built-in templates")
+            if template_id not in self._snapshot:
+                raise ValueError(f"Template {template_id} not found")
+            templates = dict(self._snapshot)
+            del templates[template_id]
+            self._commit(templates)
+
+
+class TemplateOverlay:
+    """Read-only view of a registry with the content of some templates replaced
+
+    Reads merge the overrides into the registry's current snapshot (once per
+    snapshot); edits go to the underlying registry.
+    """
+    __slots__ = ('base', 'overrides', '_merged')
+
+    def __init__(self, base: TemplateRegistry, overrides: Dict[str, str]):
+        self.base = base
+        self.overrides = dict(overrides)
+        self._merged = None
+
+    def snapshot(self) -> Templates:
+        base = self.base.snapshot()
+        merged = self._merged
+        if merged is None or merged[0] is not base:
+            templates = dict(base)
+            for template_id, content in self.overrides.items():
+                record = templates.get(template_id, {"name": template_id, "description": ""})
+                templates[template_id] = MappingProxyType({**record, "content": content})
+            merged = (base, MappingProxyType(templates))
+            self._merged = merged
+        return merged[1]
+
+    def get(self, template_id: str) -> Optional[Mapping]:
+        return self.snapshot().get(template_id)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return _thaw_templates(self.snapshot())
+
+    def __getattr__(self, name):
+        return getattr(self.base, name)
+
+
+class CompiledTemplate:
+    """A string.Template pre-split into literal chunks and placeholder slots
+
+    Rendering fills the slots and joins the chunks in one pass, with the same
+    results and errors as Template.substitute / safe_substitute.
+    """
+    __slots__ = ('chunks', 'slots')
+
+    def __init__(self, content: str):
+        self.chunks: List[str] = []
+        # (chunk index, placeholder name or None if invalid, original text)
+        self.slots: List[tuple] = []
+        literal = []
+        position = 0
+        for match in Template.pattern.finditer(content):
+            literal.append(content[position:match.start()])
+            position = match.end()
+            if match.group('escaped') is not None:
+                literal.append(Template.delimiter)
+                continue
+            self.chunks.append(''.join(literal))
+            literal = []
+            name = match.group('named') or match.group('braced')
+            if name is None:
+                name = self._invalid_message(content, match.start('invalid'))
+                self.slots.append((len(self.chunks), None, match.group()))
+                self.chunks.append(name)
+            else:
+                self.slots.append((len(self.chunks), name, match.group()))
+                self.chunks.append(match.group())
+        literal.append(content[position:])
+        self.chunks.append(''.join(literal))
+
+    @staticmethod
+    def _invalid_message(content: str, index: int) -> str:
+        lines = content[:index].splitlines(keepends=True)
+        if not lines:
+            return 'Invalid placeholder in string: line 1, col 1'
+        return f'Invalid placeholder in string: line {len(lines)}, col {index - len("".join(lines[:-1]))}'
+
+    def substitute(self, data: Dict) -> str:
+        """Fill every placeholder, raising KeyError/ValueError like Template.substitute"""
+        parts = self.chunks.copy()
+        for index, name, _ in self.slots:
+            if name is None:
+                raise ValueError(parts[index])
+            parts[index] = str(data[name])
+        return ''.join(parts)
+
+    def safe_substitute(self, data: Dict) -> str:
+        """Fill known placeholders and leave the rest untouched"""
+        parts = self.chunks.copy()
+        for index, name, original in self.slots:
+            parts[index] = str(data[name]) if name is not None and name in data else original
+        return ''.join(parts)
+
 class PolicyTemplate:
     TEMPLATES_FILE = Path(__file__).parent.parent / 'data' / 'templates.json'
-    TEMPLATES = {
+    BUILTIN_TEMPLATES = {
         "standard": {
             "name": "Standard Policy Template",
             "description": "Default template with standard policy sections",
@@ -139,6 +341,10 @@ Evidence Required:
 |:---|:-------|:------|
 ${evidence_table}
 """
+    CONTROL_SECTION = CompiledTemplate(CONTROL_SECTION_TEMPLATE)
+
+    # Built-in and custom templates shared by every render (see TemplateRegistry)
+    registry = TemplateRegistry(BUILTIN_TEMPLATES, TEMPLATES_FILE)
 
     AVAILABLE_SECTIONS = {
         "document_control": {
@@ -210,9 +416,14 @@ ${evidence_table}
         # Format as numbered list
         return '\n'.join(f"{i+1}. {item}" for i, item in enumerate(items))
 
+    # Callbacks notified with a template_id whenever that template changes
+    _change_listeners = []
+    # Render plans keyed by (template_id, content hash)
+    _compiled: Dict[tuple, CompiledTemplate] = {}
+
     def __init__(self, template_id="standard"):
         self.template_id = template_id
-        self.template = self.TEMPLATES[template_id]["content"]
+        self.template = self.registry.snapshot()[template_id]["content"]
 
     @classmethod
     def get_available_templates(cls):
@@ -223,13 +434,14 @@ ${evidence_table}
                 "description": template["description"],
                 "sections": cls.get_template_sections(template_id)
             }
-            for template_id, template in cls.TEMPLATES.items()
+            for template_id, template in cls.registry.snapshot().items()
         }
 
     @classmethod
     def get_template_sections(cls, template_id: str) -> List[str]:
         """Get main sections from template"""
-        template = cls.TEMPLATES.get(template_id, cls.TEMPLATES["standard"])
+        templates = cls.registry.snapshot()
+        template = templates.get(template_id, templates["standard"])
         content = template["content"]
         # Extract section headers (##)
         sections = [
@@ -239,78 +451,103 @@ ${evidence_table}
         ]
         return sections
 
+    @classmethod
+    def add_change_listener(cls, callback) -> None:
+        """Register a callback invoked with the template_id of every added, updated or deleted template"""
+        cls._change_listeners.append(callback)
+
+    @classmethod
+    def _notify_change(cls, template_id: str) -> None:
+        """Drop the template's render plans and notify listeners (e.g. render caches) that it changed"""
+        for key in [key for key in list(cls._compiled) if key[0] == template_id]:
+            cls._compiled.pop(key, None)
+        for callback in list(cls._change_listeners):
+            callback(template_id)
+
+    @staticmethod
+    def _hash_content(content: str) -> str:
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def content_hash(cls, template_id: str) -> str:
+        """Return a digest of the content render() would use for template_id"""
+        templates = cls.registry.snapshot()
+        template = templates.get(template_id, templates["standard"])
+        return cls._hash_content(template["content"])
+
+    @classmethod
+    def _compile(cls, template_id: str, content: str) -> CompiledTemplate:
+        key = (template_id, cls._hash_content(content))
+        compiled = cls._compiled.get(key)
+        if compiled is None:
+            compiled = CompiledTemplate(content)
+            cls._compiled[key] = compiled
+        return compiled
+
+    @classmethod
+    def compile(cls, template_id: str) -> CompiledTemplate:
+        """Return the cached render plan for a template, compiling it on first use"""
+        return cls._compile(template_id, cls.registry.snapshot()[template_id]["content"])
+
     @classmethod
     def render(cls, data: Dict, template_id: str = "standard") -> str:
         """Render the policy template with provided data"""
-        print(f"Rendering template: {template_id}")  # Debug log
-        
-        if template_id not in cls.TEMPLATES:
-            print(f"Warning: Template {template_id} not found, using standard")
+        # One snapshot for the lookup and the content, so a concurrent edit
+        # cannot remove the template in between
+        templates = cls.registry.snapshot()
+        if template_id not in templates:
+            logger.warning("Template %s not found, using standard", template_id)
             template_id = "standard"
         
-        template_instance = cls(template_id)
-        
-        # Print template sections for debugging
-        sections = [s.strip().split('\n')[0] for s in template_instance.template.split('##') if s.strip()]
-        print(f"Template sections: {sections}")
-        
-        # Render main template
-        return Template(template_instance.template).substitute(data)
+        return cls._compile(template_id, templates[template_id]["content"]).substitute(data)
 
     @classmethod
-    def from_file(cls, template_path: str) -> 'PolicyTemplate':
-        """Create template instance from file"""
+    def from_file(cls, template_path: str) -> type:
+        """Return a PolicyTemplate class whose "standard" template is read from a file
+
+        The override only applies to the returned subclass; the shared
+        registry, and so every other generator, keeps the built-in template.
+        """
         with open(template_path, 'r') as f:
-            cls.TEMPLATES["standard"]["content"] = f.read()
-        return cls
+            content = f.read()
+        return cls.with_overrides({"standard": content})
+
+    @classmethod
+    def with_overrides(cls, contents: Dict[str, str]) -> type:
+        """Return a PolicyTemplate subclass rendering the given content for these template ids"""
+        return type(cls.__name__, (cls,), {"registry": TemplateOverlay(cls.registry, contents)})
 
     @classmethod
     def add_template(cls, template_id: str, name: str, description: str, sections: List[Dict]) -> None:
         """Add a new template"""
-        if template_id in cls.TEMPLATES:
-            raise ValueError(f"Template {template_id} already exists")
-        
         # Generate template content from sections
         content = cls._generate_template_content(sections)
         
-        cls.TEMPLATES[template_id] = {
+        # Saved to file before it is published
+        cls.registry.add(template_id, {
             "name": name,
             "description": description,
             "content": content
-        }
-        
-        # Save templates to file
-        cls.save_templates()
+        })
+        cls._notify_change(template_id)
 
     @classmethod
     def update_template(cls, template_id: str, updates: Dict) -> None:
         """Update an existing template"""
-        if template_id not in cls.TEMPLATES:
-            raise ValueError(f"Template {template_id} not found")
-        
-        if template_id in ["standard", "detailed"]:
-            raise ValueError("Cannot modify built-in templates")
-        
+        updates = dict(updates)
         if 'sections' in updates:
             updates['content'] = cls._generate_template_content(updates['sections'])
         
-        cls.TEMPLATES[template_id].update(updates)
-        
-        # Save templates to file
-        cls.save_templates()
+        # Saved to file before it is published
+        cls.registry.update(template_id, updates)
+        cls._notify_change(template_id)
 
     @classmethod
     def delete_template(cls, template_id: str) -> None:
         """Delete a template"""
-        if template_id in ["standard", "detailed"]:
-            raise ValueError("Cannot delete built-in templates")
-        if template_id not in cls.TEMPLATES:
-            raise ValueError(f"Template {template_id} not found")
-        
-        del cls.TEMPLATES[template_id]
-        
-        # Save templates to file
-        cls.save_templates()
+        # Saved to file before it is published
+        cls.registry.delete(template_id)
+        cls._notify_change(template_id)
 
     @classmethod
     def _generate_template_content(cls, sections: List[Dict]) -> str:
@@ -386,10 +623,10 @@ ${evidence_table}
     @classmethod
     def get_template_details(cls, template_id: str) -> Dict:
         """Get detailed template information including section configurations"""
-        if template_id not in cls.TEMPLATES:
+        template = cls.registry.get(template_id)
+        if template is None:
             raise ValueError(f"Template {template_id} not found")
         
-        template = cls.TEMPLATES[template_id]
         
         # Parse the template content to extract section configurations
         content = template["content"]
@@ -431,29 +668,17 @@ ${evidence_table}
     def load_templates(cls):
         """Load templates from file"""
         try:
-            if cls.TEMPLATES_FILE.exists():
-                with open(cls.TEMPLATES_FILE, 'r') as f:
-                    stored_templates = json.load(f)
-                    # Merge with default templates, preserving built-in ones
-                    cls.TEMPLATES = {**stored_templates, **cls.TEMPLATES}
+            cls.registry.load()
         except Exception as e:
-            print(f"Error loading templates: {e}")
+            logger.error("Error loading templates: %s", e)
 
     @classmethod
     def save_templates(cls):
         """Save templates to file"""
         try:
-            # Create data directory if it doesn't exist
-            cls.TEMPLATES_FILE.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Filter out built-in templates before saving
-            custom_templates = {k: v for k, v in cls.TEMPLATES.items() 
-                             if k not in ["standard", "detailed"]}
-            
-            with open(cls.TEMPLATES_FILE, 'w') as f:
-                json.dump(custom_templates, f, indent=2)
+            cls.registry.save()
         except Exception as e:
-            print(f"Error saving templates: {e}")
+            logger.error("Error saving templates: %s", e)
             raise
 
     def _generate_framework_references_table(self, controls: List[Dict], selected_frameworks: List[str]) -> List[str]:
@@ -1,14 +1,122 @@
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Dict, Optional
 
-def setup_logging(log_path: Path):
-    """Configure logging to both file and console"""
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_path / 'debug.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed in ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including ``extra`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue records as they are, leaving all formatting to the listener thread
+
+    The stdlib QueueHandler formats the message and traceback on the logging
+    thread (and drops exc_info) so records can be pickled; these records stay
+    in-process, so the listener's formatters get msg, args and exc_info intact.
+    Arguments are rendered when the listener reaches the record, so pass
+    values that will not change afterwards.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """Parse per-module levels such as "src.templates=DEBUG,werkzeug=WARNING" """
+    levels = {}
+    for item in spec.split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(log_path: Optional[Path] = None, level: Optional[str] = None,
+                  module_levels: Optional[Dict[str, str]] = None,
+                  json_format: Optional[bool] = None) -> QueueListener:
+    """Configure logging to the console and, with log_path, to log_path/debug.log
+
+    Log calls only put the record on a queue; a background listener thread
+    formats it and does the blocking console and file writes. Levels gate
+    records before any message formatting happens, so disabled debug output
+    costs one level check. Defaults come from the environment:
+
+    - LOG_LEVEL: root level (default INFO)
+    - LOG_LEVELS: per-module levels, e.g. "src.templates=DEBUG,werkzeug=WARNING"
+    - LOG_FORMAT: "text" (default) or "json" for one JSON object per line
+
+    Calling it again replaces the previous configuration.
+    """
+    global _listener
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    levels = parse_levels(os.getenv('LOG_LEVELS', ''))
+    levels.update(module_levels or {})
+    if json_format is None:
+        json_format = os.getenv('LOG_FORMAT', 'text').lower() == 'json'
+
+    formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_path is not None:
+        handlers.append(logging.FileHandler(Path(log_path) / 'debug.log'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    if _listener is not None:
+        _listener.stop()
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(DeferredQueueHandler(records))
+    root.setLevel(level)
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener.start()
+    return _listener
+
+
+def logging_configured() -> bool:
+    """Return whether setup_logging (or another configuration) installed root handlers"""
+    return _listener is not None or bool(logging.getLogger().handlers)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
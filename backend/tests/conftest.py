@@ -0,0 +1,18 @@
+import functools
+import pytest
+from src.conversion_service import ConversionService
+
+@functools.lru_cache(maxsize=None)
+def pandoc_available():
+    try:
+        ConversionService().start()
+        return True
+    except OSError:
+        return False
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "pandoc: test needs the pandoc binary")
+
+def pytest_runtest_setup(item):
+    if item.get_closest_marker("pandoc") and not pandoc_available():
+        pytest.skip("pandoc not installed")
@@ -0,0 +1,66 @@
+import os
+import pytest
+from pathlib import Path
+from src import artifacts
+from src.artifacts import atomic_write, config_digest, mapping_digest, write_artifact
+from scripts.generate_policy_from_input import PolicyGenerator
+
+CONFIG = {
+    "policy_standard": "Asset Management Policy",
+    "selected_frameworks": ["soc_2", "iso_27001"],
+    "template_id": "standard"
+}
+
+def test_config_digest_is_canonical():
+    """Test that the digest ignores framework order but not selection, data version or template content"""
+    reordered = dict(CONFIG, selected_frameworks=["iso_27001", "soc_2", "soc_2"])
+    assert config_digest(CONFIG, "v1", "t1") == config_digest(reordered, "v1", "t1")
+    assert config_digest(CONFIG, "v1", "t1") != config_digest(CONFIG, "v2", "t1")
+    assert config_digest(CONFIG, "v1", "t1") != config_digest(dict(CONFIG, selected_frameworks=["soc_2"]), "v1", "t1")
+    assert config_digest(CONFIG, "v1", "t1") != config_digest(CONFIG, "v1", "t2")
+
+def test_mapping_digest_tracks_frameworks_and_data():
+    """Test that framework mappings of different selections or data never share a filename"""
+    assert mapping_digest(["soc_2", "iso_27001"], "v1") == mapping_digest(["soc_2", "iso_27001"], "v1")
+    assert mapping_digest(["soc_2", "iso_27001"], "v1") != mapping_digest(["soc_2"], "v1")
+    assert mapping_digest(["soc_2", "iso_27001"], "v1") != mapping_digest(["iso_27001", "soc_2"], "v1")
+    assert mapping_digest(["soc_2"], "v1") != mapping_digest(["soc_2"], "v2")
+
+def test_atomic_write_leaves_no_partial_files(tmp_path, monkeypatch):
+    """Test that a failed write keeps the previous file and cleans up its temp file"""
+    target = tmp_path / "policy.md"
+    atomic_write(target, b"first")
+
+    def broken_replace(source, destination):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(artifacts.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        atomic_write(target, b"second")
+
+    assert target.read_bytes() == b"first"
+    assert [p.name for p in tmp_path.iterdir()] == ["policy.md"]
+
+def test_atomic_write_applies_the_umask(tmp_path):
+    """Test that atomically written files get the same mode as plain open() would give them"""
+    previous = os.umask(0o027)
+    try:
+        target = atomic_write(tmp_path / "policy.md", b"content")
+    finally:
+        os.umask(previous)
+    assert target.stat().st_mode & 0o777 == 0o640
+
+def test_generate_policy_is_collision_free_and_skips_existing(tmp_path, monkeypatch):
+    """Test that framework selections get distinct files and existing artifacts are reused"""
+    generator = PolicyGenerator()
+    first = Path(generator.generate_policy(CONFIG, output_dir=tmp_path))
+    other = Path(generator.generate_policy(dict(CONFIG, selected_frameworks=["soc_2"]), output_dir=tmp_path))
+    assert first != other
+
+    def fail(config):
+        raise AssertionError("existing artifact should not be regenerated")
+
+    monkeypatch.setattr(generator, "generate_policy_markdown_cached", fail)
+    assert Path(generator.generate_policy(dict(CONFIG, selected_frameworks=["iso_27001", "soc_2"]),
+                                          output_dir=tmp_path)) == first
+    assert write_artifact(first, b"ignored") is False
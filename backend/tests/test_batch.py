@@ -0,0 +1,79 @@
+import io
+import json
+import zipfile
+import pytest
+from src import batch
+from src.batch import BatchGenerator, configs_for_all, load_config_dir, validate_configs
+from src.render_cache import RenderCache
+from scripts.generate_policy_from_input import PolicyGenerator
+
+FRAMEWORKS = ["iso_27001", "soc_2"]
+
+@pytest.fixture(scope="module")
+def generator():
+    return PolicyGenerator(render_cache=RenderCache())
+
+def test_zip_contains_documents_in_order_and_manifest(generator):
+    """Test that a batch streams every document plus a manifest with timings"""
+    configs = configs_for_all(generator.corpus.index.policy_standards()[:4], FRAMEWORKS)
+    configs.append(dict(configs[0], selected_frameworks=["nist_800_53"]))
+
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(BatchGenerator(generator, workers=3).iter_zip(configs))))
+    manifest = json.loads(archive.read("manifest.json"))
+
+    assert [entry["policy_standard"] for entry in manifest["documents"]] == [c["policy_standard"] for c in configs]
+    assert manifest["failed"] == 0
+    assert manifest["corpus_version"] == generator.corpus.version
+    filenames = [entry["filename"] for entry in manifest["documents"]]
+    assert len(set(filenames)) == len(configs)
+    assert archive.namelist() == filenames + ["manifest.json"]
+    for config, filename in zip(configs, filenames):
+        assert archive.read(filename).decode('utf-8') == generator.generate_policy_markdown(config)
+
+def test_failed_documents_are_reported(generator, tmp_path):
+    """Test that one failing config does not abort the batch"""
+    configs = [
+        {"policy_standard": "Asset Management Policy", "selected_frameworks": FRAMEWORKS},
+        {"policy_standard": "Asset Management Policy", "selected_frameworks": None},
+    ]
+    manifest = BatchGenerator(generator, workers=2).write_directory(configs, tmp_path)
+
+    assert manifest["failed"] == 1
+    assert manifest["documents"][1]["error"]
+    assert (tmp_path / manifest["documents"][0]["filename"]).exists()
+    assert json.loads((tmp_path / "manifest.json").read_text()) == manifest
+
+def test_config_validation(tmp_path):
+    """Test batch config validation and loading configs from a directory"""
+    (tmp_path / "a.json").write_text(json.dumps({"policy_standard": "A", "selected_frameworks": []}))
+    (tmp_path / "b.json").write_text(json.dumps([{"policy_standard": "B", "selected_frameworks": ["soc_2"]}]))
+
+    assert [c["policy_standard"] for c in validate_configs(load_config_dir(tmp_path))] == ["A", "B"]
+    for configs in [[], None, [{"policy_standard": "A"}], [{"policy_standard": "A", "selected_frameworks": "soc_2"}]]:
+        with pytest.raises(ValueError):
+            validate_configs(configs)
+
+def test_process_engine_matches_thread_engine(generator):
+    """Test that the process pool returns the same documents in the same order"""
+    configs = configs_for_all(generator.corpus.index.policy_standards()[:6], FRAMEWORKS, "detailed")
+
+    threaded = list(BatchGenerator(generator, workers=2, engine="thread").render(configs))
+    processed = list(BatchGenerator(generator, workers=2, engine="process").render(configs))
+
+    assert [r.filename for r in processed] == [r.filename for r in threaded]
+    assert [r.content for r in processed] == [r.content for r in threaded]
+    assert all(r.error is None for r in processed)
+    with pytest.raises(ValueError):
+        BatchGenerator(generator, engine="fibers")
+
+def test_process_workers_follow_the_render_cache_setting(generator):
+    """Test that worker processes build their generator with the parent's cache settings"""
+    templates = generator.template.registry.to_dict()
+    data_dir = str(generator.corpus.data_dir)
+
+    batch._init_worker(PolicyGenerator, data_dir, templates, None)
+    assert batch._worker_generator.render_cache is None
+
+    batch._init_worker(PolicyGenerator, data_dir, templates, (3, 1024))
+    cache = batch._worker_generator.render_cache
+    assert (cache.max_entries, cache.max_bytes) == (3, 1024)
@@ -0,0 +1,54 @@
+import itertools
+import pytest
+from src.corpus import get_corpus
+from src.control_cover import candidate_controls, exact_cover, greedy_cover, requirement_bitsets, solve_cover
+
+def test_cover_satisfies_every_reference_of_all_frameworks():
+    """Test that the solver covers every controls_mapping reference, per framework"""
+    index = get_corpus().index
+    frameworks = list(index.frameworks)
+    cover = solve_cover(index, frameworks)
+
+    requirements, bitsets = requirement_bitsets(index, frameworks)
+    covered = 0
+    for control_id in cover.controls:
+        covered |= bitsets[control_id]
+    assert covered == (1 << len(requirements)) - 1
+    assert cover.covered == cover.requirements == len(requirements)
+    for framework in frameworks:
+        count = len(index.refs_for_framework(framework))
+        assert cover.coverage[framework] == {"requirements": count, "covered": count}
+    assert len(cover.controls) <= len(solve_cover(index, frameworks, exact=False).controls)
+
+    with pytest.raises(KeyError):
+        solve_cover(index, ["unknown"])
+
+def test_exact_refinement_finds_the_smallest_cover():
+    """Test that exact refinement beats greedy where greedy is known to be suboptimal"""
+    # Greedy takes the wide middle set first and then needs both halves anyway
+    candidates = candidate_controls({"A": 0b000111, "B": 0b111000, "C": 0b011110})
+    target = 0b111111
+    greedy = greedy_cover(candidates, target)
+    assert len(greedy) == 3
+
+    best, finished = exact_cover(candidates, target, greedy)
+    assert finished
+    assert sorted(candidates[position][0] for position in best) == ["A", "B"]
+
+def test_small_selections_are_proven_minimal():
+    """Test that the solver's set for a single framework is as small as a brute-force search"""
+    index = get_corpus().index
+    cover = solve_cover(index, ["iso_27017"])
+    requirements, bitsets = requirement_bitsets(index, ["iso_27017"])
+    target = (1 << len(requirements)) - 1
+
+    assert cover.optimal
+    smallest = next(size for size in range(1, len(bitsets) + 1)
+                    if any(sum_bits(combination) == target for combination in itertools.combinations(bitsets.values(), size)))
+    assert len(cover.controls) == smallest
+
+def sum_bits(bitsets):
+    bits = 0
+    for value in bitsets:
+        bits |= value
+    return bits
@@ -0,0 +1,99 @@
+import json
+import pytest
+from pathlib import Path
+from src.corpus import get_corpus
+from src.data_processor import DataProcessor
+
+@pytest.fixture(scope="module")
+def guidance_data():
+    with open(Path('data/processed/control_guidance.json')) as f:
+        return json.load(f)
+
+def test_index_lookups_match_linear_scans(guidance_data):
+    """Test that every index lookup returns what a full scan would"""
+    index = get_corpus().index
+
+    for control in guidance_data["controls"]:
+        assert index.guidance(control["ccf_id"]) == control
+        assert index.control(control["ccf_id"])["ccf_id"] == control["ccf_id"]
+
+    policy_standards = {c["policy_standard"] for c in guidance_data["controls"]}
+    assert index.policy_standards() == sorted(policy_standards)
+    for policy_standard in policy_standards:
+        expected = [c["ccf_id"] for c in guidance_data["controls"] if c["policy_standard"] == policy_standard]
+        assert list(index.ids_for_policy(policy_standard)) == expected
+
+    for domain in index.control_domains():
+        expected = [c["ccf_id"] for c in guidance_data["controls"] if c["control_domain"] == domain]
+        assert list(index.ids_for_domain(domain)) == expected
+
+    assert index.control("XX-99") is None
+    assert index.ids_for_policy("Unknown Policy") == ()
+
+def test_framework_index_matches_references():
+    """Test that framework indexes only list controls with references"""
+    corpus = get_corpus()
+    index = corpus.index
+
+    for control in corpus.controls_data["controls"]:
+        has_refs = bool(control.get("iso_27001_ref"))
+        assert (control["ccf_id"] in index.ids_for_framework("iso_27001")) == has_refs
+
+    for control_id, mappings in corpus.controls_mapping.items():
+        has_refs = bool(mappings.get("soc_2_ref"))
+        assert (control_id in index.mapped_ids_for_framework("soc_2")) == has_refs
+
+    combined = index.ids_for_frameworks(["iso_27001", "soc_2"])
+    assert combined == sorted(set(index.ids_for_framework("iso_27001")) | set(index.ids_for_framework("soc_2")))
+
+def test_data_processor_uses_policy_index():
+    """Test that DataProcessor.get_controls_by_policy returns the indexed controls"""
+    processor = DataProcessor(Path('data/raw'), Path('data/processed'))
+    controls = processor.get_controls_by_policy("Asset Management Policy")
+
+    assert controls
+    assert all(c["policy_standard"] == "Asset Management Policy" for c in controls)
+
+def test_inverted_reference_index_matches_mapping():
+    """Test that (framework, ref) -> controls agrees with controls_mapping"""
+    corpus = get_corpus()
+    index = corpus.index
+
+    expected = {}
+    for control_id, mappings in corpus.controls_mapping.items():
+        for ref in mappings.get("iso_27001_ref", []):
+            expected.setdefault(ref, set()).add(control_id)
+
+    assert list(index.refs_for_framework("iso_27001")) == sorted(expected)
+    for ref, control_ids in expected.items():
+        assert list(index.controls_for_ref("iso_27001", ref)) == sorted(control_ids)
+        for control_id in control_ids:
+            assert ref in index.mapped_refs(control_id, "iso_27001")
+
+    assert index.controls_for_ref("iso_27001", "not-a-ref") == ()
+    assert index.refs_for_framework("unknown_framework") == ()
+
+def test_framework_bitsets_match_reference_lookups():
+    """Test that compiled framework masks select exactly the controls a field scan would"""
+    corpus = get_corpus()
+    index = corpus.index
+    assert len(index.frameworks) == 21
+
+    selections = [["soc_2"], ["iso_27001", "pci_dss_v4"], ["kfsi", "unknown_framework"], [], list(index.frameworks)]
+    for frameworks in selections:
+        mask = index.framework_mask(frameworks)
+        for policy_standard in index.policy_standards():
+            expected = tuple(
+                control_id for control_id in index.ids_for_policy(policy_standard)
+                if any(corpus.controls_mapping.get(control_id, {}).get(f"{framework}_ref") for framework in frameworks)
+            )
+            assert index.ids_for_policy_matching(policy_standard, mask) == expected
+            assert all(index.matches_frameworks(control_id, mask) for control_id in expected)
+
+        union = set()
+        for framework in frameworks:
+            union.update(index.ids_for_framework(framework))
+        assert index.ids_for_frameworks(frameworks) == sorted(union)
+
+    assert index.framework_mask(["unknown_framework"]) == 0
+    assert index.ids_for_policy_matching("Unknown Policy", index.framework_mask(["soc_2"])) == ()
@@ -0,0 +1,72 @@
+import sys
+import pytest
+from src.conversion_service import (
+    ConversionBusyError, ConversionError, ConversionService, ConversionTimeoutError
+)
+from src.document_converter import DocumentConverter
+
+class SleepingService(ConversionService):
+    """Conversion service whose 'pandoc' just sleeps"""
+    def __init__(self, seconds, **kwargs):
+        super().__init__(pandoc_path=sys.executable, **kwargs)
+        self.seconds = seconds
+
+    def _command(self, to):
+        return [self.pandoc_path, '-c', f'import time; time.sleep({self.seconds})']
+
+@pytest.mark.pandoc
+def test_markdown_converts_to_docx_bytes():
+    """Test that markdown is converted in memory through the worker pool"""
+    converter = DocumentConverter(ConversionService(workers=2), engine="pandoc")
+    content = converter.markdown_to_docx_bytes("# Title\n\nSome **bold** text.\n")
+
+    assert content[:2] == b"PK"
+    assert converter.service.stats()["completed"] == 1
+
+def test_job_timeout_kills_conversion():
+    """Test that a conversion exceeding its timeout fails"""
+    service = SleepingService(5, workers=1, job_timeout=0.2)
+    with pytest.raises(ConversionTimeoutError):
+        service.convert("# Title")
+    assert service.stats()["failed"] == 1
+
+def test_full_queue_rejects_new_jobs():
+    """Test backpressure when all workers and queue slots are taken"""
+    service = SleepingService(1, workers=1, max_queue=1, queue_timeout=0.1)
+    running = [service.submit("# One"), service.submit("# Two")]
+
+    with pytest.raises(ConversionBusyError):
+        service.submit("# Three")
+    assert service.stats()["rejected"] == 1
+
+    for future in running:
+        future.result()
+
+def test_pandoc_errors_are_reported():
+    """Test that a failing converter raises ConversionError"""
+    service = ConversionService(workers=1, pandoc_path=sys.executable)
+    service._command = lambda to: [sys.executable, '-c', 'import sys; sys.exit(3)']
+    with pytest.raises(ConversionError):
+        service.convert("# Title")
+    assert service.stats()["failed"] == 1
+
+def test_missing_converter_counts_as_failed(tmp_path):
+    """Test that a converter binary that cannot be started fails the job and is counted"""
+    service = ConversionService(workers=2, pandoc_path=str(tmp_path / "pandoc"))
+    futures = [service.submit("# Title") for _ in range(4)]
+    for future in futures:
+        with pytest.raises(ConversionError):
+            future.result()
+    service.shutdown()
+    assert service.stats()["failed"] == 4
+
+def test_submit_after_concurrent_shutdown_is_busy():
+    """Test that a job submitted while the service shuts down is rejected cleanly"""
+    service = SleepingService(0, workers=1, max_queue=0)
+    service.start()
+    service.start = lambda: service
+    service.shutdown()
+
+    with pytest.raises(ConversionBusyError):
+        service.submit("# Title")
+    assert service._slots.acquire(blocking=False)
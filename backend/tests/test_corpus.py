@@ -0,0 +1,37 @@
+import pytest
+from pathlib import Path
+from src.corpus import ControlCorpus, get_corpus
+from src.framework_mapper import FrameworkMapper
+from scripts.generate_policy_from_input import PolicyGenerator
+
+def test_corpus_is_loaded_once_and_shared():
+    """Test that every generator shares the same process-wide corpus"""
+    corpus = get_corpus()
+    assert get_corpus(Path('data/processed')) is corpus
+
+    generator = PolicyGenerator()
+    mapper = FrameworkMapper()
+    assert generator.corpus is corpus
+    assert mapper.corpus is corpus
+    assert generator.controls_mapping is corpus.controls_mapping
+
+    # Same data always reports the same version
+    assert ControlCorpus.load(Path('data/processed')).version == corpus.version
+
+def test_corpus_is_read_only():
+    """Test that the shared corpus cannot be modified"""
+    corpus = get_corpus()
+
+    with pytest.raises(AttributeError):
+        corpus.controls_data = {}
+    with pytest.raises(TypeError):
+        corpus.controls_mapping['AM-01'] = {}
+    with pytest.raises(AttributeError):
+        corpus.control_guidance['controls'].append({})
+
+def test_framework_mapping_does_not_modify_corpus():
+    """Test that mapping generation leaves the shared control records untouched"""
+    corpus = get_corpus()
+    FrameworkMapper(corpus).generate_mapping(['iso_27001', 'soc_2'])
+
+    assert all('framework_refs' not in c for c in corpus.controls_data['controls'])
@@ -0,0 +1,86 @@
+import shutil
+import pandas as pd
+import pytest
+from pathlib import Path
+from src.corpus import get_corpus
+from src.corpus_manager import CorpusManager
+from src.data_processor import DataProcessor
+from src.render_cache import RenderCache
+
+CONFIG = {"selected_frameworks": ["soc_2"], "template_id": "standard"}
+
+@pytest.fixture
+def ingest(tmp_path):
+    """Ingest a copy of the raw CSVs, returning the processor and raw directory"""
+    raw = tmp_path / 'raw'
+    shutil.copytree(Path('data/raw'), raw)
+    processor = DataProcessor(raw, tmp_path / 'processed')
+    processor.convert_csv_to_json(incremental=True)
+    return processor, raw
+
+def edit_control(raw, ccf_id, description):
+    controls = pd.read_csv(raw / 'controls_v2.csv')
+    controls.loc[controls['ccf_id'] == ccf_id, 'control_description'] = description
+    controls.to_csv(raw / 'controls_v2.csv', index=False)
+
+def test_reload_swaps_snapshot_and_keeps_unaffected_renders(ingest):
+    """Test that a reload swaps in new data while old snapshots and unaffected cache entries survive"""
+    processor, raw = ingest
+    cache = RenderCache()
+    manager = CorpusManager(processor.processed_data_path, render_cache=cache)
+    old = manager.current
+    asset_key = RenderCache.make_key(dict(CONFIG, policy_standard="Asset Management Policy"), old.version)
+    other_key = RenderCache.make_key(dict(CONFIG, policy_standard="Encryption Policy"), old.version)
+    cache.put(asset_key, "asset management")
+    cache.put(other_key, "encryption")
+
+    assert manager.reload().result(timeout=30) == {"reloaded": False, "version": old.version}
+
+    edit_control(raw, 'AM-01', 'Updated description')
+    processor.convert_csv_to_json(incremental=True)
+    result = manager.reload().result(timeout=30)
+
+    new = manager.current
+    assert result["reloaded"] and result["carried_over"] == 1
+    assert new is not old and new.version == result["version"] != old.version
+    assert get_corpus(processor.processed_data_path) is new
+    assert new.index.control('AM-01')['control_description'] == 'Updated description'
+    assert old.index.control('AM-01')['control_description'] != 'Updated description'
+    assert cache.get(other_key[:4] + (new.version,) + other_key[5:]) == "encryption"
+    assert cache.stats()["entries"] == 1
+    manager.stop()
+
+def test_watcher_waits_for_stable_files_and_survives_bad_data(ingest):
+    """Test that mtime polling reloads settled data and keeps serving the old corpus on errors"""
+    processor, raw = ingest
+    manager = CorpusManager(processor.processed_data_path, render_cache=None)
+    old = manager.current
+    assert manager.check() is None
+
+    edit_control(raw, 'AM-02', 'Watched change')
+    processor.convert_csv_to_json(incremental=True)
+    assert manager.check() is None  # changed since the previous poll, may still be mid-ingest
+    assert manager.check().result(timeout=30)["reloaded"]
+    assert manager.current.version != old.version
+
+    live = manager.current
+    (processor.processed_data_path / 'erl.json').write_text('{"truncated": ')
+    manager.check()
+    result = manager.check().result(timeout=30)
+    assert "error" in result and manager.current is live
+    assert manager.stats()["last_error"]
+    assert manager.check() is None  # no retry until the files change again
+    manager.stop()
+
+def test_manager_reloads_again_after_stop_and_start(ingest):
+    """Test that a stopped manager can be started again and still reload"""
+    processor, raw = ingest
+    manager = CorpusManager(processor.processed_data_path, poll_interval=60, render_cache=None).start()
+    manager.stop()
+    manager.start()
+    assert manager.stats()["watching"]
+
+    edit_control(raw, 'AM-03', 'Change after restart')
+    processor.convert_csv_to_json(incremental=True)
+    assert manager.reload().result(timeout=30)["reloaded"]
+    manager.stop()
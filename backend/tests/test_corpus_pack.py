@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import pytest
+from pathlib import Path
+from src import corpus as corpus_module
+from src.corpus import CORPUS_FILES, ControlCorpus, read_sources, write_corpus_pack
+from src.corpus_pack import PACK_FILENAME, CorpusPackError, decode_pack, encode_pack
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for filename in CORPUS_FILES.values():
+        shutil.copy(Path('data/processed') / filename, tmp_path / filename)
+    return tmp_path
+
+def test_pack_round_trips_the_corpus(data_dir):
+    """Test that a pack decodes to exactly the JSON documents, key order included"""
+    write_corpus_pack(data_dir)
+    sources, version = read_sources(data_dir)
+    documents, pack_version = decode_pack((data_dir / PACK_FILENAME).read_bytes(), version)
+
+    assert pack_version == version
+    for attr, raw in sources.items():
+        assert json.dumps(documents[attr]) == json.dumps(json.loads(raw))
+
+    packed = ControlCorpus.load(data_dir)
+    assert packed.version == ControlCorpus.load(data_dir, corpus_format="json").version
+    assert packed.index.policy_standards() == ControlCorpus.load(data_dir, corpus_format="json").index.policy_standards()
+
+def test_invalid_or_stale_packs_fall_back_to_json(data_dir, caplog):
+    """Test that loaders reject corrupt and outdated packs and load the JSON instead"""
+    write_corpus_pack(data_dir)
+    pack_path = data_dir / PACK_FILENAME
+    pack = bytearray(pack_path.read_bytes())
+    pack[-1] ^= 0xFF
+    pack_path.write_bytes(bytes(pack))
+
+    with pytest.raises(CorpusPackError):
+        decode_pack(bytes(pack))
+    assert ControlCorpus.load(data_dir).index.control("AM-01") is not None
+    assert "checksum" in caplog.text
+    caplog.clear()
+
+    write_corpus_pack(data_dir)
+    erl = json.loads((data_dir / 'erl.json').read_text())
+    erl.pop(next(iter(erl)))
+    (data_dir / 'erl.json').write_text(json.dumps(erl, indent=2))
+    corpus = ControlCorpus.load(data_dir)
+    assert len(corpus.erl_data) == len(erl)
+    assert "expected" in caplog.text
+
+    with pytest.raises(CorpusPackError):
+        encode_pack({"erl_data": {"E-1": {"count": 3}}}, "v1")
+
+def test_stamped_pack_loads_without_reading_the_json(data_dir, monkeypatch):
+    """Test that an unchanged stamp skips reading and hashing the JSON, and a touched file does not"""
+    write_corpus_pack(data_dir)
+    version = ControlCorpus.load(data_dir, corpus_format="json").version
+    real_read_sources = corpus_module.read_sources
+    reads = []
+
+    def counting_read_sources(path):
+        reads.append(path)
+        return real_read_sources(path)
+
+    monkeypatch.setattr(corpus_module, "read_sources", counting_read_sources)
+    assert ControlCorpus.load(data_dir).version == version
+    assert reads == []
+
+    erl_path = data_dir / 'erl.json'
+    stat = erl_path.stat()
+    os.utime(erl_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert ControlCorpus.load(data_dir).version == version
+    assert reads == [data_dir]
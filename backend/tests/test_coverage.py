@@ -0,0 +1,42 @@
+import pytest
+from src.corpus import get_corpus
+
+def test_coverage_queries_match_linear_scans():
+    """Test that the precomputed coverage matrix answers like scans of the reference index"""
+    corpus = get_corpus()
+    index, coverage = corpus.index, corpus.coverage
+    frameworks = list(index.frameworks)
+    mapped = {framework: set(index.mapped_ids_for_framework(framework)) for framework in frameworks}
+
+    assert coverage.framework_counts() == {framework: len(ids) for framework, ids in mapped.items()}
+    overlap = coverage.overlap(["soc_2", "iso_27001", "pci_dss_v4"])
+    for framework, row in overlap.items():
+        for other, count in row.items():
+            assert count == len(mapped[framework] & mapped[other])
+    assert coverage.any_coverage(["soc_2", "iso_27001"]) == len(mapped["soc_2"] | mapped["iso_27001"])
+
+    policy_standard = index.policy_standards()[0]
+    ids = set(index.ids_for_policy(policy_standard))
+    entry = coverage.policy_coverage(["soc_2"], policy_standard)[policy_standard]
+    assert entry == {"controls": len(ids), "frameworks": {"soc_2": len(ids & mapped["soc_2"])}}
+    assert set(coverage.policy_coverage()) == set(index.policy_standards())
+
+    with pytest.raises(KeyError):
+        coverage.framework_counts(["unknown"])
+
+def test_minimal_controls_cover_every_reference():
+    """Test that the minimal control set covers every reference of the selected frameworks"""
+    corpus = get_corpus()
+    index, coverage = corpus.index, corpus.coverage
+    frameworks = ["soc_2", "iso_27001"]
+    result = coverage.minimal_controls(frameworks)
+
+    requirements = {(framework, ref) for framework in frameworks for ref in index.refs_for_framework(framework)}
+    covered = {(framework, ref) for framework, ref in requirements
+               if set(index.controls_for_ref(framework, ref)) & set(result["controls"])}
+    assert covered == requirements
+    assert result["requirements"] == result["covered"] == len(requirements)
+    assert len(result["controls"]) == len(set(result["controls"])) < len(mapped_union(index, frameworks))
+
+def mapped_union(index, frameworks):
+    return set().union(*(index.mapped_ids_for_framework(framework) for framework in frameworks))
@@ -0,0 +1,126 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import shutil
+from pathlib import Path
+from src.data_processor import FRAMEWORK_REF_COLUMNS, DataProcessor
+
+@pytest.fixture
+def processor(tmp_path):
+    return DataProcessor(Path('data/raw'), tmp_path)
+
+def test_column_cleaners_match_cell_cleaners(processor):
+    """Test that every vectorized cleaner gives the same result as its per-cell version"""
+    refs = pd.Series(["A.1\nA.2, A.3", np.nan, " ,\n", "B¿½.1", 5.0, ["C.1 ", " "], [], "D.1,,D.1"])
+    text = pd.Series(["“Quoted”  text\n", np.nan, "it’s", 7])
+    artifacts = pd.Series(["E-1\nE-2\nE-1", np.nan, "\n \n", " E-3 "])
+    flags = pd.Series(["X", " x ", np.nan, "Y", "XX"])
+
+    assert processor.clean_framework_reference_column(refs).tolist() == refs.apply(processor.clean_framework_references).tolist()
+    assert processor.clean_text_column(text).tolist() == text.apply(processor.clean_text_field).tolist()
+    assert processor.clean_audit_artifacts_column(artifacts).tolist() == artifacts.apply(processor.clean_audit_artifacts).tolist()
+    assert processor.clean_framework_flag_column(flags).tolist() == ["X", "X", None, None, None]
+
+def test_convert_csv_to_json_builds_consistent_files(processor, tmp_path):
+    """Test the ingest output and that the mapping agrees with the cleaned controls"""
+    processor.convert_csv_to_json()
+
+    controls = json.loads((tmp_path / 'controls_v2.json').read_text())['controls']
+    mapping = json.loads((tmp_path / 'controls_mapping.json').read_text())
+    erl = json.loads((tmp_path / 'erl.json').read_text())
+
+    assert len(controls) == len(pd.read_csv(Path('data/raw/controls_v2.csv')))
+    for control in controls:
+        assert list(mapping[control['ccf_id']]) == FRAMEWORK_REF_COLUMNS
+        for framework in FRAMEWORK_REF_COLUMNS:
+            assert mapping[control['ccf_id']][framework] == control[framework]
+    assert erl['E-AM-01'] == {'evidence_domain': 'Asset Management', 'evidence_title': 'Asset Management Policy'}
+
+    raw_mapping = processor.create_controls_mapping(pd.read_csv(Path('data/raw/controls_v2.csv')))
+    assert raw_mapping == mapping
+
+def test_json_lines_layout_streams_the_same_records(processor, tmp_path):
+    """Test that chunked JSON Lines output holds the same records as the JSON layout"""
+    processor.convert_csv_to_json()
+    # Small enough that some chunks hold only numeric refs (e.g. ens_ref "60")
+    counts = processor.convert_csv_to_json_lines(chunksize=7)
+
+    for name in ['controls_v2', 'control_guidance']:
+        lines = (tmp_path / f'{name}.jsonl').read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line) for line in lines] == json.loads((tmp_path / f'{name}.json').read_text())['controls']
+        assert counts[f'{name}.jsonl'] == len(lines)
+
+    mapping = json.loads((tmp_path / 'controls_mapping.json').read_text())
+    streamed = [json.loads(line) for line in (tmp_path / 'controls_mapping.jsonl').read_text().splitlines()]
+    assert {row.pop('ccf_id'): row for row in streamed} == mapping
+
+    with pytest.raises(ValueError):
+        processor.convert_csv_to_json(layout='xml')
+
+def test_incremental_ingest_reports_changes_and_skips_unchanged_files(tmp_path):
+    """Test that a re-ingest only rewrites changed files and matches a full rebuild"""
+    raw = tmp_path / 'raw'
+    shutil.copytree(Path('data/raw'), raw)
+    incremental = DataProcessor(raw, tmp_path / 'incremental')
+    assert incremental.convert_csv_to_json(incremental=True).changed
+
+    mtimes = {path.name: path.stat().st_mtime_ns for path in (tmp_path / 'incremental').iterdir()}
+    unchanged = incremental.convert_csv_to_json(incremental=True)
+    assert not unchanged.changed and unchanged.files_written == []
+    assert {path.name: path.stat().st_mtime_ns for path in (tmp_path / 'incremental').iterdir()} == mtimes
+
+    controls = pd.read_csv(raw / 'controls_v2.csv')
+    controls.loc[controls['ccf_id'] == 'AM-01', 'control_description'] = 'Updated description'
+    controls = controls[controls['ccf_id'] != 'AM-06']
+    controls.to_csv(raw / 'controls_v2.csv', index=False)
+    guidance = pd.read_csv(raw / 'control_guidance.csv')
+    guidance[guidance['ccf_id'] != 'AM-06'].to_csv(raw / 'control_guidance.csv', index=False)
+
+    change_set = incremental.convert_csv_to_json(incremental=True)
+    assert change_set.modified == ['AM-01']
+    assert change_set.removed == ['AM-06']
+    assert change_set.added == []
+    assert change_set.policy_standards == ['Asset Management Policy']
+    assert 'erl.json' not in change_set.files_written
+
+    DataProcessor(raw, tmp_path / 'full').convert_csv_to_json()
+    for name in ['controls_v2.json', 'controls_mapping.json', 'control_guidance.json', 'erl.json']:
+        assert (tmp_path / 'incremental' / name).read_bytes() == (tmp_path / 'full' / name).read_bytes()
+
+def test_controls_by_policy_follow_a_reingest(tmp_path):
+    """Test that policy lookups see the data of an in-process re-ingest and return copies"""
+    raw = tmp_path / 'raw'
+    shutil.copytree(Path('data/raw'), raw)
+    processor = DataProcessor(raw, tmp_path / 'processed')
+    processor.convert_csv_to_json()
+    controls = processor.get_controls_by_policy('Asset Management Policy')
+    assert 'AM-06' in [control['ccf_id'] for control in controls]
+
+    controls[0]['control_name'] = 'Changed by caller'
+    assert processor.get_controls_by_policy('Asset Management Policy')[0]['control_name'] != 'Changed by caller'
+
+    guidance = pd.read_csv(raw / 'control_guidance.csv')
+    guidance[guidance['ccf_id'] != 'AM-06'].to_csv(raw / 'control_guidance.csv', index=False)
+    processor.convert_csv_to_json(incremental=True)
+    assert 'AM-06' not in [control['ccf_id'] for control in processor.get_controls_by_policy('Asset Management Policy')]
+
+def test_changed_previous_guidance_marks_every_standard_affected(tmp_path):
+    """Test that a hand-edited guidance file cannot hide the old standard of a removed control"""
+    raw = tmp_path / 'raw'
+    shutil.copytree(Path('data/raw'), raw)
+    processor = DataProcessor(raw, tmp_path / 'processed')
+    processor.convert_csv_to_json(incremental=True)
+
+    guidance_path = tmp_path / 'processed' / 'control_guidance.json'
+    guidance_path.write_text(guidance_path.read_text(encoding='utf-8') + '\n', encoding='utf-8')
+    guidance = pd.read_csv(raw / 'control_guidance.csv')
+    guidance[guidance['ccf_id'] != 'AM-06'].to_csv(raw / 'control_guidance.csv', index=False)
+    controls = pd.read_csv(raw / 'controls_v2.csv')
+    controls[controls['ccf_id'] != 'AM-06'].to_csv(raw / 'controls_v2.csv', index=False)
+
+    change_set = processor.convert_csv_to_json(incremental=True)
+    assert change_set.removed == ['AM-06']
+    assert set(change_set.policy_standards) == {
+        record['policy_standard'] for record in json.loads(guidance_path.read_text(encoding='utf-8'))['controls']
+    }
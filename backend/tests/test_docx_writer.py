@@ -0,0 +1,108 @@
+import io
+import zipfile
+import pytest
+from xml.etree import ElementTree
+from src import docx_writer
+from src.conversion_service import ConversionService
+from src.document_converter import DocumentConverter
+from src.framework_mapper import FrameworkMapper
+from scripts.generate_policy_from_input import PolicyGenerator
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+def document_structure(content):
+    """Reduce a DOCX body to (kind, ...) tuples: headings, paragraphs, list items and tables"""
+    root = ElementTree.fromstring(zipfile.ZipFile(io.BytesIO(content)).read('word/document.xml'))
+    structure = []
+    for element in root.find(W + 'body'):
+        if element.tag == W + 'p':
+            style = element.find(f'{W}pPr/{W}pStyle')
+            style = style.get(W + 'val') if style is not None else ''
+            level = element.find(f'{W}pPr/{W}numPr/{W}ilvl')
+            text = ''.join(t.text or '' for t in element.iter(W + 't'))
+            if level is not None:
+                structure.append(('item', level.get(W + 'val'), text))
+            elif style.startswith('Heading'):
+                structure.append((style, text))
+            else:
+                structure.append(('para', text))
+        elif element.tag == W + 'tbl':
+            rows = element.findall(W + 'tr')
+            structure.append(('table', len(rows), len(rows[0].findall(W + 'tc'))))
+    return structure
+
+def test_paragraphs_absorb_following_lines():
+    """Test that, like pandoc, only a blank line ends a paragraph"""
+    blocks = docx_writer.parse_markdown("Intro text\n- not a list\n# not a heading\n\n- item\n\n## Heading\n")
+
+    assert [type(block).__name__ for block in blocks] == ['Paragraph', 'ListItem', 'Heading']
+    assert blocks[0].lines == ["Intro text", "- not a list", "# not a heading"]
+
+def test_nested_lists_and_tables_are_parsed():
+    """Test list nesting levels and pipe table rows"""
+    blocks = docx_writer.parse_markdown(
+        "- one\n  - nested\n- two\n\n| A | B |\n|:--|--:|\n| 1 | 2 |\n| 3 |\n"
+    )
+
+    items = [block for block in blocks if isinstance(block, docx_writer.ListItem)]
+    assert [(item.level, item.lines[0]) for item in items] == [(0, "one"), (1, "nested"), (0, "two")]
+    assert items[0].list_id == items[2].list_id != items[1].list_id
+
+    table = blocks[-1]
+    assert table.alignments == ['left', 'right']
+    assert table.rows == [['1', '2'], ['3', '']]
+
+def test_unsupported_markdown_is_rejected():
+    """Test that constructs outside the subset raise instead of rendering wrongly"""
+    for markdown in ["```\ncode\n```", "> quote", "a [link](http://example.com)", "`code`", "*emphasis*"]:
+        with pytest.raises(docx_writer.UnsupportedMarkdownError):
+            docx_writer.markdown_to_docx_bytes(markdown)
+
+def test_native_package_is_valid_docx():
+    """Test that the native writer produces a well-formed DOCX package"""
+    content = docx_writer.markdown_to_docx_bytes('# Title\n\nSome **bold** "quoted" text -- e.g. this.\n\n1. first\n2. second\n')
+    package = zipfile.ZipFile(io.BytesIO(content))
+
+    assert {'[Content_Types].xml', 'word/document.xml', 'word/styles.xml', 'word/numbering.xml'} <= set(package.namelist())
+    assert document_structure(content) == [
+        ('Heading1', 'Title'),
+        ('para', 'Some bold “quoted” text – e.g. this.'),
+        ('item', '0', 'first'),
+        ('item', '0', 'second'),
+    ]
+
+def test_converter_falls_back_to_pandoc():
+    """Test that the native engine hands unsupported markdown to the pandoc service"""
+    class RecordingService(ConversionService):
+        def convert(self, markdown, to='docx'):
+            self.converted = markdown
+            return b'pandoc'
+
+    service = RecordingService()
+    converter = DocumentConverter(service, engine='native')
+
+    assert converter.markdown_to_docx_bytes("# Title\n")[:2] == b'PK'
+    assert not hasattr(service, 'converted')
+    assert converter.markdown_to_docx_bytes("> quote\n") == b'pandoc'
+    assert DocumentConverter(service, engine='pandoc').markdown_to_docx_bytes("# Title\n") == b'pandoc'
+    with pytest.raises(ValueError):
+        DocumentConverter(service, engine='unknown')
+
+@pytest.mark.pandoc
+def test_native_structure_matches_pandoc():
+    """Test that generated policies and mappings have the same structure with both engines"""
+    generator = PolicyGenerator()
+    frameworks = ["iso_27001", "soc_2", "nist_cybersecurity"]
+    documents = [
+        generator.generate_policy_markdown_cached(
+            {"policy_standard": policy_standard, "selected_frameworks": frameworks, "template_id": template_id}
+        )
+        for policy_standard in ["Access Control Policy", "Change Management Policy", "Incident Management Policy"]
+        for template_id in ["standard", "detailed"]
+    ]
+    documents.append(FrameworkMapper().generate_mapping(frameworks))
+
+    service = ConversionService(workers=2)
+    for markdown in documents:
+        native = docx_writer.markdown_to_docx_bytes(markdown)
+        assert document_structure(native) == document_structure(service.convert(markdown, 'docx'))
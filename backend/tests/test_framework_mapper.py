@@ -0,0 +1,55 @@
+import json
+import pytest
+from src.corpus import get_corpus
+from concurrent.futures import ThreadPoolExecutor
+from src.framework_mapper import FrameworkMapper, mapping_rows
+from src.policy_generator import PolicyGenerator
+
+def test_mapping_streams_one_row_per_control():
+    """Test that the streamed mapping pieces form the document with one-pass coverage stats"""
+    index = get_corpus().index
+    frameworks = list(index.frameworks)
+    pieces = list(FrameworkMapper().iter_mapping(frameworks))
+
+    summary, header, rows = pieces[0], pieces[1], pieces[2:]
+    assert ''.join(pieces) == FrameworkMapper().generate_mapping(frameworks)
+    assert [row.split(" | ")[0] for row in rows] == [f"| {control_id}" for control_id in index.ids_for_frameworks(frameworks)]
+    assert header.count("|---") == len(frameworks) + 3
+    assert f"Total Controls Mapped: {len(rows)}\n" in summary
+    for framework in ["soc_2", "iso_27001"]:
+        count = len(index.ids_for_framework(framework))
+        assert f"- {FrameworkMapper().get_friendly_name(framework)}: {count} controls ({count / len(rows) * 100:.1f}%)\n" in summary
+
+def test_legacy_mapping_streams_rows():
+    """Test that the legacy generator's mapping table is the concatenation of its rows"""
+    generator = PolicyGenerator()
+    pieces = list(generator.iter_framework_mapping(["soc_2", "kfsi"]))
+
+    assert ''.join(pieces) == generator.generate_framework_mapping(["soc_2", "kfsi"])
+    assert len(pieces) == len(get_corpus().index.ids_for_frameworks(["soc_2", "kfsi"])) + 1
+
+    with pytest.raises(Exception, match="Error generating framework mapping"):
+        FrameworkMapper().generate_mapping(["unknown_framework"])
+
+def test_mapping_rows_share_corpus_records_without_modifying_them():
+    """Test that mapping works on read-only views, from any number of threads at once"""
+    corpus = get_corpus()
+    index = corpus.index
+    before = json.dumps(corpus.controls_data["controls"])
+
+    rows, coverage_counts = mapping_rows(index, ["soc_2", "iso_27001", "soc_2"])
+    for control_id, _, policy_standard, refs in rows:
+        assert refs[0] is index.control(control_id).get("soc_2_ref") or refs[0] is None
+        assert refs[0] is refs[2]
+        assert policy_standard == index.guidance(control_id)["policy_standard"]
+    assert coverage_counts == {"soc_2": len(index.ids_for_framework("soc_2")),
+                               "iso_27001": len(index.ids_for_framework("iso_27001"))}
+
+    frameworks = list(index.frameworks)
+    expected = FrameworkMapper(corpus).generate_mapping(frameworks)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        documents = list(pool.map(lambda _: FrameworkMapper(corpus).generate_mapping(frameworks), range(8)))
+    PolicyGenerator(corpus=corpus).generate_framework_mapping(frameworks)
+
+    assert documents == [expected] * 8
+    assert json.dumps(corpus.controls_data["controls"]) == before
@@ -0,0 +1,20 @@
+from pathlib import Path
+from scripts.generate_policy_from_input import PolicyGenerator
+
+CONFIG = {
+    "policy_standard": "Asset Management Policy",
+    "selected_frameworks": ["soc_2", "iso_27001"],
+    "template_id": "detailed"
+}
+
+def test_in_memory_generation_matches_disk_sink(tmp_path):
+    """Test that generate_policy_bytes needs no disk and matches what generate_policy saves"""
+    generator = PolicyGenerator()
+
+    markdown = generator.generate_policy_bytes(CONFIG)
+    docx = generator.generate_policy_bytes(CONFIG, 'docx')
+    assert not list(tmp_path.iterdir())
+
+    docx_path = Path(generator.generate_policy(CONFIG, 'docx', output_dir=tmp_path))
+    assert docx_path.read_bytes() == docx
+    assert docx_path.with_suffix('.md').read_bytes() == markdown
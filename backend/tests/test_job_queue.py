@@ -0,0 +1,62 @@
+import threading
+import time
+import pytest
+from src.job_queue import DONE, FAILED, JobQueue, JobQueueFullError
+
+def wait_for(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+def test_jobs_run_in_background():
+    """Test that submit returns at once and the result is stored on completion"""
+    queue = JobQueue(workers=1)
+    release = threading.Event()
+    job = queue.submit(lambda: release.wait(5) and b"document", "policy.md", "text/markdown")
+
+    assert job.status in ("queued", "running")
+    assert queue.get(job.id) is job
+    release.set()
+
+    assert wait_for(job).status == DONE
+    assert job.result == b"document"
+    assert job.to_dict()["bytes"] == len(b"document")
+
+def test_failed_jobs_record_errors():
+    """Test that a failing task marks the job failed instead of raising"""
+    queue = JobQueue(workers=1)
+
+    def fail():
+        raise ValueError("conversion failed")
+
+    job = wait_for(queue.submit(fail, "policy.docx", "application/octet-stream"))
+    assert job.status == FAILED
+    assert job.error == "conversion failed"
+    assert job.result is None
+
+def test_pending_limit_and_ttl_eviction():
+    """Test that the queue rejects work beyond max_pending and forgets old results"""
+    queue = JobQueue(workers=1, max_pending=1, ttl=0.05)
+    release = threading.Event()
+    job = queue.submit(lambda: release.wait(5) and b"x", "a.md", "text/markdown")
+
+    with pytest.raises(JobQueueFullError):
+        queue.submit(lambda: b"y", "b.md", "text/markdown")
+
+    release.set()
+    wait_for(job)
+    time.sleep(0.1)
+    assert queue.get(job.id) is None
+    assert queue.get("unknown") is None
+
+def test_unpolled_jobs_are_evicted_on_submit():
+    """Test that finished jobs nobody polls are dropped by later submits"""
+    queue = JobQueue(workers=1, ttl=0.05, max_finished=2)
+    jobs = [wait_for(queue.submit(lambda: b"x" * 1024, f"{n}.md", "text/markdown")) for n in range(4)]
+    assert sum(queue.store.counts().values()) == 3
+
+    time.sleep(0.1)
+    wait_for(queue.submit(lambda: b"y", "last.md", "text/markdown"))
+    assert queue.store.counts()[DONE] == 1
+    assert all(job.id not in queue.store._jobs for job in jobs)
@@ -0,0 +1,74 @@
+import json
+import logging
+import threading
+from src.utils.logger import setup_logging, stop_logging
+
+class Rendered:
+    """Counts how often a log argument is formatted"""
+    calls = 0
+
+    def __str__(self):
+        Rendered.calls += 1
+        return "rendered"
+
+def test_queue_logging_levels_and_json_output(tmp_path):
+    """Test per-module levels, lazy formatting and JSON lines written by the queue listener"""
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    try:
+        setup_logging(tmp_path, level="WARNING", module_levels={"tests.verbose": "DEBUG"}, json_format=True)
+        quiet, verbose = logging.getLogger("tests.quiet"), logging.getLogger("tests.verbose")
+
+        quiet.debug("skipped %s", Rendered())
+        quiet.info("skipped %s", Rendered())
+        assert Rendered.calls == 0
+
+        verbose.debug("kept %s", Rendered(), extra={"ccf_id": "AM-01"})
+        quiet.warning("warned")
+        stop_logging()
+
+        entries = [json.loads(line) for line in (tmp_path / 'debug.log').read_text().splitlines()]
+        assert [(entry["logger"], entry["level"], entry["message"]) for entry in entries] == [
+            ("tests.verbose", "DEBUG", "kept rendered"),
+            ("tests.quiet", "WARNING", "warned"),
+        ]
+        assert entries[0]["ccf_id"] == "AM-01"
+    finally:
+        stop_logging()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+        logging.getLogger("tests.verbose").setLevel(logging.NOTSET)
+
+def test_listener_formats_messages_and_exceptions(tmp_path):
+    """Test that messages and tracebacks are formatted on the listener thread and JSON keeps the exception field"""
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    formatted_on = []
+
+    class Recorded:
+        def __str__(self):
+            formatted_on.append(threading.current_thread())
+            return "recorded"
+
+    try:
+        setup_logging(tmp_path, json_format=True)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("tests.errors").exception("failed %s", Recorded())
+        stop_logging()
+
+        entry = json.loads((tmp_path / 'debug.log').read_text().splitlines()[-1])
+        assert entry["message"] == "failed recorded"
+        assert "ValueError: boom" in entry["exception"]
+        assert formatted_on and threading.current_thread() not in formatted_on
+    finally:
+        stop_logging()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
@@ -0,0 +1,84 @@
+from src.render_cache import RenderCache, RENDER_CACHE
+from src.templates import PolicyTemplate, TemplateRegistry
+from scripts.generate_policy_from_input import PolicyGenerator
+
+CONFIG = {
+    "policy_standard": "Asset Management Policy",
+    "selected_frameworks": ["soc_2", "iso_27001"],
+    "template_id": "standard"
+}
+
+def test_lru_eviction_by_entries_and_bytes():
+    """Test that the cache stays within its entry and byte bounds"""
+    cache = RenderCache(max_entries=2, max_bytes=10)
+    cache.put("a", "1234")
+    cache.put("b", "1234")
+    assert cache.get("a") == "1234"  # "a" is now most recently used
+
+    cache.put("c", "1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1234"
+
+    cache.put("d", b"12345678")
+    assert cache.stats()["bytes"] <= 10
+    assert cache.get("d") == b"12345678"
+
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] >= 2
+
+def test_key_is_canonical():
+    """Test that framework order does not change the cache key"""
+    reordered = dict(CONFIG, selected_frameworks=["iso_27001", "soc_2", "iso_27001"])
+    assert RenderCache.make_key(CONFIG, "v1") == RenderCache.make_key(reordered, "v1")
+    assert RenderCache.make_key(CONFIG, "v1") != RenderCache.make_key(CONFIG, "v2")
+    assert RenderCache.make_key(CONFIG, "v1") != RenderCache.make_key(CONFIG, "v1", "docx")
+
+def test_generator_reuses_cached_markdown():
+    """Test that a repeated config is served from the cache"""
+    cache = RenderCache()
+    generator = PolicyGenerator(render_cache=cache)
+
+    first = generator.generate_policy_markdown_cached(CONFIG)
+    second = generator.generate_policy_markdown_cached(dict(CONFIG, selected_frameworks=["iso_27001", "soc_2"]))
+
+    assert first == second == generator.generate_policy_markdown(CONFIG)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_template_changes_invalidate_cache(tmp_path, monkeypatch):
+    """Test that updating or deleting a template drops its cached renders"""
+    monkeypatch.setattr(PolicyTemplate, "registry",
+                        TemplateRegistry(PolicyTemplate.BUILTIN_TEMPLATES, tmp_path / "templates.json"))
+    PolicyTemplate.add_template("cache_test", "Cache Test", "", [{"type": "policy_requirements"}])
+
+    key = RenderCache.make_key(dict(CONFIG, template_id="cache_test"), "v1")
+    RENDER_CACHE.put(key, "rendered")
+    assert RENDER_CACHE.get(key) == "rendered"
+
+    PolicyTemplate.delete_template("cache_test")
+    assert RENDER_CACHE.get(key) is None
+
+def test_retain_corpus_version():
+    """Test that a data reload drops entries rendered from older data"""
+    cache = RenderCache()
+    cache.put(RenderCache.make_key(CONFIG, "old"), "old document")
+    cache.put(RenderCache.make_key(CONFIG, "new"), "new document")
+
+    assert cache.retain_corpus_version("new") == 1
+    assert cache.get(RenderCache.make_key(CONFIG, "new")) == "new document"
+    assert cache.get(RenderCache.make_key(CONFIG, "old")) is None
+
+def test_carry_over_keeps_unaffected_policy_standards():
+    """Test that an incremental ingest only drops renders of affected policy standards"""
+    cache = RenderCache()
+    other = dict(CONFIG, policy_standard="Encryption Policy")
+    cache.put(RenderCache.make_key(other, "old"), "encryption")
+    cache.put(RenderCache.make_key(CONFIG, "old"), "asset management")
+
+    assert cache.carry_over("old", "new", ["Asset Management Policy"]) == 1
+    assert cache.get(RenderCache.make_key(other, "new")) == "encryption"
+    assert cache.get(RenderCache.make_key(CONFIG, "new")) is None
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] == len("encryption")
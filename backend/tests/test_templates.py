@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+from src.templates import CompiledTemplate, PolicyTemplate, TemplateRegistry
+
+def test_compiled_template_matches_string_template():
+    """Test that render plans produce the same output and errors as string.Template"""
+    data = {"name": "Policy", "count": 3}
+    cases = [
+        "# ${name}\n\n$count controls, $$5 fee",
+        "$name$count${name}",
+        "missing ${other}",
+        "trailing $",
+        "line one\n  bad $-placeholder",
+    ]
+
+    for content in cases:
+        for method in ["substitute", "safe_substitute"]:
+            try:
+                expected = getattr(Template(content), method)(data)
+            except (KeyError, ValueError) as e:
+                expected = (type(e), str(e))
+            try:
+                actual = getattr(CompiledTemplate(content), method)(data)
+            except (KeyError, ValueError) as e:
+                actual = (type(e), str(e))
+            assert actual == expected
+
+def test_render_plans_are_cached_and_invalidated(tmp_path, monkeypatch):
+    """Test that templates compile once and recompile after an update"""
+    monkeypatch.setattr(PolicyTemplate, "registry",
+                        TemplateRegistry(PolicyTemplate.BUILTIN_TEMPLATES, tmp_path / "templates.json"))
+    PolicyTemplate.add_template("plan_test", "Plan Test", "", [{"type": "policy_requirements"}])
+
+    first = PolicyTemplate.compile("plan_test")
+    assert PolicyTemplate.compile("plan_test") is first
+    assert PolicyTemplate.render({"policy_standard": "X", "control_sections": "body"}, "plan_test") == \
+        "# X\n\n## Policy Requirements\n\nbody\n"
+
+    PolicyTemplate.update_template("plan_test", {"content": "Updated ${policy_standard}"})
+    assert not any(key[0] == "plan_test" and value is first for key, value in PolicyTemplate._compiled.items())
+    assert PolicyTemplate.render({"policy_standard": "X"}, "plan_test") == "Updated X"
+
+    PolicyTemplate.delete_template("plan_test")
+    assert not any(key[0] == "plan_test" for key in PolicyTemplate._compiled)
+
+def test_registry_readers_see_whole_snapshots_while_writers_edit(tmp_path):
+    """Test that concurrent edits publish complete snapshots and leave a valid templates file"""
+    path = tmp_path / "templates.json"
+    registry = TemplateRegistry(PolicyTemplate.BUILTIN_TEMPLATES, path)
+    stop = threading.Event()
+    torn = []
+
+    def read():
+        while not stop.is_set():
+            for template_id, record in registry.snapshot().items():
+                if template_id.startswith("t") and record["content"] != f"{record['name']} body":
+                    torn.append(template_id)
+            time.sleep(0)
+
+    def write(worker):
+        for i in range(25):
+            template_id = f"t{worker}_{i}"
+            registry.add(template_id, {"name": "v1", "description": "", "content": "v1 body"})
+            registry.update(template_id, {"name": "v2", "content": "v2 body"})
+            if i % 2:
+                registry.delete(template_id)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(write, range(4)))
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert torn == []
+    saved = json.loads(path.read_text())
+    assert sorted(saved) == sorted(template_id for template_id in registry.snapshot() if template_id.startswith("t"))
+    assert len(saved) == 4 * 13 and all(record["name"] == "v2" for record in saved.values())
+    with pytest.raises(ValueError):
+        registry.update("standard", {"content": "x"})
+    with pytest.raises(TypeError):
+        registry.snapshot()["standard"]["content"] = "x"
+
+def test_from_file_overrides_standard_only_for_its_class(tmp_path):
+    """Test that a file template does not replace the built-in standard template for everyone"""
+    template_file = tmp_path / "custom.md"
+    template_file.write_text("Custom ${policy_standard}")
+    custom = PolicyTemplate.from_file(str(template_file))
+
+    assert custom.render({"policy_standard": "X"}) == "Custom X"
+    assert PolicyTemplate.registry.get("standard")["content"] == PolicyTemplate.BUILTIN_TEMPLATES["standard"]["content"]
+    assert custom.content_hash("standard") != PolicyTemplate.content_hash("standard")
+    assert custom.registry.get("detailed") is PolicyTemplate.registry.get("detailed")